@@ -1,12 +1,39 @@
+import time
 import streamlit as st
 from whosampled.components.search_components import (
     render_search_input,
     render_song_selector,
 )
-from whosampled.services.search_service import handle_search, handle_song_selection
+from whosampled.services.search_service import (
+    handle_search,
+    handle_paginated_search,
+    handle_song_selection,
+    load_more_search_results,
+)
 from whosampled.state.app_state import initialize_state, get_selected_song_id
-from whosampled.api.get_song_info import get_sampled_songs, generate_sample_description
-from whosampled.utils.graph_utils import build_graph, plot_graph
+from whosampled.api.get_song_info import (
+    DescriptionStream,
+    generate_sample_description,
+)
+from whosampled.services.song_service import get_song_data, get_song_figure
+from whosampled.components.debug_panel import render_debug_panel
+from whosampled.components.exploration_view import render_exploration
+from whosampled.components.graph_components import render_graph_mode, render_sampled_in
+from whosampled.services.snapshot_service import warm_start
+from whosampled.utils.metrics import get_metrics, start_metrics_server, start_timings
+from whosampled.config import (
+    DEBUG_PANEL,
+    METRICS_PORT,
+    SEARCH_PAGINATED,
+    SEARCH_TYPEAHEAD,
+    STREAM_DESCRIPTIONS,
+)
+
+# Time this rerun for the debug panel and the rerun_seconds metric
+timings = start_timings()
+rerun_start = time.perf_counter()
+if METRICS_PORT:
+    start_metrics_server(METRICS_PORT)
 
 # Set up the Streamlit page
 st.title("Who Sampled - Song Search")
@@ -14,17 +41,24 @@ st.write("Search for a song to find its samples and covers")
 
 # Initialize application state
 initialize_state()
+# Load the warm-start snapshot (once per process) if WARM_START_SNAPSHOT is set
+warm_start()
 
 # Render search input and get query
 search_query = render_search_input()
 
 # Handle search and get results
-results = handle_search(search_query)
+if SEARCH_PAGINATED:
+    results, has_more = handle_paginated_search(search_query, typeahead=SEARCH_TYPEAHEAD)
+else:
+    results, has_more = handle_search(search_query, typeahead=SEARCH_TYPEAHEAD), False
 
 # If we have results, render the song selector
 if results:
     selected_song_display, selected_id = render_song_selector(
-        results=results, current_song_id=get_selected_song_id()
+        results=results,
+        current_song_id=get_selected_song_id(),
+        load_more=load_more_search_results if has_more else None,
     )
     handle_song_selection(selected_song_display, selected_id)
 
@@ -32,31 +66,50 @@ if results:
     if selected_id:
         st.subheader("Sample Graph")
 
-        # Add a loading spinner while fetching and processing data
-        with st.spinner("Loading sample data and generating graph..."):
-            song_data = get_sampled_songs(selected_id)
-
-            if song_data:
-                # Generate and display the sample description
-                description = generate_sample_description(
-                    selected_song_display, song_data["sampled_songs"]
-                )
-                st.write(description)
-                st.write("---")  # Add a separator
-
-                # Create nodes and edges for the graph
-                nodes = [song["title"] for song in song_data["sampled_songs"]]
-                edges = [
-                    (selected_song_display, song["title"])
-                    for song in song_data["sampled_songs"]
-                ]
-
-                # Build and plot the graph
-                G = build_graph(song_data["main_song"], song_data["sampled_songs"])
-                fig = plot_graph(G)  # Get the figure object
-                st.plotly_chart(fig, use_container_width=True)  # Display in Streamlit
-            else:
-                st.write("No samples found for this song.")
+        graph_mode = render_graph_mode()
+        if graph_mode == "sampled_in":
+            # Songs that sample this one, read a page at a time from the local index
+            render_sampled_in(selected_id)
+        elif graph_mode == "explore":
+            # A graph that grows by one song's samples per click
+            render_exploration(selected_id)
+        else:
+            # Add a loading spinner while fetching and processing data
+            with st.spinner("Loading sample data and generating graph..."):
+                song_data = get_song_data(selected_id)
+
+                if song_data:
+                    if STREAM_DESCRIPTIONS:
+                        # Start the description now so it is generated while the graph renders
+                        description_stream = DescriptionStream(
+                            selected_song_display, song_data.sampled_songs
+                        )
+                        description_slot = st.container()
+                    else:
+                        # Generate and display the sample description
+                        description = generate_sample_description(
+                            selected_song_display, song_data.sampled_songs
+                        )
+                        st.write(description)
+                    st.write("---")  # Add a separator
+
+                    # Plot the graph, built once per song and shared across sessions
+                    fig = get_song_figure(selected_id)
+                    st.plotly_chart(fig, use_container_width=True)  # Display in Streamlit
+
+                    if STREAM_DESCRIPTIONS:
+                        # Show description tokens as they arrive, above the graph
+                        description_slot.write_stream(description_stream)
+                        if description_stream.error:
+                            description_slot.error(
+                                f"Unable to generate description: {description_stream.error}"
+                            )
+                else:
+                    st.write("No samples found for this song.")
 else:
     if search_query:  # Only show "no results" if there was a search query
         st.write("No results found. Try a different search term.")
+
+get_metrics().observe("rerun_seconds", time.perf_counter() - rerun_start)
+if DEBUG_PANEL:
+    render_debug_panel(timings)
@@ -0,0 +1,215 @@
+"""
+Local stand-in for the Genius API used by the benchmarks.
+
+Serves /search and /songs/{id} from recorded response fixtures (or a
+synthetic catalog) with configurable latency, 5xx error rate and 429
+injection, so client-side performance can be measured without the network.
+"""
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+def song_response(song_id: int, title: str, artist: str, year: int, samples) -> Dict:
+    """A /songs/{id} response body in the shape the Genius API returns."""
+    return {
+        "response": {
+            "song": {
+                "id": song_id,
+                "title": title,
+                "full_title": f"{title} by {artist}",
+                "artist_names": artist,
+                "release_date": f"{year}-01-01",
+                "primary_artist": {"name": artist},
+                "song_relationships": [
+                    {"type": "samples", "songs": list(samples)},
+                    {"type": "sampled_in", "songs": []},
+                ],
+            }
+        }
+    }
+
+
+def synthetic_fixtures(n_songs: int = 2000, samples_per_song: int = 5, seed: int = 0) -> Dict:
+    """
+    Generate a catalog where every song samples up to samples_per_song
+    older songs. Returns {"songs": {id: response}, "search": {}}.
+    """
+    rng = random.Random(seed)
+    words = ["love", "night", "city", "soul", "fire", "dream", "funk", "blue", "rain", "gold"]
+    meta = {}
+    for song_id in range(1, n_songs + 1):
+        title = f"{rng.choice(words).title()} {rng.choice(words).title()} {song_id}"
+        meta[song_id] = (title, f"Artist {song_id % 97}", 1960 + song_id * 60 // n_songs)
+
+    songs = {}
+    for song_id, (title, artist, year) in meta.items():
+        older = rng.sample(range(1, song_id), min(samples_per_song, song_id - 1))
+        samples = [
+            {
+                "id": sampled_id,
+                "title": meta[sampled_id][0],
+                "primary_artist": {"name": meta[sampled_id][1]},
+                "release_date_components": {"year": meta[sampled_id][2]},
+            }
+            for sampled_id in older
+        ]
+        songs[song_id] = song_response(song_id, title, artist, year, samples)
+    return {"songs": songs, "search": {}}
+
+
+def load_fixtures(path: str) -> Dict:
+    """
+    Load recorded responses: songs/<id>.json hold /songs/{id} bodies and
+    search/*.json hold {"q": query, "response": body} pairs.
+    """
+    fixtures = {"songs": {}, "search": {}}
+    songs_dir = os.path.join(path, "songs")
+    for name in os.listdir(songs_dir) if os.path.isdir(songs_dir) else []:
+        with open(os.path.join(songs_dir, name), encoding="utf-8") as f:
+            fixtures["songs"][int(os.path.splitext(name)[0])] = json.load(f)
+    search_dir = os.path.join(path, "search")
+    for name in os.listdir(search_dir) if os.path.isdir(search_dir) else []:
+        with open(os.path.join(search_dir, name), encoding="utf-8") as f:
+            recorded = json.load(f)
+        fixtures["search"][recorded["q"].lower()] = recorded["response"]
+    return fixtures
+
+
+class FakeGeniusServer:
+    """
+    Threaded HTTP server replaying fixtures on a free localhost port.
+    Every request waits latency seconds (plus up to jitter); error_rate of
+    them fail with 503 and rate_limit_rate with 429 and a Retry-After of
+    retry_after seconds. Use as a context manager; `url` is the base URL.
+    """
+
+    def __init__(
+        self,
+        fixtures: Optional[Dict] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 0.0,
+        seed: int = 0,
+    ):
+        self.fixtures = fixtures if fixtures is not None else synthetic_fixtures()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.requests = 0
+        self.injected = {"errors": 0, "rate_limited": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._titles = [
+            (body["response"]["song"]["full_title"], body["response"]["song"])
+            for body in self.fixtures["songs"].values()
+        ]
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGeniusServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _draw(self):
+        """Pick this request's injected failure (if any) and its delay."""
+        with self._lock:
+            self.requests += 1
+            roll = self._rng.random()
+            delay = self.latency + self._rng.random() * self.jitter
+            if roll < self.rate_limit_rate:
+                self.injected["rate_limited"] += 1
+                return 429, delay
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.injected["errors"] += 1
+                return 503, delay
+            return None, delay
+
+    def search(self, query: str, page: int, per_page: int) -> Dict:
+        recorded = self.fixtures["search"].get(query.lower())
+        if recorded is not None:
+            return recorded
+        words = query.lower().split()
+        matches = [
+            {"result": {"id": song["id"], "full_title": full_title}}
+            for full_title, song in self._titles
+            if all(word in full_title.lower() for word in words)
+        ]
+        start = (page - 1) * per_page
+        return {"response": {"hits": matches[start:start + per_page]}}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; without this, Nagle plus
+            # delayed ACKs add ~40 ms to every response
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                status, delay = server._draw()
+                if delay:
+                    time.sleep(delay)
+                if status is not None:
+                    headers = {"Retry-After": str(server.retry_after)} if status == 429 else {}
+                    return self._send(status, {"error": "injected"}, headers)
+
+                url = urlparse(self.path)
+                params = parse_qs(url.query)
+                if url.path == "/search":
+                    body = server.search(
+                        params.get("q", [""])[0],
+                        int(params.get("page", ["1"])[0]),
+                        int(params.get("per_page", ["10"])[0]),
+                    )
+                    return self._send(200, body)
+                if url.path.startswith("/songs/"):
+                    try:
+                        body = server.fixtures["songs"].get(int(url.path.rsplit("/", 1)[1]))
+                    except ValueError:
+                        body = None
+                    if body is not None:
+                        return self._send(200, body)
+                return self._send(404, {"meta": {"status": 404}})
+
+            def _send(self, status: int, body: Dict, headers: Optional[Dict] = None):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,282 @@
+"""
+Benchmark suite for the Genius client, song fetching and graph rendering.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --quick --compare results.json
+
+API benchmarks run against FakeGeniusServer with the response cache and
+sample store disabled, so every call pays the (simulated) network cost.
+Results are written as JSON; --compare reports p50 changes against an
+earlier run and exits non-zero when one regresses past --threshold.
+"""
+import os
+
+# Measure the uncached network path and keep injected-fault retries short.
+# These must be set before whosampled.config is imported.
+os.environ.setdefault("SAMPLE_STORE_ENABLED", "0")
+os.environ.setdefault("GENIUS_CACHE_ENABLED", "0")
+os.environ.setdefault("GENIUS_BACKOFF_BASE", "0.01")
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence
+
+from benchmarks.fake_genius import FakeGeniusServer, synthetic_fixtures
+from whosampled.api.cache import ResponseCache
+from whosampled.api.genius_client import GeniusClient, set_client, reset_client
+from whosampled.api.get_song_info import fetch_songs, get_sampled_songs
+from whosampled.api.rate_limit import CircuitBreaker, TokenBucket
+from whosampled.api.search import get_search_results
+from whosampled.config import GENIUS_MAX_CONCURRENCY
+from whosampled.utils.graph_utils import build_graph, plot_graph
+from whosampled.utils.layout import clear_layout_cache
+
+QUERIES = ["love", "night city", "soul fire", "dream", "funk blue", "rain gold", "blue", "fire"]
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of samples, q in [0, 100]."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(1, min(len(ordered), round(q / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+def summarize(
+    name: str, params: Dict, durations: List[float], wall: float, errors: int = 0,
+    items: Optional[int] = None,
+) -> Dict:
+    """Result record for one benchmark; items counts work units for throughput."""
+    items = len(durations) if items is None else items
+    return {
+        "name": name,
+        "params": params,
+        "ops": len(durations),
+        "errors": errors,
+        "wall_s": round(wall, 6),
+        "throughput_per_s": round(items / wall, 3) if wall else None,
+        "p50_ms": round(percentile(durations, 50) * 1000, 3),
+        "p99_ms": round(percentile(durations, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(durations) * 1000, 3) if durations else 0.0,
+    }
+
+
+def time_calls(fn: Callable, args: Sequence, concurrency: int = 1, warmup: int = 1):
+    """
+    Call fn(arg) for every arg on concurrency threads; return durations,
+    wall time and error count. The first warmup args are also called once
+    untimed, so lazy imports and connection setup are not measured.
+    """
+    errors = 0
+    for arg in args[:warmup]:
+        try:
+            fn(arg)
+        except Exception:
+            pass
+
+    def timed(arg):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            fn(arg)
+        except Exception:
+            errors += 1
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        durations = [timed(arg) for arg in args]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            durations = list(pool.map(timed, args))
+    return durations, time.perf_counter() - start, errors
+
+
+@contextmanager
+def bench_client(server: FakeGeniusServer, cache: Optional[ResponseCache] = None):
+    """Point the shared client at server with limits that never throttle."""
+    client = GeniusClient(
+        access_token="benchmark",
+        cache=cache,
+        rate_limiter=TokenBucket(rate=1e6, capacity=1e6),
+        circuit_breaker=CircuitBreaker(failure_threshold=10**6),
+        base_url=server.url,
+    )
+    set_client(client)
+    try:
+        yield client
+    finally:
+        reset_client()
+
+
+def bench_api(args) -> List[Dict]:
+    results = []
+    n = 50 if args.quick else 300
+    fixtures = synthetic_fixtures(n_songs=max(2 * n, 500))
+    song_ids = list(fixtures["songs"])[-n:]
+    queries = [QUERIES[i % len(QUERIES)] for i in range(n)]
+    server_params = {"latency_ms": args.latency * 1000, "jitter_ms": args.jitter * 1000}
+
+    with FakeGeniusServer(fixtures, latency=args.latency, jitter=args.jitter) as server:
+        with bench_client(server):
+            results.append(summarize(
+                "get_search_results", {**server_params, "cache": False},
+                *time_calls(get_search_results, queries),
+            ))
+        with bench_client(server, cache=ResponseCache()):
+            results.append(summarize(
+                "get_search_results", {**server_params, "cache": True},
+                *time_calls(get_search_results, queries),
+            ))
+        with bench_client(server):
+            results.append(summarize(
+                "get_sampled_songs", {**server_params, "concurrency": 1},
+                *time_calls(get_sampled_songs, song_ids),
+            ))
+            results.append(summarize(
+                "get_sampled_songs",
+                {**server_params, "concurrency": GENIUS_MAX_CONCURRENCY},
+                *time_calls(get_sampled_songs, song_ids, concurrency=GENIUS_MAX_CONCURRENCY),
+            ))
+            for batch in (10, 50) if args.quick else (10, 50, 200):
+                batches = [song_ids[i:i + batch] for i in range(0, len(song_ids), batch)]
+                durations, wall, errors = time_calls(fetch_songs, batches, warmup=0)
+                results.append(summarize(
+                    "fetch_songs", {**server_params, "batch": batch},
+                    durations, wall, errors, items=sum(len(b) for b in batches),
+                ))
+
+    fault_params = {
+        **server_params, "error_rate": args.error_rate, "rate_limit_rate": args.rate_limit_rate,
+    }
+    with FakeGeniusServer(
+        fixtures, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+    ) as server:
+        with bench_client(server):
+            result = summarize(
+                "get_sampled_songs_with_faults", fault_params,
+                *time_calls(get_sampled_songs, song_ids),
+            )
+            result["injected"] = dict(server.injected)
+            results.append(result)
+    return results
+
+
+def star_graph_input(size: int):
+    main_song = {"id": 0, "title": "Main Song", "artist": "Main Artist", "year": 2000}
+    sampled = [
+        {"id": i, "title": f"Sample {i}", "artist": f"Artist {i % 50}", "year": 1960 + i % 40}
+        for i in range(1, size)
+    ]
+    return main_song, sampled
+
+
+def bench_graphs(args) -> List[Dict]:
+    results = []
+    sizes = (10, 100, 1000) if args.quick else (10, 100, 1000, 5000)
+    repeats = 3 if args.quick else 10
+    for size in sizes:
+        main_song, sampled = star_graph_input(size)
+        results.append(summarize(
+            "build_graph", {"nodes": size},
+            *time_calls(lambda _: build_graph(main_song, sampled), list(range(repeats))),
+        ))
+        G = build_graph(main_song, sampled)
+
+        def plot(_):
+            clear_layout_cache()
+            plot_graph(G)
+
+        results.append(summarize("plot_graph", {"nodes": size}, *time_calls(plot, list(range(repeats)))))
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args) -> Dict:
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+            "backoff_base": os.environ["GENIUS_BACKOFF_BASE"],
+        },
+        "results": bench_api(args) + bench_graphs(args),
+    }
+
+
+def result_key(result: Dict) -> str:
+    return f"{result['name']} {json.dumps(result['params'], sort_keys=True)}"
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Print p50 changes against baseline; return the keys that regressed."""
+    before = {result_key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        key = result_key(result)
+        old = before.get(key)
+        if old is None or not old["p50_ms"]:
+            continue
+        change = result["p50_ms"] / old["p50_ms"] - 1
+        flag = " REGRESSION" if change > threshold else ""
+        print(f"{key}: p50 {old['p50_ms']:.2f} -> {result['p50_ms']:.2f} ms ({change:+.0%}){flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p50 slowdown")
+    parser.add_argument("--quick", action="store_true", help="Fewer calls and smaller graphs")
+    parser.add_argument("--latency", type=float, default=0.005, help="Server latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.002, help="Extra random latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Share of 503 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.05, help="Share of 429 responses")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    report = run_suite(args)
+
+    for result in report["results"]:
+        print(
+            f"{result_key(result):<70} p50 {result['p50_ms']:>9.2f} ms  "
+            f"p99 {result['p99_ms']:>9.2f} ms  {result['throughput_per_s'] or 0:>9.1f}/s"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
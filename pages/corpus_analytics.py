@@ -0,0 +1,3 @@
+from whosampled.components.analytics_view import render_analytics_view
+
+render_analytics_view()
@@ -9,7 +9,8 @@ setup(
         "python-dotenv>=1.0.1",
         "networkx>=3.2.1",
         "plotly>=5.18.0",
-        "streamlit>=1.32.0",
+        "numpy>=1.24",
+        "streamlit>=1.35.0",
     ],
     extras_require={
         "dev": [
@@ -18,6 +19,11 @@ setup(
             "pytest-cov>=4.1.0",
             "requests-mock>=1.12.0",
         ],
+        "parquet": ["pyarrow>=14.0"],
+        "speedups": ["orjson>=3.9"],
+    },
+    entry_points={
+        "console_scripts": ["whosampled=whosampled.cli:main"],
     },
     python_requires=">=3.8",
 ) 
\ No newline at end of file
@@ -0,0 +1,155 @@
+import time
+import pytest
+from unittest.mock import Mock, patch
+from whosampled.api.cache import (
+    CacheEntry,
+    LRUCache,
+    ResponseCache,
+    SQLiteCache,
+    make_cache_key,
+)
+from whosampled.api.genius_client import call_genius_api, get_cache_stats
+
+SAMPLE_RESPONSE = {"response": {"song": {"id": 123, "title": "Test Song"}}}
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def test_cache_key_normalizes_params():
+    """Test keys ignore param order, case and extra whitespace"""
+    assert make_cache_key("/search", {"q": "Ice  Ice Baby ", "page": 1}) == make_cache_key(
+        "/search", {"page": "1", "q": "ice ice baby"}
+    )
+    assert make_cache_key("/search", {"q": "a"}) != make_cache_key("/songs/{song_id}", {"q": "a"})
+
+
+def test_lru_evicts_least_recently_used():
+    """Test the memory tier is bounded by entry count"""
+    lru = LRUCache(max_entries=2)
+    entry = CacheEntry({}, 0, 0)
+    lru.set("a", entry)
+    lru.set("b", entry)
+    lru.get("a")
+    lru.set("c", entry)
+
+    assert lru.get("a") is not None
+    assert lru.get("b") is None
+    assert len(lru) == 2
+
+
+def test_sqlite_cache_roundtrip_and_persistence(tmp_path):
+    """Test entries survive reopening the store"""
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteCache(path)
+    cache.set("key", CacheEntry(SAMPLE_RESPONSE, 1.0, 2.0))
+    cache.close()
+
+    reopened = SQLiteCache(path)
+    assert reopened.get("key") == CacheEntry(SAMPLE_RESPONSE, 1.0, 2.0)
+    assert reopened.total_bytes > 0
+    reopened.close()
+
+
+def test_sqlite_cache_size_eviction(disk_cache):
+    """Test the disk tier evicts old rows once over its byte budget"""
+    disk_cache.max_bytes = 200
+    for i in range(10):
+        disk_cache.set(f"key{i}", CacheEntry({"payload": "x" * 40}, 0, 0))
+
+    assert disk_cache.total_bytes <= 200
+    assert disk_cache.evictions > 0
+    assert disk_cache.get("key9") is not None
+    assert disk_cache.get("key0") is None
+
+
+def test_sqlite_cache_batches_access_times(disk_cache):
+    """Test reads do not write, and buffered accesses still guide eviction"""
+    disk_cache.max_bytes = 250
+    for i in range(4):
+        disk_cache.set(f"key{i}", CacheEntry({"payload": "x" * 40}, 0, 0))
+    changes = disk_cache._conn.total_changes
+
+    assert disk_cache.get("key0") is not None
+    assert disk_cache._conn.total_changes == changes
+
+    disk_cache.set("key4", CacheEntry({"payload": "x" * 40}, 0, 0))
+    assert disk_cache.get("key0") is not None
+    assert disk_cache.get("key1") is None
+
+
+def test_response_cache_memory_hits_touch_disk(disk_cache):
+    """Test hits served from memory refresh the entry's disk access time"""
+    disk_cache.max_bytes = 250
+    cache = ResponseCache(disk=disk_cache)
+    for i in range(4):
+        cache.store("/search", f"key{i}", {"payload": "x" * 40})
+
+    assert cache.lookup("key0") is not None
+    cache.store("/search", "key4", {"payload": "x" * 40})
+    assert disk_cache.get("key0") is not None
+    assert disk_cache.get("key1") is None
+
+
+def test_response_cache_hit_and_miss(disk_cache):
+    """Test a second identical request is served from cache"""
+    cache = ResponseCache(disk=disk_cache)
+    fetch = Mock(return_value=SAMPLE_RESPONSE)
+
+    assert cache.get_or_fetch("/songs/{song_id}", {"song_id": 123}, fetch) == SAMPLE_RESPONSE
+    assert cache.get_or_fetch("/songs/{song_id}", {"song_id": 123}, fetch) == SAMPLE_RESPONSE
+    assert fetch.call_count == 1
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_response_cache_falls_back_to_disk(disk_cache):
+    """Test a memory miss is filled from the persistent tier"""
+    ResponseCache(disk=disk_cache).get_or_fetch("/search", {"q": "x"}, lambda: SAMPLE_RESPONSE)
+
+    fresh_process = ResponseCache(disk=disk_cache)
+    fetch = Mock()
+    assert fresh_process.get_or_fetch("/search", {"q": "x"}, fetch) == SAMPLE_RESPONSE
+    fetch.assert_not_called()
+
+
+def test_response_cache_stale_while_revalidate():
+    """Test expired entries are served while a refresh runs in the background"""
+    cache = ResponseCache(ttls={"/search": 0}, stale_ttl=60)
+    cache.get_or_fetch("/search", {"q": "x"}, lambda: {"version": 1})
+
+    result = cache.get_or_fetch("/search", {"q": "x"}, lambda: {"version": 2})
+    assert result == {"version": 1}
+
+    deadline = time.time() + 2
+    while cache.stats()["refreshes"] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.lookup(make_cache_key("/search", {"q": "x"})).value == {"version": 2}
+
+
+def test_response_cache_refetches_after_stale_window():
+    """Test entries past the stale window are fetched synchronously"""
+    cache = ResponseCache(ttls={"/search": 0}, stale_ttl=0)
+    cache.get_or_fetch("/search", {"q": "x"}, lambda: {"version": 1})
+
+    assert cache.get_or_fetch("/search", {"q": "x"}, lambda: {"version": 2}) == {"version": 2}
+    assert cache.stats()["misses"] == 2
+
+
+def test_call_genius_api_uses_cache():
+    """Test the shared client only hits the network once per endpoint+params"""
+    mock_response = Mock()
+    mock_response.json.return_value = SAMPLE_RESPONSE
+    with patch('requests.Session.get', return_value=mock_response) as mock_get:
+        call_genius_api("/songs/{song_id}", song_id=123)
+        call_genius_api("/songs/{song_id}", song_id=123)
+
+        mock_get.assert_called_once()
+        assert get_cache_stats()["hits"] == 1
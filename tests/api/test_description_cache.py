@@ -0,0 +1,196 @@
+import threading
+import pytest
+from unittest.mock import patch, Mock
+from whosampled.api import get_song_info
+from whosampled.api.description_cache import description_cache_key
+from whosampled.api.get_song_info import (
+    DescriptionStream,
+    generate_sample_description,
+    stream_sample_description,
+    get_openai_client,
+    FALLBACK_MODEL,
+    PRIMARY_MODEL,
+)
+
+SAMPLED_SONGS = [
+    {"id": 2, "title": "Under Pressure", "artist": "Queen & David Bowie", "year": 1981},
+    {"id": 3, "title": "Other Song", "artist": "Someone", "year": 1975},
+]
+
+
+def completion(text):
+    result = Mock()
+    result.choices = [Mock()]
+    result.choices[0].message.content = text
+    return result
+
+
+@pytest.fixture
+def openai_client(monkeypatch):
+    """Install a mock OpenAI client as the shared client"""
+    client = Mock()
+    client.chat.completions.create.return_value = completion("A description.")
+    monkeypatch.setattr(get_song_info, "_openai_client", client)
+    return client
+
+
+def test_cache_key_is_order_insensitive_and_model_specific():
+    """Test the key depends on sampled IDs as a set, the model and the prompt"""
+    key = description_cache_key("Song", SAMPLED_SONGS, "gpt-4", "prompt")
+    assert key == description_cache_key("Song", SAMPLED_SONGS[::-1], "gpt-4", "prompt")
+    assert key != description_cache_key("Song", SAMPLED_SONGS, "gpt-3.5-turbo", "prompt")
+    assert key != description_cache_key("Song", SAMPLED_SONGS, "gpt-4", "new prompt")
+    assert key != description_cache_key("Song", SAMPLED_SONGS[:1], "gpt-4", "prompt")
+
+
+def test_description_generated_once(openai_client):
+    """Test a repeated request is served from the cache"""
+    assert generate_sample_description("Ice Ice Baby", SAMPLED_SONGS) == "A description."
+    assert generate_sample_description("Ice Ice Baby", SAMPLED_SONGS[::-1]) == "A description."
+
+    openai_client.chat.completions.create.assert_called_once()
+    assert openai_client.chat.completions.create.call_args.kwargs["model"] == PRIMARY_MODEL
+
+
+def test_fallback_description_is_cached(openai_client):
+    """Test descriptions from the fallback model are cached too"""
+    openai_client.chat.completions.create.side_effect = [
+        Exception("model unavailable"),
+        completion("Fallback description."),
+    ]
+    with patch("whosampled.api.get_song_info.st"):
+        first = generate_sample_description("Ice Ice Baby", SAMPLED_SONGS)
+    second = generate_sample_description("Ice Ice Baby", SAMPLED_SONGS)
+
+    assert first == second == "Fallback description."
+    assert openai_client.chat.completions.create.call_count == 2
+    assert openai_client.chat.completions.create.call_args.kwargs["model"] == FALLBACK_MODEL
+
+
+def test_expired_description_is_regenerated(openai_client, description_cache):
+    """Test entries past their TTL are not served"""
+    description_cache.ttl = 0
+    generate_sample_description("Ice Ice Baby", SAMPLED_SONGS)
+    generate_sample_description("Ice Ice Baby", SAMPLED_SONGS)
+
+    assert openai_client.chat.completions.create.call_count == 2
+
+
+def test_openai_client_is_reused():
+    """Test the OpenAI client is created once"""
+    with patch("openai.OpenAI") as mock_openai, \
+            patch("whosampled.api.get_song_info.st") as mock_st:
+        mock_st.secrets = {"openai_api_key": "key"}
+        assert get_openai_client() is get_openai_client()
+
+    mock_openai.assert_called_once_with(api_key="key")
+
+
+def stream_chunks(*texts):
+    """Build mock streaming chunks carrying the given deltas"""
+    chunks = []
+    for text in texts:
+        chunk = Mock()
+        chunk.choices = [Mock()]
+        chunk.choices[0].delta.content = text
+        chunks.append(chunk)
+    return iter(chunks)
+
+
+def test_fallback_decision_is_remembered(openai_client):
+    """Test a failed primary model is skipped on later requests"""
+    openai_client.chat.completions.create.side_effect = [
+        Exception("model unavailable"),
+        completion("First."),
+        completion("Second."),
+    ]
+    with patch("whosampled.api.get_song_info.st"):
+        generate_sample_description("Song A", SAMPLED_SONGS)
+        generate_sample_description("Song B", SAMPLED_SONGS)
+
+    models = [c.kwargs["model"] for c in openai_client.chat.completions.create.call_args_list]
+    assert models == [PRIMARY_MODEL, FALLBACK_MODEL, FALLBACK_MODEL]
+
+
+def test_primary_model_retried_after_ttl(openai_client):
+    """Test the primary model is tried again once the fallback period ends"""
+    get_song_info.mark_model_unavailable(PRIMARY_MODEL, ttl=0)
+    generate_sample_description("Song A", SAMPLED_SONGS)
+
+    assert openai_client.chat.completions.create.call_args.kwargs["model"] == PRIMARY_MODEL
+
+
+def test_stream_yields_tokens_and_caches(openai_client):
+    """Test streamed chunks are yielded as they arrive and cached when complete"""
+    openai_client.chat.completions.create.return_value = stream_chunks("A ", None, "streamed ", "text.")
+
+    assert list(stream_sample_description("Song", SAMPLED_SONGS)) == ["A ", "streamed ", "text."]
+    assert openai_client.chat.completions.create.call_args.kwargs["stream"] is True
+    assert list(stream_sample_description("Song", SAMPLED_SONGS)) == ["A streamed text."]
+    openai_client.chat.completions.create.assert_called_once()
+
+
+def test_description_stream_runs_in_background(openai_client):
+    """Test the description request starts before anyone iterates"""
+    started = threading.Event()
+
+    def create(**kwargs):
+        started.set()
+        return stream_chunks("Hello ", "world.")
+
+    openai_client.chat.completions.create.side_effect = create
+    stream = DescriptionStream("Song", SAMPLED_SONGS)
+
+    assert started.wait(timeout=2)
+    assert "".join(stream) == "Hello world."
+    assert stream.error is None
+
+
+def test_description_stream_resolves_client_on_calling_thread(openai_client, metrics):
+    """Test the worker thread never creates the client (which reads st.secrets)"""
+    openai_client.chat.completions.create.return_value = stream_chunks("Hello ", "world.")
+    threads = []
+
+    def get_client():
+        threads.append(threading.current_thread())
+        return openai_client
+
+    with patch.object(get_song_info, "get_openai_client", side_effect=get_client):
+        assert "".join(DescriptionStream("Song", SAMPLED_SONGS)) == "Hello world."
+
+    assert threads == [threading.current_thread()]
+    assert metrics.counter_value("description_stream_chunks_total", model=PRIMARY_MODEL) == 2
+
+
+def test_description_stream_reports_missing_client():
+    """Test a client that cannot be created is reported on the stream"""
+    with patch.object(get_song_info, "get_openai_client", side_effect=KeyError("openai_api_key")):
+        stream = DescriptionStream("Song", SAMPLED_SONGS)
+
+    assert list(stream) == []
+    assert "openai_api_key" in str(stream.error)
+
+
+def test_description_stream_captures_errors(openai_client):
+    """Test failures are reported on the stream instead of raised in the thread"""
+    openai_client.chat.completions.create.side_effect = Exception("no models")
+    stream = DescriptionStream("Song", SAMPLED_SONGS)
+
+    assert list(stream) == []
+    assert "no models" in str(stream.error)
+
+
+def test_description_metrics(openai_client, metrics):
+    """Test model, token usage and latency are recorded"""
+    result = completion("A description.")
+    result.usage = Mock(prompt_tokens=40, completion_tokens=25)
+    openai_client.chat.completions.create.return_value = result
+    generate_sample_description("Ice Ice Baby", SAMPLED_SONGS)
+    generate_sample_description("Ice Ice Baby", SAMPLED_SONGS)
+
+    assert metrics.histogram_count("description_seconds", mode="complete", model=PRIMARY_MODEL) == 1
+    assert metrics.counter_value("description_tokens_total", model=PRIMARY_MODEL, kind="prompt") == 40
+    assert metrics.counter_value(
+        "description_tokens_total", model=PRIMARY_MODEL, kind="completion"
+    ) == 25
+    assert metrics.counter_value("description_requests_total", model="cache", mode="complete") == 1
@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import patch, Mock
-from whosampled.api.genius_client import call_genius_api, BASE_URL
+from whosampled.api.genius_client import call_genius_api, get_client, GeniusClient, BASE_URL
 
 # Sample response data for testing
 SAMPLE_SONG_RESPONSE = {
@@ -36,7 +36,7 @@ def mock_response():
 
 def test_call_genius_api_success(mock_response):
     """Test successful API call"""
-    with patch('requests.get', return_value=mock_response) as mock_get:
+    with patch('requests.Session.get', return_value=mock_response) as mock_get:
         result = call_genius_api("/songs/{song_id}", song_id=123)
         
         # Verify the result
@@ -47,12 +47,12 @@ def test_call_genius_api_success(mock_response):
         mock_get.assert_called_once()
         args, kwargs = mock_get.call_args
         assert args[0] == f"{BASE_URL}/songs/123"
-        assert "headers" in kwargs
         assert "params" in kwargs
+        assert "timeout" in kwargs
 
 def test_call_genius_api_without_song_id(mock_response):
     """Test API call without song_id parameter"""
-    with patch('requests.get', return_value=mock_response) as mock_get:
+    with patch('requests.Session.get', return_value=mock_response) as mock_get:
         result = call_genius_api("/search", q="test song")
         
         # Verify the result
@@ -66,7 +66,7 @@ def test_call_genius_api_without_song_id(mock_response):
 
 def test_call_genius_api_error():
     """Test API call error handling"""
-    with patch('requests.get', side_effect=Exception("API Error")) as mock_get:
+    with patch('requests.Session.get', side_effect=Exception("API Error")) as mock_get:
         with pytest.raises(Exception) as exc_info:
             call_genius_api("/songs/{song_id}", song_id=123)
         
@@ -75,7 +75,7 @@ def test_call_genius_api_error():
 
 def test_call_genius_api_with_query_params(mock_response):
     """Test API call with query parameters"""
-    with patch('requests.get', return_value=mock_response) as mock_get:
+    with patch('requests.Session.get', return_value=mock_response) as mock_get:
         params = {"q": "test", "per_page": 10, "page": 1}
         result = call_genius_api("/search", **params)
         
@@ -86,7 +86,7 @@ def test_call_genius_api_with_query_params(mock_response):
 
 def test_call_genius_api_url_formatting():
     """Test URL formatting with different endpoints"""
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
         # Test with song_id
         call_genius_api("/songs/{song_id}", song_id=123)
         args, _ = mock_get.call_args
@@ -101,4 +101,21 @@ def test_call_genius_api_url_formatting():
         call_genius_api("/artists/{artist_id}/songs/{song_id}", 
                        artist_id=456, song_id=123)
         args, _ = mock_get.call_args
-        assert args[0] == f"{BASE_URL}/artists/456/songs/123" 
\ No newline at end of file
+        assert args[0] == f"{BASE_URL}/artists/456/songs/123"
+
+def test_client_is_shared():
+    """Test the pooled client is created once and reused"""
+    assert get_client() is get_client()
+
+def test_client_session_configuration():
+    """Test pool size, keep-alive, compression and auth headers on the session"""
+    client = GeniusClient(access_token="token", pool_size=5, keep_alive=False,
+                          connect_timeout=1.0, read_timeout=2.0, compression=False)
+    adapter = client.session.get_adapter(BASE_URL)
+
+    assert adapter._pool_maxsize == 5
+    assert client.timeout == (1.0, 2.0)
+    assert client.session.headers["Authorization"] == "Bearer token"
+    assert client.session.headers["Connection"] == "close"
+    assert client.session.headers["Accept-Encoding"] == "identity"
+    client.close()
@@ -0,0 +1,141 @@
+import threading
+import time
+from unittest.mock import patch, Mock
+from whosampled.api.get_song_info import (
+    fetch_songs,
+    get_sampled_in_page,
+    get_sampled_songs,
+    iter_sampled_in,
+)
+
+
+def make_song_response(song_id, samples=(), sampled_in=()):
+    """Build a minimal /songs/{song_id} response sampling (and sampled in) the given IDs"""
+    return {
+        "response": {
+            "song": {
+                "id": song_id,
+                "title": f"Song {song_id}",
+                "release_date": "1990-05-01",
+                "primary_artist": {"name": f"Artist {song_id}"},
+                "song_relationships": [
+                    {
+                        "type": "samples",
+                        "songs": [
+                            {
+                                "id": sample_id,
+                                "title": f"Song {sample_id}",
+                                "primary_artist": {"name": f"Artist {sample_id}"},
+                                "release_date_components": {"year": 1970},
+                            }
+                            for sample_id in samples
+                        ],
+                    },
+                    {
+                        "type": "sampled_in",
+                        "songs": [
+                            {
+                                "id": sampling_id,
+                                "title": f"Song {sampling_id}",
+                                "primary_artist": {"name": f"Artist {sampling_id}"},
+                                "release_date_components": {"year": 2000 + sampling_id % 10},
+                            }
+                            for sampling_id in sampled_in
+                        ],
+                    },
+                ],
+            }
+        }
+    }
+
+
+def mock_songs_api(responses, delay=0.0):
+    """Return a requests.Session.get side effect serving responses by song ID"""
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def fake_get(url, **kwargs):
+        song_id = int(url.rsplit("/", 1)[1])
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(delay)
+        with lock:
+            state["active"] -= 1
+        if song_id not in responses:
+            raise Exception("API Error: not found")
+        response = Mock()
+        response.json.return_value = responses[song_id]
+        return response
+
+    return fake_get, state
+
+
+def test_get_sampled_songs_parses_samples():
+    """Test the main song and its samples are extracted"""
+    fake_get, _ = mock_songs_api({1: make_song_response(1, samples=[2, 3])})
+    with patch('requests.Session.get', side_effect=fake_get):
+        result = get_sampled_songs(1)
+
+    assert result.main_song.to_dict() == {"id": 1, "title": "Song 1", "artist": "Artist 1", "year": 1990}
+    assert [song["id"] for song in result["sampled_songs"]] == [2, 3]
+    assert result["sampled_songs"][0]["year"] == 1970
+
+
+def test_fetch_songs_matches_get_sampled_songs():
+    """Test batch fetching returns records in input order and in the same shape"""
+    responses = {i: make_song_response(i, samples=[i + 100]) for i in range(1, 6)}
+    fake_get, _ = mock_songs_api(responses)
+    with patch('requests.Session.get', side_effect=fake_get):
+        results = fetch_songs([3, 1, 5])
+        expected = get_sampled_songs(1)
+
+    assert [r["main_song"]["id"] for r in results] == [3, 1, 5]
+    assert results[1] == expected
+
+
+def test_fetch_songs_respects_concurrency_cap():
+    """Test no more than max_concurrency requests are in flight"""
+    responses = {i: make_song_response(i) for i in range(20)}
+    fake_get, state = mock_songs_api(responses, delay=0.02)
+    with patch('requests.Session.get', side_effect=fake_get):
+        results = fetch_songs(range(20), max_concurrency=4)
+
+    assert len(results) == 20
+    assert 1 < state["peak"] <= 4
+
+
+def test_fetch_songs_failed_song_is_none():
+    """Test a failing song does not abort the batch"""
+    fake_get, _ = mock_songs_api({1: make_song_response(1)})
+    with patch('requests.Session.get', side_effect=fake_get):
+        results = fetch_songs([1, 2])
+
+    assert results[0]["main_song"]["id"] == 1
+    assert results[1] is None
+
+
+def test_sampled_in_pages_come_from_local_index(sample_store):
+    """Test "sampled in" pages need one fetch and are ordered oldest first"""
+    fake_get, _ = mock_songs_api({1: make_song_response(1, sampled_in=range(100, 125))})
+    with patch('requests.Session.get', side_effect=fake_get) as mock_get:
+        first, more = get_sampled_in_page(1, page=1, per_page=10)
+        last, last_more = get_sampled_in_page(1, page=3, per_page=10)
+        streamed = list(iter_sampled_in(1, per_page=10))
+
+    assert mock_get.call_count == 1
+    assert more and not last_more
+    assert len(first) == 10 and len(last) == 5
+    assert [(song.year, song.id) for song in streamed] == sorted(
+        (2000 + i % 10, i) for i in range(100, 125)
+    )
+
+
+def test_sampled_in_without_store():
+    """Test "sampled in" pages are sliced from the response when the store is off"""
+    fake_get, _ = mock_songs_api({1: make_song_response(1, sampled_in=[5, 3, 4])})
+    with patch('requests.Session.get', side_effect=fake_get), \
+            patch('whosampled.api.get_song_info.get_store', return_value=None):
+        songs, more = get_sampled_in_page(1, page=1, per_page=2)
+    assert [song.id for song in songs] == [3, 4]
+    assert more
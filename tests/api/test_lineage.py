@@ -0,0 +1,78 @@
+from unittest.mock import patch
+from whosampled.api.lineage import crawl_sample_lineage
+from whosampled.utils.graph_utils import build_lineage_graph, plot_graph
+from tests.api.test_get_song_info import make_song_response, mock_songs_api
+
+# 1 samples 2 and 3, 2 samples 4, 3 samples 4 and 5, 4 samples 6
+LINEAGE = {
+    1: make_song_response(1, samples=[2, 3]),
+    2: make_song_response(2, samples=[4]),
+    3: make_song_response(3, samples=[4, 5]),
+    4: make_song_response(4, samples=[6]),
+    5: make_song_response(5),
+    6: make_song_response(6),
+}
+
+
+def test_crawl_depth_one_matches_single_hop():
+    """Test depth 1 only fetches the root song"""
+    fake_get, _ = mock_songs_api(LINEAGE)
+    with patch('requests.Session.get', side_effect=fake_get) as mock_get:
+        lineage = crawl_sample_lineage(1, max_depth=1)
+
+    assert mock_get.call_count == 1
+    assert lineage["main_song"]["id"] == 1
+    assert set(lineage["songs"]) == {1, 2, 3}
+    assert lineage["edges"] == [(1, 2), (1, 3)]
+
+
+def test_crawl_deduplicates_and_never_refetches():
+    """Test shared samples are fetched once and recorded with their shortest depth"""
+    fake_get, _ = mock_songs_api(LINEAGE)
+    with patch('requests.Session.get', side_effect=fake_get) as mock_get:
+        lineage = crawl_sample_lineage(1, max_depth=3)
+
+    fetched_urls = [call.args[0] for call in mock_get.call_args_list]
+    assert len(fetched_urls) == len(set(fetched_urls)) == 5
+    assert set(lineage["songs"]) == {1, 2, 3, 4, 5, 6}
+    assert lineage["songs"][4]["depth"] == 2
+    assert sorted(lineage["edges"]) == [(1, 2), (1, 3), (2, 4), (3, 4), (3, 5), (4, 6)]
+
+
+def test_crawl_respects_node_budget():
+    """Test the crawl stops adding songs once max_nodes is reached"""
+    fake_get, _ = mock_songs_api(LINEAGE)
+    with patch('requests.Session.get', side_effect=fake_get):
+        lineage = crawl_sample_lineage(1, max_depth=3, max_nodes=3)
+
+    assert set(lineage["songs"]) == {1, 2, 3}
+    assert all(a in lineage["songs"] and b in lineage["songs"] for a, b in lineage["edges"])
+
+
+def test_lineage_graph_renders():
+    """Test a crawled lineage can be built and plotted"""
+    fake_get, _ = mock_songs_api(LINEAGE)
+    with patch('requests.Session.get', side_effect=fake_get):
+        lineage = crawl_sample_lineage(1, max_depth=3)
+
+    G = build_lineage_graph(lineage)
+    assert G.number_of_nodes() == 6
+    assert G.number_of_edges() == 6
+    assert G.nodes["Song 4"]["depth"] == 2
+
+    fig = plot_graph(G)
+    assert len(fig.data) == 2
+
+
+def test_lineage_graph_keeps_same_title_and_artist_apart():
+    """Test songs sharing both title and artist stay separate nodes"""
+    song = {"title": "Intro", "artist": "Same Artist", "year": None, "depth": 1}
+    lineage = {
+        "songs": {1: {**song, "title": "Main", "depth": 0}, 2: dict(song), 3: dict(song), 4: dict(song)},
+        "edges": [(1, 2), (1, 3), (1, 4)],
+    }
+    G = build_lineage_graph(lineage)
+
+    assert G.number_of_nodes() == 4
+    assert G.number_of_edges() == 3
+    assert sorted(G.nodes[label]["id"] for label in G.successors("Main")) == [2, 3, 4]
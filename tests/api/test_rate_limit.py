@@ -0,0 +1,166 @@
+import time
+import pytest
+import requests
+from unittest.mock import patch, Mock
+from whosampled.api.genius_client import GeniusClient, GeniusAPIError
+from whosampled.api.rate_limit import (
+    CircuitBreaker,
+    TokenBucket,
+    backoff_delay,
+    parse_retry_after,
+)
+
+SAMPLE_RESPONSE = {"response": {"song": {"id": 123}}}
+
+
+def make_response(status_code, headers=None):
+    """Build a mock response whose raise_for_status mirrors requests"""
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = SAMPLE_RESPONSE
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            f"{status_code} Error", response=response
+        )
+    return response
+
+
+@pytest.fixture
+def client():
+    client = GeniusClient(
+        rate_limiter=TokenBucket(rate=1000, capacity=1000),
+        circuit_breaker=CircuitBreaker(failure_threshold=3, reset_timeout=60),
+        max_retries=2,
+    )
+    yield client
+    client.close()
+
+
+def test_token_bucket_limits_rate():
+    """Test tokens beyond the burst are handed out at the refill rate"""
+    bucket = TokenBucket(rate=50, capacity=2)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.05
+
+
+def test_token_bucket_timeout_and_pause():
+    """Test acquire gives up after its timeout while the bucket is paused"""
+    bucket = TokenBucket(rate=1000, capacity=10)
+    bucket.pause(10)
+    assert bucket.acquire(timeout=0.01) is False
+
+
+def test_backoff_delay_is_bounded():
+    """Test jittered backoff never exceeds the exponential bound or cap"""
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, base=0.5, cap=4) <= min(4, 0.5 * 2 ** attempt)
+
+
+def test_parse_retry_after():
+    """Test Retry-After in seconds and HTTP-date form"""
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    """Test the breaker opens after repeated failures and lets a trial through later"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.01)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.02)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_retries_429_honoring_retry_after(client):
+    """Test a 429 is retried after the server-provided delay"""
+    responses = [make_response(429, {"Retry-After": "1.5"}), make_response(200)]
+    with patch('requests.Session.get', side_effect=responses) as mock_get, \
+            patch.object(client.rate_limiter, 'pause') as mock_pause:
+        assert client.fetch("/songs/{song_id}", song_id=123) == SAMPLE_RESPONSE
+
+    assert mock_get.call_count == 2
+    mock_pause.assert_called_once_with(1.5)
+
+
+def test_retries_server_errors_then_gives_up(client):
+    """Test 5xx responses are retried up to max_retries"""
+    with patch('requests.Session.get', return_value=make_response(503)) as mock_get, \
+            patch('whosampled.api.genius_client.time.sleep'):
+        with pytest.raises(GeniusAPIError) as exc_info:
+            client.fetch("/songs/{song_id}", song_id=123)
+
+    assert "API Error" in str(exc_info.value)
+    assert exc_info.value.status_code == 503
+    assert mock_get.call_count == 3
+
+
+def test_client_errors_are_not_retried(client):
+    """Test a 404 fails immediately"""
+    with patch('requests.Session.get', return_value=make_response(404)) as mock_get:
+        with pytest.raises(GeniusAPIError):
+            client.fetch("/songs/{song_id}", song_id=123)
+    assert mock_get.call_count == 1
+
+
+def test_connection_errors_are_retried(client):
+    """Test transient network errors are retried"""
+    side_effect = [requests.exceptions.ConnectionError("reset"), make_response(200)]
+    with patch('requests.Session.get', side_effect=side_effect) as mock_get, \
+            patch('whosampled.api.genius_client.time.sleep'):
+        assert client.fetch("/search", q="x") == SAMPLE_RESPONSE
+    assert mock_get.call_count == 2
+
+
+def test_open_circuit_fails_fast(client):
+    """Test no request is sent while the circuit is open"""
+    for _ in range(3):
+        client.circuit_breaker.record_failure()
+    with patch('requests.Session.get') as mock_get:
+        with pytest.raises(GeniusAPIError) as exc_info:
+            client.fetch("/search", q="x")
+    assert "circuit open" in str(exc_info.value)
+    mock_get.assert_not_called()
+
+
+def half_open(client):
+    """Trip the client's breaker and let its reset timeout lapse"""
+    client.circuit_breaker.reset_timeout = 0.01
+    for _ in range(3):
+        client.circuit_breaker.record_failure()
+    time.sleep(0.02)
+
+
+def test_rate_limited_trial_reopens_circuit(client):
+    """Test a 429 on the half-open trial reopens the circuit instead of wedging it"""
+    half_open(client)
+    with patch('requests.Session.get', return_value=make_response(429)) as mock_get, \
+            patch.object(client.rate_limiter, 'pause'):
+        with pytest.raises(GeniusAPIError):
+            client.fetch("/search", q="x")
+    assert mock_get.call_count == 1
+    assert client.circuit_breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.02)
+    with patch('requests.Session.get', return_value=make_response(200)):
+        assert client.fetch("/search", q="x") == SAMPLE_RESPONSE
+    assert client.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+def test_request_error_on_trial_reopens_circuit(client):
+    """Test a non-HTTP request error on the half-open trial frees the trial slot"""
+    half_open(client)
+    with patch('requests.Session.get', side_effect=requests.exceptions.InvalidURL("bad")):
+        with pytest.raises(GeniusAPIError):
+            client.fetch("/search", q="x")
+    assert client.circuit_breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,72 @@
+import pickle
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+from whosampled.api.genius_client import decode_response
+from whosampled.api.records import (
+    SampleRecord,
+    SongRecord,
+    parse_sample_record,
+    slim_song_response,
+)
+from tests.api.test_get_song_info import make_song_response
+
+
+def full_song_response():
+    data = make_song_response(1, samples=[2, 3])
+    song = data["response"]["song"]
+    song["description"] = {"dom": {"children": ["x" * 5000]}}
+    song["media"] = [{"provider": "youtube", "url": "https://example.com"}]
+    song["stats"] = {"pageviews": 123}
+    song["artist_names"] = "Artist 1"
+    for sampled in song["song_relationships"][0]["songs"]:
+        sampled["header_image_url"] = "https://example.com/image.jpg"
+    return data
+
+
+def test_slim_response_keeps_only_needed_fields():
+    """Test slimming drops unused fields but parses to the same record"""
+    data = full_song_response()
+    slim = slim_song_response(data)
+
+    song = slim["response"]["song"]
+    assert set(song) == {"id", "title", "artist_names", "release_date", "primary_artist",
+                         "song_relationships"}
+    assert "header_image_url" not in song["song_relationships"][0]["songs"][0]
+    assert parse_sample_record(1, slim) == parse_sample_record(1, data)
+    assert len(pickle.dumps(slim)) < len(pickle.dumps(data)) / 10
+
+
+def test_slim_response_passes_other_shapes_through():
+    """Test unexpected bodies are returned unchanged"""
+    assert slim_song_response({"meta": {"status": 404}}) == {"meta": {"status": 404}}
+
+
+def test_records_support_mapping_reads_and_pickle():
+    """Test records read like the old dicts and round-trip through pickle"""
+    record = parse_sample_record(1, make_song_response(1, samples=[2]))
+    assert record["main_song"]["title"] == record.main_song.title == "Song 1"
+    assert record["sampled_songs"][0].get("year") == 1970
+    assert record.main_song.get("depth", 0) == 0
+    assert pickle.loads(pickle.dumps(record)) == record
+    assert SampleRecord.from_dict(record.to_dict()) == record
+
+
+def test_song_record_is_smaller_than_dict():
+    """Test a slotted record takes less memory than the dict it replaces"""
+    song = {"id": 1, "title": "Song", "artist": "Artist", "year": 1990}
+    assert sys.getsizeof(SongRecord.from_dict(song)) < sys.getsizeof(song)
+    assert not hasattr(SongRecord.from_dict(song), "__dict__")
+
+
+def test_decode_response_prefers_raw_bytes():
+    """Test bodies are decoded from bytes, falling back to response.json()"""
+    pytest.importorskip("orjson")
+    response = Mock(content=b'{"response": {"hits": []}}')
+    assert decode_response(response) == {"response": {"hits": []}}
+
+    mocked = Mock()
+    mocked.json.return_value = {"ok": True}
+    assert decode_response(mocked) == {"ok": True}
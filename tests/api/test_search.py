@@ -1,6 +1,12 @@
 import pytest
 from unittest.mock import patch, Mock
-from whosampled.api.search import get_search_results, search_song
+from whosampled.api.search import (
+    get_search_page,
+    get_search_results,
+    iter_search_results,
+    lookup_song_id,
+    search_song,
+)
 
 # Sample response data for testing
 SAMPLE_SEARCH_RESPONSE = {
@@ -33,7 +39,7 @@ def mock_search_response():
 
 def test_get_search_results_success(mock_search_response):
     """Test successful search results for dropdown menu"""
-    with patch('requests.get', return_value=mock_search_response) as mock_get:
+    with patch('requests.Session.get', return_value=mock_search_response) as mock_get:
         results = get_search_results("test song")
         
         # Verify the results
@@ -58,19 +64,19 @@ def test_get_search_results_no_results(mock_search_response):
     """Test search with no results"""
     mock_search_response.json.return_value = {"response": {"hits": []}}
     
-    with patch('requests.get', return_value=mock_search_response):
+    with patch('requests.Session.get', return_value=mock_search_response):
         results = get_search_results("nonexistent song")
         assert results == []
 
 def test_get_search_results_error():
     """Test search error handling"""
-    with patch('requests.get', side_effect=Exception("API Error")):
+    with patch('requests.Session.get', side_effect=Exception("API Error")):
         results = get_search_results("test song")
         assert results == []
 
 def test_search_song_success(mock_search_response):
     """Test successful song search"""
-    with patch('requests.get', return_value=mock_search_response) as mock_get:
+    with patch('requests.Session.get', return_value=mock_search_response) as mock_get:
         song_id = search_song("Test Song")
         assert song_id == 123
         assert mock_get.call_count == 1
@@ -79,14 +85,64 @@ def test_search_song_no_match(mock_search_response):
     """Test search with no matching results"""
     mock_search_response.json.return_value = {"response": {"hits": []}}
     
-    with patch('requests.get', return_value=mock_search_response) as mock_get:
+    with patch('requests.Session.get', return_value=mock_search_response) as mock_get:
         song_id = search_song("nonexistent song")
         assert song_id is None
         assert mock_get.call_count == 1
 
 def test_search_song_error():
     """Test search error handling"""
-    with patch('requests.get', side_effect=Exception("API Error")) as mock_get:
+    with patch('requests.Session.get', side_effect=Exception("API Error")) as mock_get:
         song_id = search_song("test song")
         assert song_id is None
-        assert mock_get.call_count == 1 
\ No newline at end of file
+        assert mock_get.call_count == 1 
+
+def test_lookup_song_id_raises_errors(mock_search_response):
+    """Test lookup_song_id returns the top hit but lets API errors through"""
+    with patch('requests.Session.get', return_value=mock_search_response):
+        assert lookup_song_id("Test Song") == 123
+    with patch('requests.Session.get', side_effect=Exception("API Error")):
+        with pytest.raises(Exception, match="API Error"):
+            lookup_song_id("other song")
+
+def make_page(start, count):
+    """Build a mock search response with count hits starting at ID start"""
+    mock = Mock()
+    mock.json.return_value = {
+        "response": {
+            "hits": [
+                {"result": {"id": i, "full_title": f"Song {i}"}}
+                for i in range(start, start + count)
+            ]
+        }
+    }
+    return mock
+
+def test_iter_search_results_streams_pages():
+    """Test pages are requested lazily and stop at a short page"""
+    pages = [make_page(1, 2), make_page(3, 1)]
+    with patch('requests.Session.get', side_effect=pages) as mock_get:
+        results = iter_search_results("song", per_page=2)
+        assert next(results) == ("Song 1", 1)
+        assert mock_get.call_count == 1
+
+        assert list(results) == [("Song 2", 2), ("Song 3", 3)]
+        assert mock_get.call_count == 2
+        assert [c.kwargs["params"]["page"] for c in mock_get.call_args_list] == [1, 2]
+
+def test_iter_search_results_max_results():
+    """Test the result cap stops paging early"""
+    with patch('requests.Session.get', side_effect=[make_page(1, 2), make_page(3, 2)]) as mock_get:
+        assert len(list(iter_search_results("song", per_page=2, max_results=2))) == 2
+        assert mock_get.call_count == 1
+
+def test_iter_search_results_empty_query():
+    """Test an empty query yields nothing"""
+    assert list(iter_search_results("")) == []
+
+def test_get_search_page_has_more():
+    """Test a full page reports that more may follow"""
+    with patch('requests.Session.get', return_value=make_page(1, 2)):
+        results, has_more = get_search_page("song", page=3, per_page=2)
+    assert results == [("Song 1", 1), ("Song 2", 2)]
+    assert has_more
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch, Mock
+from whosampled.api.genius_client import call_genius_api, async_call_genius_api, get_client
+from whosampled.api.singleflight import SingleFlight
+
+SAMPLE_RESPONSE = {"response": {"song": {"id": 123}}}
+
+
+def slow_get(delay=0.05):
+    """Return a requests.Session.get side effect that takes a while"""
+    def fake_get(url, **kwargs):
+        time.sleep(delay)
+        response = Mock()
+        response.json.return_value = SAMPLE_RESPONSE
+        return response
+    return fake_get
+
+
+def run_in_threads(fn, count):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fn())) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_one_execution():
+    """Test callers arriving while a call is in flight reuse its result"""
+    flight = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.05)
+        return "done"
+
+    results = run_in_threads(lambda: flight.do("key", work), 8)
+
+    assert results == ["done"] * 8
+    assert len(calls) == 1
+    assert flight.coalesced == 7
+    assert flight.in_flight() == 0
+
+
+def test_errors_propagate_to_all_waiters():
+    """Test every coalesced caller sees the leader's exception"""
+    flight = SingleFlight()
+
+    def fail():
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    def call():
+        try:
+            flight.do("key", fail)
+        except ValueError as e:
+            return str(e)
+
+    assert run_in_threads(call, 4) == ["boom"] * 4
+
+
+def test_sequential_calls_are_not_coalesced():
+    """Test a finished call does not serve later callers"""
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
+
+
+def test_concurrent_api_calls_coalesced(genius_client):
+    """Test identical concurrent requests only hit the network once"""
+    genius_client.cache = None
+    with patch('requests.Session.get', side_effect=slow_get()) as mock_get:
+        results = run_in_threads(lambda: call_genius_api("/songs/{song_id}", song_id=123), 6)
+
+    assert results == [SAMPLE_RESPONSE] * 6
+    assert mock_get.call_count == 1
+
+
+def test_async_and_sync_callers_share_requests(genius_client):
+    """Test async callers join sync requests for the same endpoint+params"""
+    genius_client.cache = None
+
+    async def gather():
+        return await asyncio.gather(
+            *(async_call_genius_api("/search", q="Test") for _ in range(5)),
+            asyncio.to_thread(call_genius_api, "/search", q="test"),
+        )
+
+    with patch('requests.Session.get', side_effect=slow_get()) as mock_get:
+        results = asyncio.run(gather())
+
+    assert results == [SAMPLE_RESPONSE] * 6
+    assert mock_get.call_count == 1
+    assert get_client().inflight.coalesced == 5
@@ -0,0 +1,55 @@
+from whosampled.api.genius_client import GeniusClient, set_client
+from whosampled.api.get_song_info import fetch_songs, get_sampled_songs
+from whosampled.api.rate_limit import CircuitBreaker, TokenBucket
+from whosampled.api.search import get_search_results
+from benchmarks.fake_genius import FakeGeniusServer, synthetic_fixtures
+from benchmarks.run import compare, percentile
+
+
+def use_server(server, max_retries=3):
+    set_client(GeniusClient(
+        rate_limiter=TokenBucket(rate=1000, capacity=1000),
+        circuit_breaker=CircuitBreaker(failure_threshold=100),
+        max_retries=max_retries,
+        base_url=server.url,
+    ))
+
+
+def test_server_replays_songs_and_search(sample_store):
+    """Test the client works end to end against the fake server"""
+    fixtures = synthetic_fixtures(n_songs=20, samples_per_song=3)
+    with FakeGeniusServer(fixtures) as server:
+        use_server(server)
+        song = get_sampled_songs(20)
+        assert song["main_song"]["id"] == 20
+        assert len(song["sampled_songs"]) == 3
+        assert [s["main_song"]["id"] for s in fetch_songs([5, 6, 7])] == [5, 6, 7]
+
+        title = fixtures["songs"][3]["response"]["song"]["title"]
+        assert (f"{title} by Artist 3", 3) in get_search_results(title)
+
+
+def test_injected_faults_are_retried(sample_store, monkeypatch):
+    """Test 429 and 503 responses are injected and recovered from"""
+    monkeypatch.setattr("whosampled.api.genius_client.backoff_delay", lambda attempt: 0)
+    fixtures = synthetic_fixtures(n_songs=30, samples_per_song=2)
+    with FakeGeniusServer(fixtures, error_rate=0.2, rate_limit_rate=0.2, seed=1) as server:
+        use_server(server, max_retries=10)
+        for song_id in range(1, 31):
+            assert get_sampled_songs(song_id)["main_song"]["id"] == song_id
+    assert server.injected["errors"] > 0
+    assert server.injected["rate_limited"] > 0
+    assert server.requests == 30 + server.injected["errors"] + server.injected["rate_limited"]
+
+
+def test_percentile_and_compare(capsys):
+    """Test result summaries and regression detection"""
+    assert percentile([3, 1, 2, 4], 50) == 2
+    assert percentile([1, 2, 3, 100], 99) == 100
+
+    def report(p50):
+        return {"results": [{"name": "plot_graph", "params": {"nodes": 10}, "p50_ms": p50}]}
+
+    assert compare(report(10), report(11), threshold=0.2) == []
+    assert compare(report(10), report(13), threshold=0.2) == ['plot_graph {"nodes": 10}']
+    assert "REGRESSION" in capsys.readouterr().out
@@ -1,6 +1,106 @@
 import os
 import sys
 
+import pytest
+
 # Add the project root directory to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, project_root) 
\ No newline at end of file
+sys.path.insert(0, project_root)
+
+
+@pytest.fixture(autouse=True)
+def genius_client(tmp_path):
+    """Give every test a fresh shared client with an isolated cache and limiter"""
+    from whosampled.api.cache import ResponseCache, SQLiteCache
+    from whosampled.api.genius_client import GeniusClient, set_client, reset_client
+    from whosampled.api.rate_limit import CircuitBreaker, TokenBucket
+
+    client = GeniusClient(
+        cache=ResponseCache(disk=SQLiteCache(str(tmp_path / "genius.sqlite3"))),
+        rate_limiter=TokenBucket(rate=1000, capacity=1000),
+        circuit_breaker=CircuitBreaker(),
+    )
+    set_client(client)
+    yield client
+    reset_client()
+
+
+@pytest.fixture(autouse=True)
+def sample_store(tmp_path):
+    """Give every test an empty sample store"""
+    from whosampled.store.sample_store import SampleStore, set_store
+
+    store = SampleStore(str(tmp_path / "samples.sqlite3"))
+    set_store(store)
+    yield store
+    set_store(None)
+    store.close()
+
+
+@pytest.fixture(autouse=True)
+def title_index(monkeypatch):
+    """Give every test an empty typeahead title index"""
+    from whosampled.utils import title_index
+
+    index = title_index.TitleIndex()
+    monkeypatch.setattr(title_index, "_index", index)
+    return index
+
+
+@pytest.fixture
+def session_state(monkeypatch):
+    """Replace Streamlit session state with a plain dict"""
+    import streamlit as st
+
+    state = {}
+    monkeypatch.setattr(st, "session_state", state)
+    return state
+
+
+@pytest.fixture(autouse=True)
+def description_cache(tmp_path, monkeypatch):
+    """Give every test an empty description cache and no OpenAI client"""
+    from whosampled.api import get_song_info
+    from whosampled.api.cache import SQLiteCache
+    from whosampled.api.description_cache import DescriptionCache, set_description_cache
+
+    cache = DescriptionCache(SQLiteCache(str(tmp_path / "descriptions.sqlite3")))
+    set_description_cache(cache)
+    monkeypatch.setattr(get_song_info, "_openai_client", None)
+    monkeypatch.setattr(get_song_info, "_model_unavailable_until", {})
+    yield cache
+    set_description_cache(None)
+
+
+@pytest.fixture(autouse=True)
+def artifact_cache(monkeypatch):
+    """Give every test an empty cross-session artifact cache"""
+    from whosampled.utils import artifact_cache
+
+    cache = artifact_cache.ArtifactCache()
+    monkeypatch.setattr(artifact_cache, "_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def metrics(monkeypatch):
+    """Give every test an empty metrics registry"""
+    from whosampled.utils import metrics
+
+    registry = metrics.MetricsRegistry(log=False)
+    monkeypatch.setattr(metrics, "_registry", registry)
+    return registry
+
+
+@pytest.fixture(autouse=True)
+def prefetcher():
+    """Give every test a prefetcher that records song IDs instead of fetching"""
+    from unittest.mock import Mock
+
+    from whosampled.services.prefetch_service import Prefetcher, set_prefetcher
+
+    prefetcher = Prefetcher(Mock(return_value=None), workers=1)
+    set_prefetcher(prefetcher)
+    yield prefetcher
+    set_prefetcher(None)
+    prefetcher.shutdown()
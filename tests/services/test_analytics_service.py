@@ -0,0 +1,39 @@
+import pytest
+from whosampled.services.analytics_service import (
+    get_corpus_analytics,
+    get_sample_chain,
+    reset_corpus_analytics,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_analytics():
+    reset_corpus_analytics()
+    yield
+    reset_corpus_analytics()
+
+
+def song(song_id, year=1990):
+    return {"id": song_id, "title": f"Song {song_id}", "artist": f"Artist {song_id}", "year": year}
+
+
+def test_analytics_rebuilt_only_when_store_changes(sample_store, metrics):
+    """Test the snapshot is reused until the store is written to"""
+    sample_store.upsert_song_data({"main_song": song(1), "sampled_songs": [song(2)]})
+    first = get_corpus_analytics(max_age=0)
+    assert get_corpus_analytics(max_age=0) is first
+    assert metrics.histogram_count("analytics_build_seconds") == 1
+
+    sample_store.upsert_song_data({"main_song": song(3), "sampled_songs": [song(2)]})
+    second = get_corpus_analytics(max_age=0)
+    assert second is not first
+    assert second.most_sampled_songs()[0]["times_sampled"] == 2
+    assert [s["id"] for s in get_sample_chain(1, 3, directed=False)] == [1, 2, 3]
+
+
+def test_refresh_is_throttled(sample_store):
+    """Test writes are not picked up until max_age has passed"""
+    first = get_corpus_analytics(max_age=60)
+    sample_store.upsert_song_data({"main_song": song(1), "sampled_songs": [song(2)]})
+    assert get_corpus_analytics(max_age=60) is first
+    assert get_corpus_analytics(max_age=0).graph.n_nodes == 2
@@ -0,0 +1,126 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from whosampled.cli import main
+from whosampled.services.export_service import export_catalog
+from tests.api.test_get_song_info import make_song_response, mock_songs_api
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def songs_api():
+    fake_get, _ = mock_songs_api(
+        {
+            1: make_song_response(1, samples=[10, 11]),
+            2: make_song_response(2, samples=[11]),
+            3: make_song_response(3, samples=[12]),
+        }
+    )
+    return fake_get
+
+
+def test_export_writes_nodes_and_edges(tmp_path, songs_api):
+    """Test IDs and titles are resolved and written as node and edge tables"""
+    catalog = tmp_path / "songs.txt"
+    catalog.write_text("1\n# comment\n\nSong 2 title\n1\n")
+    with patch('requests.Session.get', side_effect=songs_api), \
+            patch('whosampled.services.export_service.lookup_song_id', return_value=2):
+        stats = export_catalog(str(catalog), str(tmp_path / "out"), workers=2, batch_size=1)
+
+    assert stats == {"exported": 2, "skipped": 1, "not_found": 0, "failed": 0}
+    nodes = read_jsonl(tmp_path / "out" / "nodes.jsonl")
+    edges = read_jsonl(tmp_path / "out" / "edges.jsonl")
+    assert sorted(node["id"] for node in nodes) == [1, 2, 10, 11]
+    assert sorted((e["song_id"], e["sampled_id"]) for e in edges) == [(1, 10), (1, 11), (2, 11)]
+
+
+def test_export_resumes_from_checkpoint(tmp_path, songs_api):
+    """Test a rerun skips finished inputs and retries failed ones"""
+    catalog = tmp_path / "songs.txt"
+    catalog.write_text("1\n3\n")
+    out = str(tmp_path / "out")
+
+    def fail_song_3(url, **kwargs):
+        if url.endswith("/3"):
+            raise Exception("API Error: 500")
+        return songs_api(url, **kwargs)
+
+    with patch('requests.Session.get', side_effect=fail_song_3):
+        first = export_catalog(str(catalog), out, workers=1)
+    assert first["exported"] == 1 and first["failed"] == 1
+
+    with patch('requests.Session.get', side_effect=songs_api) as mock_get:
+        second = export_catalog(str(catalog), out, workers=1)
+    assert second == {"exported": 1, "skipped": 1, "not_found": 0, "failed": 0}
+    assert [call.args[0].rsplit("/", 1)[1] for call in mock_get.call_args_list] == ["3"]
+
+    nodes = read_jsonl(tmp_path / "out" / "nodes.jsonl")
+    assert sorted(node["id"] for node in nodes) == [1, 3, 10, 11, 12]
+    checkpoint = read_jsonl(tmp_path / "out" / "checkpoint.jsonl")
+    assert [line["input"] for line in checkpoint] == ["1", "3"]
+
+
+def test_resume_after_crash_before_checkpoint(tmp_path, songs_api):
+    """Test a batch written but not checkpointed is not duplicated, and a torn line is dropped"""
+    catalog = tmp_path / "songs.txt"
+    catalog.write_text("1\n2\n")
+    out = tmp_path / "out"
+    with patch('requests.Session.get', side_effect=songs_api):
+        export_catalog(str(catalog), str(out), workers=1)
+    # Simulate a crash after the tables were written but before the checkpoint
+    (out / "checkpoint.jsonl").write_text('{"input": "1", "song_id": 1}\n{"inp')
+    with open(out / "edges.jsonl", "a") as f:
+        f.write('{"song_id": 2, "sam')
+
+    with patch('requests.Session.get', side_effect=songs_api):
+        stats = export_catalog(str(catalog), str(out), workers=1)
+
+    assert stats["exported"] == 1 and stats["skipped"] == 1
+    edges = read_jsonl(out / "edges.jsonl")
+    assert sorted((e["song_id"], e["sampled_id"]) for e in edges) == [(1, 10), (1, 11), (2, 11)]
+    assert [line["input"] for line in read_jsonl(out / "checkpoint.jsonl")] == ["1", "2"]
+
+
+def test_unresolved_titles_are_not_checkpointed(tmp_path):
+    """Test titles without a search hit are reported and retried later"""
+    catalog = tmp_path / "songs.txt"
+    catalog.write_text("Unknown Song\n")
+    with patch('whosampled.services.export_service.lookup_song_id', return_value=None):
+        stats = export_catalog(str(catalog), str(tmp_path / "out"))
+    assert stats["not_found"] == 1
+    assert read_jsonl(tmp_path / "out" / "checkpoint.jsonl") == []
+
+
+def test_search_errors_are_failures_and_retried(tmp_path):
+    """Test a title whose search fails is counted as failed, not not-found, and retried"""
+    catalog = tmp_path / "songs.txt"
+    catalog.write_text("Some Title\n")
+    out = str(tmp_path / "out")
+    with patch('requests.Session.get', side_effect=Exception("connection reset")):
+        stats = export_catalog(str(catalog), out)
+    assert stats["failed"] == 1 and stats["not_found"] == 0
+    assert read_jsonl(tmp_path / "out" / "checkpoint.jsonl") == []
+
+    with patch('whosampled.services.export_service.lookup_song_id', return_value=None) as mock_lookup:
+        export_catalog(str(catalog), out)
+    mock_lookup.assert_called_once_with("Some Title")
+
+
+def test_parquet_export(tmp_path, songs_api):
+    """Test Parquet output is written as readable part files"""
+    pq = pytest.importorskip("pyarrow.parquet")
+    catalog = tmp_path / "songs.txt"
+    catalog.write_text("1\n2\n3\n")
+    with patch('requests.Session.get', side_effect=songs_api):
+        assert main(["export", str(catalog), str(tmp_path / "out"), "--format", "parquet",
+                     "--batch-size", "2"]) == 0
+
+    nodes = pq.read_table(str(tmp_path / "out" / "nodes")).to_pylist()
+    assert sorted(node["id"] for node in nodes) == [1, 2, 3, 10, 11, 12]
+    assert len(list((tmp_path / "out" / "edges").glob("part-*.parquet"))) == 2
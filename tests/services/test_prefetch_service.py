@@ -0,0 +1,139 @@
+import threading
+from unittest.mock import patch
+
+from whosampled.services.prefetch_service import Prefetcher, prefetch_top_hits
+from whosampled.services.search_service import handle_search
+from whosampled.services.song_service import get_song_data
+from tests.api.test_get_song_info import make_song_response, mock_songs_api
+
+
+def blocking_fetch():
+    """A fetch that holds the only worker until released"""
+    started, release, fetched = threading.Event(), threading.Event(), []
+
+    def fetch(song_id):
+        fetched.append(song_id)
+        started.set()
+        release.wait(5)
+        return song_id
+
+    return fetch, started, release, fetched
+
+
+def test_prefetch_top_hits_fetches_first_k(prefetcher):
+    """Test only the top k results are prefetched"""
+    results = [(f"Song {i}", i) for i in range(1, 6)]
+    futures = prefetch_top_hits("session", results, k=2)
+    for future in futures:
+        future.result(timeout=5)
+    assert sorted(call.args[0] for call in prefetcher._fetch.call_args_list) == [1, 2]
+
+
+def test_new_query_cancels_pending_prefetches(metrics):
+    """Test songs queued for an old query are never fetched"""
+    fetch, started, release, fetched = blocking_fetch()
+    prefetcher = Prefetcher(fetch, workers=1)
+    try:
+        old = prefetcher.schedule("session", [1, 2, 3])
+        assert started.wait(5)
+        new = prefetcher.schedule("session", [4])
+        release.set()
+        for future in new + old[:1]:
+            future.result(timeout=5)
+        assert all(future.cancelled() for future in old[1:])
+    finally:
+        prefetcher.shutdown()
+    assert fetched == [1, 4]
+    assert metrics.counter_value("prefetch_songs_total", result="cancelled") == 2
+    assert metrics.counter_value("prefetch_songs_total", result="fetched") == 2
+
+
+def test_sessions_do_not_cancel_each_other():
+    """Test a query in one session leaves another session's prefetches alone"""
+    fetch, started, release, fetched = blocking_fetch()
+    prefetcher = Prefetcher(fetch, workers=1)
+    try:
+        first = prefetcher.schedule("a", [1, 2])
+        assert started.wait(5)
+        second = prefetcher.schedule("b", [3])
+        release.set()
+        for future in first + second:
+            future.result(timeout=5)
+    finally:
+        prefetcher.shutdown()
+    assert fetched == [1, 2, 3]
+
+
+def test_repeated_schedule_reuses_batch():
+    """Test a rerun with the same results does not restart prefetching"""
+    fetch, _, release, fetched = blocking_fetch()
+    prefetcher = Prefetcher(fetch, workers=1)
+    try:
+        futures = prefetcher.schedule("session", [1, 2])
+        assert prefetcher.schedule("session", [1, 2]) is futures
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        prefetcher.shutdown()
+    assert fetched == [1, 2]
+
+
+def test_finished_batches_are_dropped():
+    """Test a session's batch is forgotten once done and keeps no results"""
+    prefetcher = Prefetcher(lambda song_id: object(), workers=1)
+    try:
+        futures = prefetcher.schedule("session", [1, 2])
+        for future in futures:
+            assert future.result(timeout=5) is None
+        prefetcher._executor.shutdown(wait=True)
+        assert prefetcher._batches == {}
+    finally:
+        prefetcher.shutdown()
+
+
+def test_empty_schedule_registers_nothing():
+    """Test scheduling no songs leaves no batch behind"""
+    prefetcher = Prefetcher(lambda song_id: None, workers=1)
+    try:
+        assert prefetcher.schedule("session", []) == []
+        assert prefetcher._batches == {}
+    finally:
+        prefetcher.shutdown()
+
+
+def test_failed_prefetch_is_swallowed(metrics):
+    """Test a prefetch error is counted rather than raised"""
+    prefetcher = Prefetcher(lambda song_id: 1 / 0, workers=1)
+    try:
+        assert prefetcher.schedule("session", [1])[0].result(timeout=5) is None
+    finally:
+        prefetcher.shutdown()
+    assert metrics.counter_value("prefetch_songs_total", result="failed") == 1
+
+
+def test_handle_search_prefetches_results(session_state, prefetcher):
+    """Test a search warms its top hits and clearing the query cancels them"""
+    results = [("Song 1", 1), ("Song 2", 2)]
+    with patch('whosampled.services.search_service.get_search_results', return_value=results):
+        assert handle_search("song") == results
+    prefetcher._executor.shutdown(wait=True)
+    assert [call.args[0] for call in prefetcher._fetch.call_args_list] == [1, 2]
+
+    handle_search("")
+    assert session_state['session_id'] not in prefetcher._batches
+
+
+def test_prefetched_song_is_served_from_cache(sample_store):
+    """Test selecting a prefetched song does not hit the API again"""
+    from whosampled.services.prefetch_service import prefetch_song
+
+    side_effect, _ = mock_songs_api({1: make_song_response(1, samples=[2])})
+    with patch('requests.Session.get', side_effect=side_effect) as mock_get:
+        prefetcher = Prefetcher(prefetch_song, workers=1)
+        try:
+            prefetcher.schedule("session", [1])[0].result(timeout=5)
+        finally:
+            prefetcher.shutdown()
+        assert get_song_data(1)["main_song"]["id"] == 1
+    assert mock_get.call_count == 1
@@ -0,0 +1,128 @@
+from unittest.mock import patch, Mock
+from whosampled.services.search_service import (
+    handle_search,
+    handle_typeahead,
+    handle_paginated_search,
+    load_more_search_results,
+)
+from tests.api.test_search import make_page
+
+
+def search_response(titles):
+    mock = Mock()
+    mock.json.return_value = {
+        "response": {
+            "hits": [
+                {"result": {"id": i, "full_title": title}} for i, title in enumerate(titles, 1)
+            ]
+        }
+    }
+    return mock
+
+
+TITLES = [
+    "Ice Ice Baby by Vanilla Ice",
+    "Ice Cream by Raekwon",
+    "Ice Ice Baby (Remix) by Vanilla Ice",
+    "Iceberg by Ice-T",
+    "Ice Box by Omarion",
+    "Cold as Ice by Foreigner",
+]
+
+
+def test_handle_search_without_typeahead_calls_api(session_state):
+    """Test the default mode always searches the API"""
+    with patch('requests.Session.get', return_value=search_response(TITLES)) as mock_get:
+        assert len(handle_search("ice")) == len(TITLES)
+    mock_get.assert_called_once()
+
+
+def test_typeahead_narrows_complete_results_without_network(session_state):
+    """Test extending a query whose results fitted on one page filters them locally"""
+    with patch('requests.Session.get', return_value=search_response(TITLES)) as mock_get:
+        handle_search("ice", typeahead=True)
+        results = handle_search("ice ice", typeahead=True)
+
+    mock_get.assert_called_once()
+    assert results == [(TITLES[0], 1), (TITLES[2], 3)]
+
+
+def test_typeahead_searches_when_prefix_page_was_full(session_state):
+    """Test a prefix query with more pages is not trusted, and its matches follow the API results"""
+    responses = [make_page(1, 10), search_response(["Song 1 (Live) by Band"])]
+    with patch('requests.Session.get', side_effect=responses) as mock_get:
+        handle_search("song", typeahead=True)
+        results = handle_search("song 1", typeahead=True)
+
+    assert mock_get.call_count == 2
+    assert results[0] == ("Song 1 (Live) by Band", 1)
+    assert ("Song 10", 10) in results
+
+
+def test_typeahead_shows_local_matches_while_searching(session_state, title_index):
+    """Test local matches are shown before the API answers and cleared after"""
+    title_index.add_many((title, i) for i, title in enumerate(TITLES, 1))
+    with patch('requests.Session.get', return_value=search_response(TITLES[:1])), \
+            patch('whosampled.services.search_service.show_instant_results') as mock_show:
+        handle_typeahead("ice ice")
+
+    shown = mock_show.call_args.args[0]
+    assert (TITLES[0], 1) in shown
+    mock_show.return_value.empty.assert_called_once()
+
+
+def test_typeahead_adds_title_index_matches(session_state, title_index):
+    """Test titles seen in other sessions are shown alongside the API results"""
+    title_index.add_many((title, i) for i, title in enumerate(TITLES, 1))
+    with patch('requests.Session.get', return_value=search_response([])) as mock_get:
+        results = handle_typeahead("ice")
+
+    mock_get.assert_called_once()
+    assert len(results) >= 5
+
+
+def test_typeahead_reuses_answered_queries(session_state):
+    """Test a query already answered in this session is not searched again"""
+    with patch('requests.Session.get', return_value=search_response(TITLES[:1])) as mock_get:
+        handle_typeahead("vanilla")
+        handle_typeahead("vanilla")
+
+    mock_get.assert_called_once()
+
+
+def test_typeahead_always_searches_submitted_queries(session_state, title_index):
+    """Test local matches never stand in for the API's answer"""
+    title_index.add_many((title, i) for i, title in enumerate(TITLES, 1))
+    with patch('requests.Session.get', return_value=search_response(["Ice Ice Baby by Vanilla Ice"])) as mock_get:
+        handle_typeahead("ice cream")
+        results = handle_typeahead("ice ice ba")
+
+    assert mock_get.call_count == 2
+    assert results[0] == ("Ice Ice Baby by Vanilla Ice", 1)
+
+
+def test_paginated_search_loads_more_on_request(session_state):
+    """Test further pages are only fetched when load more is requested"""
+    with patch('requests.Session.get', side_effect=[make_page(1, 10), make_page(11, 3)]) as mock_get:
+        results, has_more = handle_paginated_search("song")
+        assert len(results) == 10 and has_more
+        assert mock_get.call_count == 1
+
+        load_more_search_results()
+        results, has_more = handle_paginated_search("song")
+
+    assert [song_id for _, song_id in results] == list(range(1, 14))
+    assert not has_more
+    assert mock_get.call_count == 2
+
+
+def test_paginated_typeahead_starts_from_api_page_one(session_state, title_index):
+    """Test local matches never stand in for page 1, and a short page ends the list"""
+    title_index.add_many((f"Song {i}", i) for i in range(100, 110))
+    with patch('requests.Session.get', return_value=make_page(1, 3)) as mock_get:
+        results, has_more = handle_paginated_search("song", typeahead=True)
+
+    assert mock_get.call_args.kwargs["params"]["page"] == 1
+    assert [song_id for _, song_id in results][:3] == [1, 2, 3]
+    assert len(results) > 3
+    assert not has_more
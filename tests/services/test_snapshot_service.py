@@ -0,0 +1,179 @@
+import struct
+from unittest.mock import patch
+
+import pytest
+from whosampled.api.cache import make_cache_key
+from whosampled.services import snapshot_service
+from whosampled.services.snapshot_service import (
+    SnapshotError,
+    SnapshotReader,
+    SnapshotWriter,
+    export_snapshot,
+    import_snapshot,
+    warm_start,
+)
+
+
+def search_response(*songs):
+    return {
+        "response": {
+            "hits": [{"result": {"full_title": f"{title} by Artist", "id": song_id}} for song_id, title in songs]
+        }
+    }
+
+
+def song(song_id, year=1990):
+    return {"id": song_id, "title": f"Song {song_id}", "artist": f"Artist {song_id}", "year": year}
+
+
+@pytest.fixture
+def warm_caches(genius_client, sample_store, description_cache):
+    """Fill every cache a snapshot carries"""
+    genius_client.cache.store(
+        "/search", make_cache_key("/search", {"q": "ice"}), search_response((1, "Ice Ice Baby"))
+    )
+    genius_client.cache.store("/songs/{song_id}", make_cache_key("/songs/{song_id}", {"song_id": 1}), {"big": "body"})
+    sample_store.upsert_song_data(
+        {"main_song": song(1), "sampled_songs": [song(2, None)]}, sampled_in=[song(3)]
+    )
+    description_cache.set("abc", "A classic bassline.")
+
+
+def clear_caches(genius_client, sample_store, description_cache, title_index):
+    genius_client.cache.clear()
+    sample_store.clear()
+    description_cache.clear()
+    title_index.__init__()
+
+
+def test_round_trip_restores_every_cache(
+    tmp_path, warm_caches, genius_client, sample_store, description_cache, title_index
+):
+    """Test an exported snapshot rebuilds the caches of an empty replica"""
+    path = str(tmp_path / "warm.wss")
+    counts = export_snapshot(path)
+    assert counts == {"RESP": 1, "SONG": 3, "EDGE": 2, "DESC": 1}
+
+    clear_caches(genius_client, sample_store, description_cache, title_index)
+    assert import_snapshot(path) == counts
+
+    with patch('requests.Session.get') as mock_get:
+        assert genius_client.get("/search", q="Ice") == search_response((1, "Ice Ice Baby"))
+        assert sample_store.get_sampled_songs(1).to_dict() == {
+            "main_song": song(1), "sampled_songs": [song(2, None)]
+        }
+    assert mock_get.call_count == 0
+    assert sample_store.has_sampled_in(1)
+    assert sample_store.sampled_in(1) == [3]
+    assert description_cache.get("abc") == "A classic bassline."
+    assert title_index.search("ice ice") == [("Ice Ice Baby by Artist", 1)]
+
+
+def test_import_keeps_newer_local_entries(tmp_path, warm_caches, genius_client, sample_store):
+    """Test a snapshot never overwrites data fetched after it was taken"""
+    path = str(tmp_path / "warm.wss")
+    export_snapshot(path)
+    key = make_cache_key("/search", {"q": "ice"})
+    genius_client.cache.store("/search", key, search_response((9, "Newer")))
+    sample_store.upsert_song_data({"main_song": song(1, 1991), "sampled_songs": []})
+
+    import_snapshot(path)
+    assert genius_client.cache.disk.get(key).value == search_response((9, "Newer"))
+    assert sample_store.get_song(1)["year"] == 1991
+
+
+def test_import_keeps_edges_of_newer_local_songs(tmp_path, warm_caches, sample_store):
+    """Test an older snapshot's sample list does not leak into a refetched song"""
+    path = str(tmp_path / "warm.wss")
+    export_snapshot(path)
+    sample_store.upsert_song_data({"main_song": song(1), "sampled_songs": [song(4)]})
+
+    import_snapshot(path)
+    assert sample_store.samples_of(1) == [4]
+    assert sample_store.get_sampled_songs(1).to_dict()["sampled_songs"] == [song(4)]
+
+
+def test_sections_stream_across_chunks(tmp_path, monkeypatch):
+    """Test rows larger than the read chunk and many small rows decode in order"""
+    monkeypatch.setattr(snapshot_service, "_READ_CHUNK", 64)
+    path = str(tmp_path / "chunks.wss")
+    rows = [(i, i + 1, i % 7) for i in range(2000)]
+    big = [("k", "x" * 1000, 1.0, 2.0), ("é", "ü", 3.5, None)]
+    with SnapshotWriter(path) as writer:
+        writer.write_section(b"EDGE", rows)
+        writer.write_section(b"DESC", big)
+
+    with SnapshotReader(path) as reader:
+        assert list(reader.rows(b"EDGE")) == rows
+        assert list(reader.rows(b"DESC")) == big
+        assert list(reader.rows(b"SONG")) == []
+        assert reader.info()["sections"]["EDGE"]["rows"] == 2000
+
+
+def test_rejects_bad_files(tmp_path):
+    """Test other files, newer formats and corrupt sections raise SnapshotError"""
+    path = tmp_path / "bad.wss"
+    path.write_bytes(b"not a snapshot at all, just some text padding it out")
+    with pytest.raises(SnapshotError):
+        SnapshotReader(str(path))
+
+    with SnapshotWriter(str(path)) as writer:
+        writer.write_section(b"EDGE", [(1, 2, 0)] * 100)
+    data = bytearray(path.read_bytes())
+
+    newer = bytearray(data)
+    struct.pack_into("<H", newer, 8, snapshot_service.FORMAT_VERSION + 1)
+    path.write_bytes(newer)
+    with pytest.raises(SnapshotError, match="format"):
+        SnapshotReader(str(path))
+
+    corrupt = bytearray(data)
+    corrupt[snapshot_service._HEADER.size + 3] ^= 0xFF
+    path.write_bytes(corrupt)
+    with SnapshotReader(str(path)) as reader, pytest.raises(SnapshotError, match="corrupt"):
+        list(reader.rows(b"EDGE"))
+
+
+def test_corrupt_section_merges_nothing(
+    tmp_path, warm_caches, genius_client, sample_store, description_cache, title_index
+):
+    """Test a damaged section is caught before any section is imported"""
+    path = tmp_path / "warm.wss"
+    export_snapshot(str(path))
+    with SnapshotReader(str(path)) as reader:
+        offset = reader.sections[b"DESC"].offset
+    data = bytearray(path.read_bytes())
+    data[offset] ^= 0xFF
+    path.write_bytes(data)
+
+    clear_caches(genius_client, sample_store, description_cache, title_index)
+    with pytest.raises(SnapshotError, match="DESC"):
+        import_snapshot(str(path))
+    assert genius_client.cache.disk.total_bytes == 0
+    assert sample_store.get_song(1) is None
+
+
+def test_warm_start_imports_once(tmp_path, warm_caches, sample_store, monkeypatch):
+    """Test the warm-start bundle is imported once and skipped on restart"""
+    path = str(tmp_path / "warm.wss")
+    export_snapshot(path)
+    sample_store.clear()
+
+    monkeypatch.setattr(snapshot_service, "_warm_started", False)
+    assert warm_start(path, marker_dir=str(tmp_path))
+    assert warm_start(path, marker_dir=str(tmp_path)) is False
+    assert sample_store.get_song(1) is not None
+
+    # A restarted process finds the marker for the same bundle
+    monkeypatch.setattr(snapshot_service, "_warm_started", False)
+    with patch.object(snapshot_service, "import_snapshot") as mock_import:
+        assert warm_start(path, marker_dir=str(tmp_path)) is False
+    mock_import.assert_not_called()
+
+
+def test_warm_start_ignores_missing_bundle(tmp_path, monkeypatch):
+    """Test a missing bundle leaves the app running cold"""
+    monkeypatch.setattr(snapshot_service, "_warm_started", False)
+    assert warm_start(str(tmp_path / "missing.wss"), marker_dir=str(tmp_path)) is False
+    monkeypatch.setattr(snapshot_service, "_warm_started", False)
+    assert warm_start("", marker_dir=str(tmp_path)) is False
@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+from whosampled.utils.graph_utils import plot_graph
+from whosampled.services.song_service import (
+    get_sampled_in,
+    get_samples_table,
+    get_song_data,
+    get_song_figure,
+    get_song_graph,
+)
+from tests.api.test_get_song_info import make_song_response, mock_songs_api
+
+
+def test_song_artifacts_are_built_once(sample_store):
+    """Test reruns reuse the fetched song, graph, figure and table"""
+    side_effect, _ = mock_songs_api({1: make_song_response(1, samples=[2, 3])})
+    with patch('requests.Session.get', side_effect=side_effect) as mock_get, \
+            patch('whosampled.utils.graph_utils.plot_graph', wraps=plot_graph) as mock_plot:
+        for _ in range(3):
+            song_data = get_song_data(1)
+            fig = get_song_figure(1)
+            table = get_samples_table(1)
+
+    assert mock_get.call_count == 1
+    assert mock_plot.call_count == 1
+    assert [song["id"] for song in song_data["sampled_songs"]] == [2, 3]
+    assert get_song_graph(1).n_nodes == 3
+    assert len(fig.data) > 0
+    assert table["Song"].tolist() == ["Song 2", "Song 3"]
+    assert table["Year"].tolist() == [1970, 1970]
+
+
+def test_missing_song_is_not_cached(sample_store):
+    """Test a failed lookup is retried on the next rerun"""
+    with patch('whosampled.services.song_service.get_sampled_songs', return_value=None) as mock_fetch:
+        assert get_song_data(5) is None
+        assert get_song_figure(5) is None
+        assert get_samples_table(5) is None
+    assert mock_fetch.call_count == 3
+
+
+def test_sampled_in_graph_points_at_main_song(sample_store):
+    """Test the reverse graph mode shows a page of songs sampling the main song"""
+    side_effect, _ = mock_songs_api({1: make_song_response(1, sampled_in=[7, 8, 9])})
+    with patch('requests.Session.get', side_effect=side_effect) as mock_get:
+        songs, has_more = get_sampled_in(1, limit=2)
+        graph = get_song_graph(1, direction="sampled_in", limit=2)
+        table = get_samples_table(1, direction="sampled_in", limit=2)
+        fig = get_song_figure(1, direction="sampled_in", limit=2)
+
+    assert mock_get.call_count == 1
+    assert [song.id for song in songs] == [7, 8] and has_more
+    assert graph.predecessors(1).tolist() == [7, 8]
+    assert table["Song"].tolist() == ["Song 7", "Song 8"]
+    assert len(fig.data) > 0
+    assert get_song_graph(1).n_nodes == 1
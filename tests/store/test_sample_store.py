@@ -0,0 +1,134 @@
+import time
+from unittest.mock import patch
+from whosampled.api.get_song_info import get_sampled_songs
+from whosampled.api.lineage import crawl_sample_lineage
+from tests.api.test_get_song_info import make_song_response, mock_songs_api
+
+
+def song(song_id, year=None):
+    return {"id": song_id, "title": f"Song {song_id}", "artist": f"Artist {song_id}", "year": year}
+
+
+def song_data(song_id, samples):
+    return {"main_song": song(song_id, 1990), "sampled_songs": [song(i, 1970) for i in samples]}
+
+
+def test_upsert_and_read_back(sample_store):
+    """Test a stored record is returned in get_sampled_songs shape and order"""
+    sample_store.upsert_song_data(song_data(1, [3, 2]))
+
+    assert sample_store.get_sampled_songs(1).to_dict() == song_data(1, [3, 2])
+    assert sample_store.samples_of(1) == [3, 2]
+    assert sample_store.sampled_in(2) == [1]
+
+
+def test_unfetched_and_stale_songs_are_misses(sample_store):
+    """Test songs only seen as samples, or fetched too long ago, are not served"""
+    sample_store.upsert_song_data(song_data(1, [2]))
+    assert sample_store.get_sampled_songs(2) is None
+
+    sample_store.ttl = 0
+    assert sample_store.get_sampled_songs(1) is None
+
+
+def test_upsert_replaces_edges_and_keeps_known_year(sample_store):
+    """Test incremental upserts replace forward edges without losing data"""
+    sample_store.upsert_song_data(song_data(1, [2, 3]))
+    sample_store.upsert_song_data({"main_song": song(2), "sampled_songs": []})
+    sample_store.upsert_song_data(song_data(1, [3]))
+
+    assert sample_store.samples_of(1) == [3]
+    assert sample_store.sampled_in(2) == []
+    assert sample_store.get_song(2)["year"] == 1970
+
+
+def test_import_rows_takes_edges_from_the_newer_copy(sample_store):
+    """Test imported edges replace older local ones and merge for unfetched songs"""
+    sample_store.upsert_song_data(song_data(1, [2, 3]))
+    newer = time.time() + 60
+    songs = [(1, "Song 1", "Artist 1", None, newer, None), (7, "Song 7", "Artist 7", None, None, None)]
+    edges = [(1, 5, 0), (7, 2, 0)]
+
+    assert sample_store.import_rows(songs, edges) == (2, 2)
+    assert sample_store.samples_of(1) == [5]
+    assert sample_store.get_song(1)["year"] == 1990
+    assert sample_store.sampled_in(2) == [7]
+
+
+def test_neighborhood_forward_and_reverse(sample_store):
+    """Test k-hop neighborhoods in both directions"""
+    sample_store.upsert_song_data(song_data(1, [2, 3]))
+    sample_store.upsert_song_data(song_data(2, [4]))
+    sample_store.upsert_song_data(song_data(5, [4]))
+
+    forward = sample_store.neighborhood(1, k=2)
+    assert set(forward["songs"]) == {1, 2, 3, 4}
+    assert forward["songs"][4]["depth"] == 2
+    assert sorted(forward["edges"]) == [(1, 2), (1, 3), (2, 4)]
+
+    reverse = sample_store.neighborhood(4, k=2, direction="sampled_in")
+    assert set(reverse["songs"]) == {1, 2, 4, 5}
+    assert sorted(reverse["edges"]) == [(1, 2), (2, 4), (5, 4)]
+
+    assert len(sample_store.neighborhood(1, k=2, max_nodes=2)["songs"]) == 2
+
+
+def test_get_sampled_songs_served_offline(sample_store):
+    """Test a second lookup of a song is served from the store"""
+    fake_get, _ = mock_songs_api({1: make_song_response(1, samples=[2])})
+    with patch('requests.Session.get', side_effect=fake_get) as mock_get:
+        first = get_sampled_songs(1)
+    with patch('requests.Session.get', side_effect=Exception("offline")):
+        assert get_sampled_songs(1) == first
+
+    assert mock_get.call_count == 1
+    assert sample_store.samples_of(1) == [2]
+
+
+def test_crawl_reuses_stored_songs(sample_store):
+    """Test the lineage crawler only fetches songs missing from the store"""
+    sample_store.upsert_song_data(song_data(1, [2]))
+    fake_get, _ = mock_songs_api({2: make_song_response(2, samples=[3])})
+    with patch('requests.Session.get', side_effect=fake_get) as mock_get:
+        lineage = crawl_sample_lineage(1, max_depth=2)
+
+    assert mock_get.call_count == 1
+    assert sorted(lineage["edges"]) == [(1, 2), (2, 3)]
+
+
+def test_sampled_in_index_and_pages(sample_store):
+    """Test reverse relationships are indexed and paged oldest first"""
+    sample_store.upsert_song_data(song_data(1, [2]))
+    sample_store.upsert_song_data(
+        song_data(2, []), sampled_in=[song(1, 1990), song(4, 1985), song(5)]
+    )
+
+    assert sample_store.has_sampled_in(2)
+    assert not sample_store.has_sampled_in(1)
+    assert sample_store.count_sampled_in(2) == 3
+    assert [s.id for s in sample_store.sampled_in_page(2)] == [4, 1, 5]
+    assert [s.id for s in sample_store.sampled_in_page(2, offset=1, limit=1)] == [1]
+    # Song 1's own samples keep their order and song 4 is not marked as fetched
+    assert sample_store.samples_of(1) == [2]
+    assert sample_store.get_sampled_songs(4) is None
+    assert sample_store.neighborhood(2, direction="sampled_in")["songs"].keys() == {1, 2, 4, 5}
+
+
+def test_old_store_gains_sampled_in_column(tmp_path):
+    """Test a store created without the sampled_in_at column is migrated"""
+    import sqlite3
+    from whosampled.store.sample_store import SampleStore
+
+    path = str(tmp_path / "old.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE songs (id INTEGER PRIMARY KEY, title TEXT NOT NULL, "
+        "artist TEXT, year INTEGER, fetched_at REAL)"
+    )
+    conn.commit()
+    conn.close()
+
+    store = SampleStore(path)
+    store.upsert_song_data(song_data(2, []), sampled_in=[song(1)])
+    assert store.has_sampled_in(2)
+    store.close()
@@ -0,0 +1,106 @@
+import threading
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from whosampled.utils.artifact_cache import ArtifactCache, estimate_size
+
+
+def test_estimate_size_uses_buffer_sizes():
+    """Test arrays and DataFrames report their buffer sizes"""
+    assert estimate_size(np.zeros(1000, dtype=np.float64)) == 8000
+    df = pd.DataFrame({"a": np.arange(100, dtype=np.int64)})
+    assert estimate_size(df) == df.memory_usage(deep=True).sum()
+    assert estimate_size({"title": "x" * 500}) > 500
+
+
+def test_estimate_size_of_graphs_and_figures_does_not_pickle():
+    """Test graphs and figures are sized from their arrays without pickling"""
+    import pickle
+
+    from whosampled.api.records import SongRecord
+    from whosampled.utils.graph_utils import build_compact_graph, plot_graph
+
+    main = SongRecord(1, "Main song title", "Artist name", 1990)
+    samples = [SongRecord(i, f"Sample song number {i}", "Some artist", 1970 + i % 30) for i in range(2, 1002)]
+    graph = build_compact_graph(main, samples)
+    figure = plot_graph(graph)
+    pickled_figure = len(pickle.dumps(figure))
+
+    with patch('whosampled.utils.artifact_cache.pickle.dumps', side_effect=AssertionError):
+        graph_size, figure_size = estimate_size(graph), estimate_size(figure)
+    assert graph_size == graph.nbytes > graph.ids.nbytes + graph.indices.nbytes
+    assert pickled_figure / 2 < figure_size < pickled_figure * 2
+
+
+def test_get_or_create_builds_once():
+    """Test the factory only runs on the first lookup"""
+    cache = ArtifactCache()
+    calls = []
+    for _ in range(3):
+        assert cache.get_or_create("k", lambda: calls.append(1) or "value") == "value"
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_none_and_errors_are_not_cached():
+    """Test failed builds are retried on the next lookup"""
+    cache = ArtifactCache()
+    assert cache.get_or_create("k", lambda: None) is None
+    try:
+        cache.get_or_create("k", lambda: 1 / 0)
+    except ZeroDivisionError:
+        pass
+    assert cache.get_or_create("k", lambda: 42) == 42
+
+
+def test_evicts_least_recently_used_by_bytes():
+    """Test eviction keeps total bytes under the bound"""
+    cache = ArtifactCache(max_bytes=2500)
+    cache.set("a", np.zeros(1000, dtype=np.uint8))
+    cache.set("b", np.zeros(1000, dtype=np.uint8))
+    cache.get("a")
+    cache.set("c", np.zeros(1000, dtype=np.uint8))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.total_bytes == 2000
+    assert cache.stats()["evictions"] == 1
+
+    # Larger than the whole cache: never stored
+    cache.set("huge", np.zeros(5000, dtype=np.uint8))
+    assert cache.get("huge") is None
+
+
+def test_entries_expire():
+    """Test entries are rebuilt after the TTL"""
+    cache = ArtifactCache(ttl=0.01)
+    cache.set("k", "old")
+    time.sleep(0.02)
+    assert cache.get("k") is None
+    assert cache.total_bytes == 0
+
+
+def test_concurrent_misses_build_once():
+    """Test sessions missing the same key together share one build"""
+    cache = ArtifactCache()
+    calls = []
+    barrier = threading.Barrier(4)
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    def worker():
+        barrier.wait()
+        assert cache.get_or_create("k", factory) == "value"
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
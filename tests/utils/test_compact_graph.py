@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from whosampled.utils.compact_graph import CompactGraph
+from whosampled.utils.graph_utils import build_compact_graph, plot_graph
+
+
+def song(song_id, title=None, year=1990):
+    return {"id": song_id, "title": title or f"Song {song_id}", "artist": f"Artist {song_id}", "year": year}
+
+
+@pytest.fixture
+def graph():
+    # 1 samples 2 and 3, 2 and 3 both sample 4, 4 samples 5
+    songs = [song(i) for i in range(1, 6)]
+    edges = [(1, 2), (1, 3), (2, 4), (3, 4), (4, 5), (1, 2)]
+    return CompactGraph.from_songs(songs, edges)
+
+
+def test_degrees_and_neighbors(graph):
+    """Test degree arrays and neighbor lookups come from the CSR arrays"""
+    assert graph.n_nodes == 5
+    assert graph.n_edges == 5
+    assert graph.out_degree().tolist() == [2, 1, 1, 1, 0]
+    assert graph.in_degree().tolist() == [0, 1, 1, 2, 1]
+    assert sorted(graph.successors(1).tolist()) == [2, 3]
+    assert sorted(graph.predecessors(4).tolist()) == [2, 3]
+    assert graph.roots().tolist() == [1]
+
+
+def test_bfs_and_neighborhood(graph):
+    """Test traversal distances in both directions"""
+    visited, dist = graph.bfs(1)
+    assert dict(zip(graph.ids[visited].tolist(), dist.tolist())) == {1: 0, 2: 1, 3: 1, 4: 2, 5: 3}
+
+    assert sorted(graph.neighborhood(1, k=2).tolist()) == [1, 2, 3, 4]
+    assert sorted(graph.neighborhood(4, k=1, direction="sampled_in").tolist()) == [2, 3, 4]
+
+
+def test_duplicate_titles_stay_separate():
+    """Test songs sharing a title are distinct nodes with distinct labels"""
+    g = CompactGraph.from_song_data({
+        "main_song": song(1, "Intro"),
+        "sampled_songs": [song(2, "Intro"), song(3, "Intro", year=None)],
+    })
+    assert g.n_nodes == 3
+    assert len(set(g.labels())) == 3
+    assert g.node(3)["year"] is None
+
+    G = g.to_networkx()
+    assert G.number_of_nodes() == 3
+    assert G.number_of_edges() == 2
+
+
+def test_subgraph(graph):
+    """Test induced subgraphs keep only edges between kept nodes"""
+    sub = graph.subgraph([2, 4, 5])
+    assert sorted(sub.ids.tolist()) == [2, 4, 5]
+    assert sub.n_edges == 2
+
+
+def test_large_graph_builds_quickly():
+    """Test a multi-thousand-node lineage builds and traverses"""
+    n = 5000
+    songs = [song(i) for i in range(n)]
+    edges = [(i, 2 * i + 1) for i in range(n // 2)] + [(i, 2 * i + 2) for i in range(n // 2 - 1)]
+    g = CompactGraph.from_songs(songs, edges)
+
+    visited, dist = g.bfs(0)
+    assert len(visited) == n
+    assert dist.max() == int(np.log2(n))
+
+
+def test_plot_graph_accepts_compact_graph():
+    """Test plot_graph renders a CompactGraph through the adapter"""
+    g = build_compact_graph(song(1), [song(2), song(3)])
+    fig = plot_graph(g)
+    assert len(fig.data[1].x) == 3
@@ -0,0 +1,119 @@
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+from whosampled.utils.corpus_analytics import (
+    CorpusAnalytics,
+    component_labels,
+    corpus_graph,
+    pagerank,
+    shortest_chain,
+)
+
+
+def random_corpus(n=300, m=600, seed=0):
+    rng = random.Random(seed)
+    songs = [(i, f"Song {i}", f"Artist {i % 40}", 1960 + i % 50) for i in range(1, n + 1)]
+    edges = {(rng.randint(1, n), rng.randint(1, n)) for _ in range(m)}
+    return songs, [(a, b) for a, b in edges if a != b]
+
+
+def to_networkx(songs, edges):
+    G = nx.DiGraph()
+    G.add_nodes_from(row[0] for row in songs)
+    G.add_edges_from(edges)
+    return G
+
+
+@pytest.fixture
+def corpus():
+    return random_corpus()
+
+
+def test_corpus_graph_drops_edges_to_unknown_songs():
+    """Test edges are mapped by ID and edges to missing songs are ignored"""
+    songs = [(2, "B", None, None), (5, "E", "Artist", 1990)]
+    graph = corpus_graph(songs, [(5, 2), (5, 9), (1, 2)])
+    assert graph.n_edges == 1
+    assert graph.successors(5).tolist() == [2]
+    assert graph.node(2)["artist"] == "Unknown"
+
+
+def test_pagerank_matches_dense_reference(corpus):
+    """Test the vectorized PageRank against a dense power iteration"""
+    graph = corpus_graph(*corpus)
+    n = graph.n_nodes
+    matrix = np.zeros((n, n))
+    for a, b in zip(graph.src, graph.dst):
+        matrix[b, a] = 1.0
+    out = matrix.sum(axis=0)
+    matrix[:, out == 0] = 1.0
+    matrix /= matrix.sum(axis=0)
+    expected = np.full(n, 1.0 / n)
+    for _ in range(200):
+        expected = 0.15 / n + 0.85 * matrix @ expected
+
+    assert np.allclose(pagerank(graph), expected, atol=1e-8)
+
+
+def test_components_match_networkx(corpus):
+    """Test weakly connected components against networkx"""
+    graph = corpus_graph(*corpus)
+    labels = component_labels(graph)
+    groups = {}
+    for song_id, label in zip(graph.ids.tolist(), labels.tolist()):
+        groups.setdefault(label, set()).add(song_id)
+    expected = nx.weakly_connected_components(to_networkx(*corpus))
+    assert sorted(map(sorted, groups.values())) == sorted(map(sorted, expected))
+
+
+@pytest.mark.parametrize("directed", [True, False])
+def test_shortest_chain_matches_networkx(corpus, directed):
+    """Test bidirectional BFS finds chains as short as networkx does"""
+    graph = corpus_graph(*corpus)
+    G = to_networkx(*corpus)
+    if not directed:
+        G = G.to_undirected()
+    rng = random.Random(1)
+    for _ in range(50):
+        a, b = rng.randint(1, 300), rng.randint(1, 300)
+        chain = shortest_chain(graph, a, b, directed=directed)
+        try:
+            expected = nx.shortest_path_length(G, a, b)
+        except nx.NetworkXNoPath:
+            assert chain is None
+            continue
+        assert len(chain) - 1 == expected
+        assert chain[0] == a and chain[-1] == b
+        assert all(G.has_edge(x, y) for x, y in zip(chain, chain[1:]))
+
+
+def test_top_queries():
+    """Test the precomputed rankings"""
+    songs = [
+        (1, "Break", "Drummer", 1970),
+        (2, "Hit", "Rapper", 1990),
+        (3, "Other Hit", "Rapper", 1992),
+        (4, "B-side", "Drummer", 1971),
+    ]
+    analytics = CorpusAnalytics(corpus_graph(songs, [(2, 1), (3, 1), (3, 4)]))
+
+    assert [(s["id"], s["times_sampled"]) for s in analytics.most_sampled_songs()] == [(1, 2), (4, 1)]
+    assert analytics.most_sampled_artists() == [
+        {"artist": "Drummer", "times_sampled": 3, "songs_sampled": 2}
+    ]
+    assert analytics.most_influential(1)[0]["id"] == 1
+    assert analytics.component_size(2) == 4
+    assert [s["id"] for s in analytics.shortest_chain(2, 4, directed=False)] == [2, 1, 3, 4]
+    assert analytics.shortest_chain(2, 4) is None
+    assert analytics.shortest_chain(2, 99) is None
+
+
+def test_warm_start_converges_to_same_scores(corpus):
+    """Test a refresh seeded with the previous scores matches a cold build"""
+    songs, edges = corpus
+    previous = CorpusAnalytics(corpus_graph(songs[:-20], edges[:-30]))
+    refreshed = CorpusAnalytics(corpus_graph(songs, edges), previous=previous)
+    cold = CorpusAnalytics(corpus_graph(songs, edges))
+    assert np.allclose(refreshed.influence, cold.influence, atol=1e-8)
@@ -0,0 +1,85 @@
+from unittest.mock import patch
+
+from whosampled.api.records import SampleRecord, SongRecord
+from whosampled.components.exploration_view import EXPLORE_CHART_KEY, expand_selected_songs
+from whosampled.utils.exploration import GraphExploration
+from tests.api.test_get_song_info import make_song_response, mock_songs_api
+
+
+def record(song_id, samples, year=1990):
+    return SampleRecord(
+        SongRecord(song_id, f"Song {song_id}", "Artist", year),
+        [SongRecord(i, f"Song {i}", "Artist", 1970) for i in samples],
+    )
+
+
+def test_expand_only_adds_the_delta():
+    """Test expanding merges new points into the two traces and leaves existing songs in place"""
+    exploration = GraphExploration(record(1, [2, 3]))
+    figure = exploration.figure
+    before = dict(exploration.positions)
+
+    delta = exploration.expand(record(2, [3, 4, 5]))
+
+    assert delta["songs"] == [4, 5]
+    assert delta["edges"] == [(2, 3), (2, 4), (2, 5)]
+    assert exploration.figure is figure
+    assert len(figure.data) == 2
+    assert {i: exploration.positions[i] for i in before} == before
+    assert exploration.depths[4] == 2
+    assert list(figure.data[1].customdata) == [1, 2, 3, 4, 5]
+    assert len(figure.data[0].x) == 3 * len(exploration.edges)
+
+
+def test_expand_is_idempotent_and_ignores_unknown_songs():
+    """Test re-expanding a song or expanding a song not in the graph does nothing"""
+    exploration = GraphExploration(record(1, [2]))
+    n_traces = len(exploration.figure.data)
+    assert exploration.expand(record(1, [2, 9])) == {"songs": [], "edges": []}
+    assert exploration.expand(record(7, [8])) == {"songs": [], "edges": []}
+    assert len(exploration.figure.data) == n_traces
+
+
+def test_ties_are_spread_apart():
+    """Test songs sharing a depth and year get distinct positions"""
+    exploration = GraphExploration(record(1, [2, 3, 4]))
+    xs = sorted(exploration.positions[i][0] for i in (2, 3, 4))
+    assert len(set(xs)) == 3
+    assert xs[1] == 1970
+
+
+def test_songs_without_years_sit_at_the_median_year():
+    """Test a main song with no year is not pinned to year 0 on the release-year axis"""
+    main = SongRecord(1, "Song 1", "Artist", None)
+    samples = [SongRecord(2, "Song 2", "Artist", 1970), SongRecord(3, "Song 3", "Artist", 1980),
+               SongRecord(4, "Song 4", "Artist", None)]
+    exploration = GraphExploration(SampleRecord(main, samples))
+
+    assert exploration.positions[1][0] == 1975
+    assert 1970 <= exploration.positions[4][0] <= 1980
+    assert exploration.figure.layout.xaxis.showticklabels
+
+
+def test_song_at_maps_clicks_to_songs():
+    """Test clicked points map back to song IDs and edge clicks are ignored"""
+    exploration = GraphExploration(record(1, [2, 3]))
+    assert exploration.song_at(1, 0) == 1
+    assert exploration.song_at(1, 2) == 3
+    assert exploration.song_at(0, 0) is None
+    assert exploration.song_at(1, 9) is None
+
+
+def test_clicked_song_is_fetched_and_expanded(session_state):
+    """Test a chart selection expands the clicked song with one fetch"""
+    exploration = GraphExploration(record(1, [2, 3]))
+    session_state[EXPLORE_CHART_KEY] = {
+        "selection": {"points": [{"curve_number": 1, "point_index": 1}]}
+    }
+    side_effect, _ = mock_songs_api({2: make_song_response(2, samples=[10, 11])})
+    with patch('requests.Session.get', side_effect=side_effect) as mock_get:
+        expand_selected_songs(exploration)
+        expand_selected_songs(exploration)
+
+    assert mock_get.call_count == 1
+    assert exploration.expanded == {1, 2}
+    assert {10, 11} <= exploration.songs.keys()
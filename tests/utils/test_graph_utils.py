@@ -0,0 +1,71 @@
+import numpy as np
+import plotly.graph_objects as go
+from whosampled.utils.graph_utils import (
+    build_graph,
+    calculate_node_positions,
+    edge_segments,
+    hierarchical_positions,
+    plot_graph,
+)
+from whosampled.utils.compact_graph import CompactGraph
+
+MAIN_SONG = {"id": 1, "title": "Main", "artist": "Main Artist", "year": 1995}
+SAMPLED_SONGS = [
+    {"id": 2, "title": "First", "artist": "A", "year": 1970},
+    {"id": 3, "title": "Second", "artist": "B", "year": None},
+    {"id": 4, "title": "Third", "artist": "C", "year": 1981},
+]
+
+
+def test_hierarchical_positions():
+    """Test the main song sits on top and its samples are centered below"""
+    x, y = hierarchical_positions(np.array([0, 1, 1, 1]))
+    assert list(zip(x, y)) == [(0, 1), (-0.375, 0), (-0.125, 0), (0.125, 0)]
+
+    positions = calculate_node_positions(MAIN_SONG, SAMPLED_SONGS)
+    assert [positions[s["title"]] for s in [MAIN_SONG] + SAMPLED_SONGS] == list(zip(x, y))
+
+
+def test_edge_segments_are_nan_separated():
+    """Test every edge becomes a start, end and gap point"""
+    x, y = np.array([0.0, 1.0, 2.0]), np.array([1.0, 0.0, 0.0])
+    edge_x, edge_y = edge_segments(x, y, np.array([0, 0]), np.array([1, 2]))
+
+    assert np.array_equal(edge_x, [0, 1, np.nan, 0, 2, np.nan], equal_nan=True)
+    assert np.array_equal(edge_y, [1, 0, np.nan, 1, 0, np.nan], equal_nan=True)
+
+
+def test_plot_graph_small_graph_uses_svg():
+    """Test small graphs keep SVG traces, labels and the original hover text"""
+    fig = plot_graph(build_graph(MAIN_SONG, SAMPLED_SONGS))
+    edge_trace, node_trace = fig.data
+
+    assert isinstance(node_trace, go.Scatter)
+    assert list(node_trace.marker.color) == [1, 0, 0, 0]
+    assert node_trace.marker.colorscale[0][1] == "blue"
+    assert node_trace.marker.colorscale[-1][1] == "red"
+    assert node_trace.text[0] == "Main by Main Artist\nYear: 1995"
+    assert node_trace.text[2] == "Second by B\nYear: Unknown"
+    assert len(edge_trace.x) == 3 * len(SAMPLED_SONGS)
+
+
+def test_plot_graph_large_graph_uses_webgl():
+    """Test graphs above the threshold switch to Scattergl without labels"""
+    n = 50
+    songs = [{"id": i, "title": f"Song {i}", "artist": "A", "year": 2000} for i in range(n)]
+    graph = CompactGraph.from_songs(songs, [(0, i) for i in range(1, n)])
+    fig = plot_graph(graph, webgl_threshold=10)
+    edge_trace, node_trace = fig.data
+
+    assert isinstance(edge_trace, go.Scattergl)
+    assert isinstance(node_trace, go.Scattergl)
+    assert node_trace.mode == "markers"
+    assert len(node_trace.hovertext) == n
+    assert node_trace.marker.size[0] > node_trace.marker.size[1]
+
+
+def test_plot_graph_without_main_song():
+    """Test a graph where every song is sampled gives an empty figure"""
+    songs = [{"id": i, "title": f"Song {i}", "artist": "A", "year": None} for i in range(2)]
+    fig = plot_graph(CompactGraph.from_songs(songs, [(0, 1), (1, 0)]))
+    assert len(fig.data) == 0
@@ -0,0 +1,98 @@
+import time
+import numpy as np
+from whosampled.utils.compact_graph import CompactGraph
+from whosampled.utils.layout import chronological_layout, layer_depths, graph_hash
+
+
+def song(song_id, year=None):
+    return {"id": song_id, "title": f"Song {song_id}", "artist": "A", "year": year}
+
+
+def crossings(graph, x):
+    """Count crossing edge pairs that leave the same layer"""
+    src, dst = x[graph.src], x[graph.dst]
+    layer = layer_depths(graph)[graph.src]
+    count = 0
+    for i in range(len(src)):
+        for j in range(i + 1, len(src)):
+            if layer[i] == layer[j] and (src[i] - src[j]) * (dst[i] - dst[j]) < 0:
+                count += 1
+    return count
+
+
+def test_years_on_x_and_depth_on_y():
+    """Test songs are placed by release year and lineage depth"""
+    g = CompactGraph.from_songs(
+        [song(1, 1995), song(2, 1970), song(3, 1982), song(4, 1960)],
+        [(1, 2), (1, 3), (2, 4)],
+    )
+    x, y = chronological_layout(g)
+
+    assert x.tolist() == [1995, 1970, 1982, 1960]
+    assert y.tolist() == [0, -1, -1, -2]
+
+
+def test_layer_depths_multi_level():
+    """Test depth is the shortest hop count from a root"""
+    g = CompactGraph.from_songs([song(i) for i in range(1, 5)], [(1, 2), (2, 3), (1, 3), (3, 4)])
+    assert layer_depths(g).tolist() == [0, 1, 1, 2]
+
+
+def test_unknown_years_follow_neighbors():
+    """Test songs without a year sit at the barycenter of their neighbors"""
+    g = CompactGraph.from_songs(
+        [song(1, 2000), song(2, None), song(3, 1970), song(4, 1980)],
+        [(1, 2), (1, 3), (2, 4)],
+    )
+    x, _ = chronological_layout(g)
+    assert 1980 <= x[1] <= 2000
+
+
+def test_ties_are_spread_in_barycenter_order():
+    """Test songs sharing a layer and year do not overlap and avoid crossings"""
+    # Parents at 1990 and 2000 each sample one of two 1970 songs
+    g = CompactGraph.from_songs(
+        [song(1, 1990), song(2, 2000), song(3, 1970), song(4, 1970)],
+        [(1, 4), (2, 3)],
+    )
+    x, _ = chronological_layout(g)
+
+    assert x[2] != x[3]
+    assert abs(x[2] - 1970) < 1 and abs(x[3] - 1970) < 1
+    assert crossings(g, x) == 0
+
+
+def test_barycenter_ordering_without_years():
+    """Test layers are reordered to remove crossings when no years are known"""
+    g = CompactGraph.from_songs(
+        [song(i) for i in range(1, 7)],
+        [(1, 2), (1, 3), (2, 6), (3, 5), (3, 4)],
+    )
+    x, y = chronological_layout(g)
+
+    assert crossings(g, x) == 0
+    assert len(set(zip(x.tolist(), y.tolist()))) == g.n_nodes
+
+
+def test_layout_is_cached_per_graph():
+    """Test identical graphs reuse the cached layout"""
+    songs, edges = [song(1, 1990), song(2, 1980)], [(1, 2)]
+    first = CompactGraph.from_songs(songs, edges)
+    second = CompactGraph.from_songs(songs, edges)
+
+    assert graph_hash(first) == graph_hash(second)
+    assert chronological_layout(first)[0] is chronological_layout(second)[0]
+
+
+def test_large_layout_is_fast():
+    """Test layout of a several-thousand-node lineage stays interactive"""
+    n = 5000
+    rng = np.random.default_rng(0)
+    songs = [song(i, int(rng.integers(1960, 2020)) if i % 3 else None) for i in range(n)]
+    edges = [(i // 3, i) for i in range(1, n)]
+    g = CompactGraph.from_songs(songs, edges)
+
+    start = time.perf_counter()
+    x, y = chronological_layout(g)
+    assert time.perf_counter() - start < 1.0
+    assert not np.isnan(x).any()
@@ -0,0 +1,124 @@
+import json
+import logging
+import socket
+import urllib.request
+from unittest.mock import Mock, patch
+
+import requests
+
+from whosampled.api.genius_client import call_genius_api
+from whosampled.utils import metrics as metrics_module
+from whosampled.utils.graph_utils import build_graph, plot_graph
+from whosampled.utils.metrics import MetricsRegistry, record_timings, timed
+
+
+def test_counters_and_histograms_render_as_prometheus():
+    """Test the text exposition format of counters and histograms"""
+    registry = MetricsRegistry(buckets=(0.1, 1.0), log=False)
+    registry.inc("requests_total", endpoint="/search", status=200)
+    registry.inc("requests_total", 2, endpoint="/search", status=200)
+    registry.observe("latency_seconds", 0.05, endpoint="/search")
+    registry.observe("latency_seconds", 0.5, endpoint="/search")
+    registry.observe("latency_seconds", 5.0, endpoint="/search")
+    registry.register_collector("cache", lambda: {"hits": 3, "name": "ignored"})
+
+    text = registry.render_prometheus()
+    assert 'requests_total{endpoint="/search",status="200"} 3' in text
+    assert 'latency_seconds_bucket{endpoint="/search",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{endpoint="/search",le="1"} 2' in text
+    assert 'latency_seconds_bucket{endpoint="/search",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{endpoint="/search"} 3' in text
+    assert "cache_hits 3" in text
+    assert "cache_name" not in text
+
+
+def test_timer_labels_and_rerun_timings():
+    """Test timers accept late labels and are collected per rerun"""
+    registry = MetricsRegistry(log=False)
+    with record_timings() as timings:
+        with registry.timer("step_seconds") as labels:
+            labels["status"] = "ok"
+    registry.observe("outside_seconds", 1.0)
+
+    assert registry.histogram_count("step_seconds", status="ok") == 1
+    assert [t["metric"] for t in timings] == ["step_seconds"]
+    assert timings[0]["status"] == "ok"
+
+
+def test_structured_log_lines(caplog):
+    """Test observations are logged as JSON when enabled"""
+    registry = MetricsRegistry(log=True)
+    with caplog.at_level(logging.INFO, logger="whosampled.metrics"):
+        registry.observe("plot_graph_seconds", 0.25, renderer="svg")
+    assert json.loads(caplog.records[0].message) == {
+        "metric": "plot_graph_seconds", "value": 0.25, "renderer": "svg",
+    }
+
+
+def test_genius_calls_are_counted(metrics):
+    """Test requests, status, retries and bytes are recorded per endpoint"""
+    failed = Mock(status_code=503, content=b"")
+    failed.raise_for_status.side_effect = requests.exceptions.HTTPError(response=failed)
+    failed.headers = {"Retry-After": "0"}
+    ok = Mock(status_code=200, content=b'{"response": {}}')
+    ok.json.return_value = {"response": {}}
+    with patch('requests.Session.get', side_effect=[failed, ok]), \
+            patch('time.sleep'):
+        call_genius_api("/songs/{song_id}", song_id=1)
+        call_genius_api("/songs/{song_id}", song_id=1)
+
+    endpoint = "/songs/{song_id}"
+    assert metrics.counter_value("genius_requests_total", endpoint=endpoint, status=503) == 1
+    assert metrics.counter_value("genius_requests_total", endpoint=endpoint, status=200) == 1
+    assert metrics.counter_value("genius_retries_total", endpoint=endpoint, reason=503) == 1
+    assert metrics.counter_value("genius_response_bytes_total", endpoint=endpoint) == 16
+    assert metrics.histogram_count("genius_call_seconds", endpoint=endpoint) == 2
+    assert metrics.counter_value("response_cache_lookups_total", layer="memory") == 1
+
+
+def test_graph_functions_are_timed(metrics):
+    """Test build_graph and plot_graph record their duration"""
+    main_song = {"id": 1, "title": "Main", "artist": "A", "year": 2000}
+    G = build_graph(main_song, [{"id": 2, "title": "Sample", "artist": "B", "year": 1970}])
+    plot_graph(G)
+    assert metrics.histogram_count("build_graph_seconds") == 1
+    assert metrics.histogram_count("plot_graph_seconds", renderer="svg") == 1
+
+
+def test_timed_decorator(metrics):
+    """Test the decorator observes each call"""
+    @timed("work_seconds", kind="test")
+    def work():
+        return 42
+
+    assert work() == 42
+    assert metrics.histogram_count("work_seconds", kind="test") == 1
+
+
+def test_metrics_server(monkeypatch, metrics):
+    """Test the registry is served over HTTP at /metrics"""
+    monkeypatch.setattr(metrics_module, "_server", None)
+    metrics.inc("hello_total")
+    server = metrics_module.start_metrics_server(0, host="127.0.0.1")
+    try:
+        assert metrics_module.start_metrics_server(0) is server
+        host, port = server.server_address[:2]
+        body = urllib.request.urlopen(f"http://{host}:{port}/metrics").read().decode()
+        assert "hello_total 1" in body
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_metrics_server_port_in_use(monkeypatch, caplog):
+    """Test a taken port is logged once and does not break later reruns"""
+    monkeypatch.setattr(metrics_module, "_server", None)
+    monkeypatch.setattr(metrics_module, "_server_failed", False)
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        port = taken.getsockname()[1]
+        with caplog.at_level(logging.WARNING, logger="whosampled.metrics"):
+            assert metrics_module.start_metrics_server(port) is None
+            assert metrics_module.start_metrics_server(port) is None
+    assert len(caplog.records) == 1
@@ -0,0 +1,16 @@
+from whosampled.config import STARTUP_IMPORT_BUDGET
+from whosampled.utils.startup import measure_startup
+
+
+def test_app_import_defers_heavy_dependencies():
+    """Test importing the app loads no NumPy, pandas, networkx or OpenAI"""
+    result = measure_startup(("whosampled.app", "whosampled.services.song_service"))
+    assert result["loaded"] == []
+    assert result["seconds"] < STARTUP_IMPORT_BUDGET
+
+
+def test_measure_startup_reports_loaded_modules():
+    """Test the probe sees modules pulled in by the import"""
+    result = measure_startup(("whosampled.utils.graph_utils",))
+    assert "numpy" in result["loaded"]
+    assert "networkx" not in result["loaded"]
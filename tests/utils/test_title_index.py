@@ -0,0 +1,41 @@
+from whosampled.utils.title_index import TitleIndex, normalize_title
+
+
+def test_normalize_title():
+    """Test punctuation, case and non-breaking spaces are normalized"""
+    assert normalize_title("Ice Ice Baby by\xa0Vanilla Ice!") == "ice ice baby by vanilla ice"
+
+
+def test_search_matches_partial_and_prefix_queries():
+    """Test typeahead queries match titles seen before"""
+    index = TitleIndex()
+    index.add_many([
+        ("Ice Ice Baby by Vanilla Ice", 1),
+        ("Under Pressure by Queen & David Bowie", 2),
+        ("Nice for What by Drake", 3),
+    ])
+
+    assert index.search("ice ice") == [("Ice Ice Baby by Vanilla Ice", 1)]
+    assert index.search("under press")[0][1] == 2
+    assert index.search("zzz") == []
+
+
+def test_search_ranks_prefix_matches_first():
+    """Test titles starting with the query come before other matches"""
+    index = TitleIndex()
+    index.add("Sample Song by Someone", 1)
+    index.add("Song by Sample", 2)
+
+    assert [song_id for _, song_id in index.search("song", min_score=0.5)] == [2, 1]
+
+
+def test_index_is_bounded():
+    """Test the oldest titles are dropped past max_titles"""
+    index = TitleIndex(max_titles=2)
+    index.add("First Song", 1)
+    index.add("Second Song", 2)
+    index.add("Third Song", 3)
+
+    assert len(index) == 2
+    assert index.search("first song") == []
+    assert index.search("third song") == [("Third Song", 3)]
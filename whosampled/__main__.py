@@ -0,0 +1,5 @@
+import sys
+
+from whosampled.cli import main
+
+sys.exit(main())
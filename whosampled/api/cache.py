@@ -0,0 +1,395 @@
+# cache.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from whosampled.config import (
+    GENIUS_CACHE_ENABLED,
+    GENIUS_CACHE_MAX_BYTES,
+    GENIUS_CACHE_MEMORY_ENTRIES,
+    GENIUS_CACHE_PATH,
+    GENIUS_CACHE_STALE_TTL,
+)
+from whosampled.utils.metrics import get_metrics
+
+# Freshness per endpoint template, in seconds
+ENDPOINT_TTLS = {
+    "/search": 6 * 60 * 60,
+    "/songs/{song_id}": 7 * 24 * 60 * 60,
+}
+DEFAULT_TTL = 60 * 60
+
+# Access times are buffered and written in one batch once this many keys
+# are pending or this many seconds have passed since the last write
+ACCESS_FLUSH_ENTRIES = 256
+ACCESS_FLUSH_INTERVAL = 30.0
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    stored_at: float
+    expires_at: float
+
+
+def make_cache_key(endpoint: str, params: Dict) -> str:
+    """
+    Build a cache key from the endpoint template and normalized parameters.
+    Keys are sorted and string values are stripped and lower-cased so that
+    "Ice Ice Baby " and "ice ice baby" share an entry.
+    """
+    normalized = {}
+    for key, value in params.items():
+        if isinstance(value, str):
+            value = " ".join(value.split()).lower()
+        normalized[key] = str(value)
+    return f"{endpoint}?{json.dumps(normalized, sort_keys=True)}"
+
+
+class LRUCache:
+    """Thread-safe in-process LRU bounded by entry count."""
+
+    def __init__(self, max_entries: int = GENIUS_CACHE_MEMORY_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    Persistent JSON cache stored in SQLite, bounded by total payload bytes.
+    When the store grows past max_bytes the least recently used rows are
+    evicted until it is back under 90% of the budget. Reads do not write:
+    access times are buffered in memory and flushed in batches, and always
+    before eviction.
+    """
+
+    def __init__(self, path: str = GENIUS_CACHE_PATH, max_bytes: int = GENIUS_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._touched: Dict[str, float] = {}
+        self._last_flush = time.monotonic()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)"
+        )
+        self._conn.commit()
+        self._bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._touch(key)
+        return CacheEntry(json.loads(row[0]), row[1], row[2])
+
+    def touch(self, key: str):
+        """Mark key as recently used, e.g. after a hit in a faster tier."""
+        with self._lock:
+            self._touch(key)
+
+    def _touch(self, key: str):
+        self._touched[key] = time.time()
+        if (
+            len(self._touched) >= ACCESS_FLUSH_ENTRIES
+            or time.monotonic() - self._last_flush >= ACCESS_FLUSH_INTERVAL
+        ):
+            self._flush_access()
+            self._conn.commit()
+
+    def _flush_access(self):
+        """Write buffered access times; the caller commits."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()],
+            )
+            self._touched.clear()
+        self._last_flush = time.monotonic()
+
+    def set(self, key: str, entry: CacheEntry):
+        try:
+            payload = json.dumps(entry.value, separators=(",", ":"))
+        except (TypeError, ValueError):
+            # Only JSON payloads are persisted; anything else stays in memory
+            return
+        size = len(payload)
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload, entry.stored_at, entry.expires_at, time.time(), size),
+            )
+            self._bytes += size - (old[0] if old else 0)
+            self._touched.pop(key, None)
+            if self._bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+            self._conn.commit()
+
+    def _evict(self, target_bytes: int):
+        self._flush_access()
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall()
+        for key, size in rows:
+            if self._bytes <= target_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._bytes -= size
+            self.evictions += 1
+
+    def iter_rows(
+        self, prefix: str = "", chunk_size: int = 1000
+    ) -> Iterator[Tuple[str, str, float, float]]:
+        """
+        Yield (key, JSON payload, stored_at, expires_at) for every entry whose
+        key starts with prefix, in key order. Payloads are not decoded, and
+        the lock is only held for one chunk at a time.
+        """
+        last = prefix
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    """SELECT key, value, stored_at, expires_at FROM responses
+                    WHERE key > ? AND key >= ? ORDER BY key LIMIT ?""",
+                    (last, prefix, chunk_size),
+                ).fetchall()
+            rows = [row for row in rows if row[0].startswith(prefix)]
+            if not rows:
+                return
+            yield from rows
+            last = rows[-1][0]
+
+    def set_rows(self, rows: Iterable[Tuple[str, str, float, float]]) -> int:
+        """
+        Bulk-insert (key, JSON payload, stored_at, expires_at) rows in one
+        transaction, keeping whichever copy of a key was stored last.
+        Returns the number of rows written.
+        """
+        now = time.time()
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                """INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    value = excluded.value,
+                    stored_at = excluded.stored_at,
+                    expires_at = excluded.expires_at,
+                    size = excluded.size
+                WHERE excluded.stored_at > responses.stored_at""",
+                (
+                    (key, payload, stored_at, expires_at, now, len(payload))
+                    for key, payload, stored_at, expires_at in rows
+                ),
+            )
+            written = self._conn.total_changes - before
+            self._bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+            if self._bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+            self._conn.commit()
+        return written
+
+    def delete(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._touched.pop(key, None)
+            if row:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._bytes -= row[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._touched.clear()
+            self._bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def close(self):
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+            self._conn.close()
+
+
+class ResponseCache:
+    """
+    Two-tier cache for Genius API responses: an in-process LRU in front of
+    a persistent SQLite store. Entries past their TTL are still served for
+    stale_ttl seconds while a background refresh fetches a fresh copy.
+    """
+
+    def __init__(
+        self,
+        memory: Optional[LRUCache] = None,
+        disk: Optional[SQLiteCache] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = DEFAULT_TTL,
+        stale_ttl: float = GENIUS_CACHE_STALE_TTL,
+    ):
+        self.memory = memory if memory is not None else LRUCache()
+        self.disk = disk
+        self.ttls = dict(ENDPOINT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stale_hits": 0, "refreshes": 0}
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for key from memory, falling back to disk."""
+        entry = self.memory.get(key)
+        layer = "memory"
+        if entry is not None and self.disk is not None:
+            # Keep the disk tier's LRU order in step with memory-tier hits
+            self.disk.touch(key)
+        elif entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            layer = "disk"
+            if entry is not None:
+                self.memory.set(key, entry)
+        get_metrics().inc("response_cache_lookups_total", layer=layer if entry else "miss")
+        return entry
+
+    def store(self, endpoint: str, key: str, value: Any):
+        now = time.time()
+        entry = CacheEntry(value, now, now + self.ttl_for(endpoint))
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, entry)
+
+    def get_or_fetch(self, endpoint: str, params: Dict, fetch: Callable[[], Any]) -> Any:
+        """Return a cached response for endpoint+params, calling fetch on a miss."""
+        key = make_cache_key(endpoint, params)
+        entry = self.lookup(key)
+        now = time.time()
+
+        if entry is not None and now < entry.expires_at:
+            self._count("hits")
+            return entry.value
+
+        if entry is not None and now < entry.expires_at + self.stale_ttl:
+            self._count("stale_hits")
+            self._refresh_in_background(endpoint, key, fetch)
+            return entry.value
+
+        self._count("misses")
+        value = fetch()
+        self.store(endpoint, key, value)
+        return value
+
+    def _refresh_in_background(self, endpoint: str, key: str, fetch: Callable[[], Any]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.store(endpoint, key, fetch())
+                self._count("refreshes")
+            except Exception:
+                # Keep serving the stale copy; the next stale hit retries
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and tier sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["stale_hits"]) / lookups if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        if self.disk is not None:
+            stats["disk_bytes"] = self.disk.total_bytes
+            stats["disk_evictions"] = self.disk.evictions
+        return stats
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+        with self._lock:
+            self._stats = {key: 0 for key in self._stats}
+
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """Create the default response cache from config, or None when disabled."""
+    if not GENIUS_CACHE_ENABLED:
+        return None
+    try:
+        disk = SQLiteCache(GENIUS_CACHE_PATH, GENIUS_CACHE_MAX_BYTES)
+    except (sqlite3.Error, OSError):
+        # Fall back to memory-only caching if the cache file is unusable
+        disk = None
+    return ResponseCache(disk=disk)
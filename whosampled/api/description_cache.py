@@ -0,0 +1,76 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from whosampled.api.cache import CacheEntry, SQLiteCache
+from whosampled.config import (
+    DESCRIPTION_CACHE_ENABLED,
+    DESCRIPTION_CACHE_MAX_BYTES,
+    DESCRIPTION_CACHE_PATH,
+    DESCRIPTION_CACHE_TTL,
+)
+
+
+def description_cache_key(
+    song_title: str, sampled_songs: List[Dict], model: str, prompt_template: str
+) -> str:
+    """
+    Content address of a generated description: a hash of the song title,
+    the sorted sampled-song IDs, the model and the prompt template. Any change
+    to one of them (e.g. a reworded prompt) produces a new key.
+    """
+    payload = json.dumps(
+        [song_title, sorted(song["id"] for song in sampled_songs), model, prompt_template]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DescriptionCache:
+    """Persistent TTL- and size-bounded store of LLM sample descriptions."""
+
+    def __init__(self, store: SQLiteCache, ttl: float = DESCRIPTION_CACHE_TTL):
+        self.store = store
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.store.get(key)
+        if entry is None or entry.expires_at <= time.time():
+            return None
+        return entry.value
+
+    def set(self, key: str, description: str):
+        now = time.time()
+        self.store.set(key, CacheEntry(description, now, now + self.ttl))
+
+    def clear(self):
+        self.store.clear()
+
+
+_cache: Optional[DescriptionCache] = None
+_lock = threading.Lock()
+
+
+def get_description_cache() -> Optional[DescriptionCache]:
+    """Return the process-wide description cache, or None when disabled."""
+    global _cache
+    if _cache is None and DESCRIPTION_CACHE_ENABLED:
+        with _lock:
+            if _cache is None:
+                try:
+                    _cache = DescriptionCache(
+                        SQLiteCache(DESCRIPTION_CACHE_PATH, DESCRIPTION_CACHE_MAX_BYTES)
+                    )
+                except (sqlite3.Error, OSError) as e:
+                    print(f"Description cache unavailable: {e}")
+                    return None
+    return _cache
+
+
+def set_description_cache(cache: Optional[DescriptionCache]):
+    """Replace the process-wide description cache (used by tests)."""
+    global _cache
+    with _lock:
+        _cache = cache
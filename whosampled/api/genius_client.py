@@ -1,38 +1,304 @@
 # genius_client.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
 import requests
-from whosampled.config import ACCESS_TOKEN
+from requests.adapters import HTTPAdapter
+
+from whosampled.api.cache import ResponseCache, create_response_cache, make_cache_key
+from whosampled.api.records import slim_song_response
+from whosampled.api.rate_limit import (
+    CircuitBreaker,
+    TokenBucket,
+    backoff_delay,
+    get_circuit_breaker,
+    get_rate_limiter,
+    parse_retry_after,
+)
+from whosampled.api.singleflight import SingleFlight
+from whosampled.utils.metrics import get_metrics
+from whosampled.config import (
+    ACCESS_TOKEN,
+    GENIUS_BACKOFF_CAP,
+    GENIUS_COMPRESSION,
+    GENIUS_BASE_URL,
+    GENIUS_CONNECT_TIMEOUT,
+    GENIUS_KEEP_ALIVE,
+    GENIUS_MAX_RETRIES,
+    GENIUS_POOL_SIZE,
+    GENIUS_READ_TIMEOUT,
+)
 
-BASE_URL = "https://api.genius.com"
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "speedups" extra
+    orjson = None
+
+BASE_URL = GENIUS_BASE_URL
 HEADERS = {"Authorization": f"Bearer {ACCESS_TOKEN}"}
 
-def call_genius_api(endpoint, **kwargs):
+# Responses are reduced to the fields we read before they are cached
+RESPONSE_SLIMMERS = {"/songs/{song_id}": slim_song_response}
+
+
+class GeniusAPIError(Exception):
+    """Raised when a Genius API request fails after all retries."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def build_request(endpoint: str, base_url: str = BASE_URL, **kwargs) -> Tuple[str, Dict]:
     """
-    A helper function to call the Genius API.
-    endpoint: (str) The API endpoint (e.g., "/songs/{song_id}" or "/artists/{artist_id}/songs/{song_id}").
-    **kwargs: Format parameters for the endpoint and query parameters.
+    Split kwargs into endpoint format parameters and query parameters.
+    Returns the full URL and the query parameters.
     """
     # Separate format parameters from query parameters
     format_params = {}
     query_params = {}
-    
+
     # Check if endpoint has format placeholders
-    if '{' in endpoint:
+    if "{" in endpoint:
         # Extract format parameters from kwargs
         for key, value in kwargs.items():
             if f"{{{key}}}" in endpoint:
                 format_params[key] = value
             else:
                 query_params[key] = value
-        
+
         # Format the URL with the parameters
-        url = f"{BASE_URL}{endpoint.format(**format_params)}"
+        url = f"{base_url}{endpoint.format(**format_params)}"
     else:
-        url = f"{BASE_URL}{endpoint}"
+        url = f"{base_url}{endpoint}"
         query_params = kwargs
-    
-    try:
-        response = requests.get(url, headers=HEADERS, params=query_params)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        raise Exception(f"API Error: {str(e)}")
\ No newline at end of file
+
+    return url, query_params
+
+
+def _body_size(response) -> int:
+    content = response.content
+    return len(content) if isinstance(content, (bytes, bytearray)) else 0
+
+
+def decode_response(response) -> Dict:
+    """Decode a JSON body, with orjson when it is installed."""
+    content = response.content
+    if orjson is not None and isinstance(content, (bytes, bytearray)):
+        return orjson.loads(content)
+    return response.json()
+
+
+class GeniusClient:
+    """
+    Genius API client that owns a pooled, keep-alive requests.Session.
+    One instance is shared by the whole process (see get_client) so every
+    search and song lookup reuses already-open TCP/TLS connections.
+    """
+
+    def __init__(
+        self,
+        access_token: Optional[str] = ACCESS_TOKEN,
+        pool_size: int = GENIUS_POOL_SIZE,
+        keep_alive: bool = GENIUS_KEEP_ALIVE,
+        connect_timeout: float = GENIUS_CONNECT_TIMEOUT,
+        read_timeout: float = GENIUS_READ_TIMEOUT,
+        compression: bool = GENIUS_COMPRESSION,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        max_retries: int = GENIUS_MAX_RETRIES,
+        base_url: str = BASE_URL,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker()
+        self.max_retries = max_retries
+        self.inflight = SingleFlight()
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.session.headers.update(
+            {
+                "Authorization": f"Bearer {access_token}",
+                "Connection": "keep-alive" if keep_alive else "close",
+                "Accept-Encoding": "gzip, deflate" if compression else "identity",
+            }
+        )
+
+    def get(self, endpoint: str, **kwargs) -> Dict:
+        """
+        Return the JSON body for a GET request against the Genius API,
+        served from the response cache when one is configured. Concurrent
+        identical requests are coalesced into a single upstream call.
+        """
+        key = make_cache_key(endpoint, kwargs)
+        return self.inflight.do(key, lambda: self._get(endpoint, kwargs))
+
+    async def get_async(self, endpoint: str, **kwargs) -> Dict:
+        """Async variant of get; shares in-flight requests with sync callers."""
+        key = make_cache_key(endpoint, kwargs)
+        return await self.inflight.do_async(
+            key, lambda: self._get(endpoint, kwargs), _get_executor()
+        )
+
+    def _get(self, endpoint: str, params: Dict) -> Dict:
+        with get_metrics().timer("genius_call_seconds", endpoint=endpoint):
+            if self.cache is None:
+                return self.fetch(endpoint, **params)
+            return self.cache.get_or_fetch(
+                endpoint, params, lambda: self.fetch(endpoint, **params)
+            )
+
+    def fetch(self, endpoint: str, **kwargs) -> Dict:
+        """
+        Perform a GET request against the Genius API, bypassing the cache.
+        Requests go through the shared token bucket and circuit breaker;
+        connection errors, 429 and 5xx responses are retried with jittered
+        exponential backoff, honoring Retry-After when the server sends it.
+        """
+        url, query_params = build_request(endpoint, base_url=self.base_url, **kwargs)
+        metrics = get_metrics()
+
+        for attempt in range(self.max_retries + 1):
+            if not self.circuit_breaker.allow():
+                metrics.inc("genius_requests_total", endpoint=endpoint, status="circuit_open")
+                raise GeniusAPIError("API Error: Genius API unavailable (circuit open)")
+            self.rate_limiter.acquire()
+
+            try:
+                with metrics.timer("genius_request_seconds", endpoint=endpoint) as labels:
+                    labels["status"] = "error"
+                    response = self.session.get(url, params=query_params, timeout=self.timeout)
+                    labels["status"] = response.status_code
+                metrics.inc("genius_requests_total", endpoint=endpoint, status=labels["status"])
+                metrics.inc("genius_response_bytes_total", _body_size(response), endpoint=endpoint)
+                response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status != 429 and (status is None or status < 500):
+                    # Client errors will not succeed on retry
+                    self.circuit_breaker.record_success()
+                    raise GeniusAPIError(f"API Error: {str(e)}", status)
+                if status >= 500:
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.abort_trial()
+                if attempt == self.max_retries:
+                    raise GeniusAPIError(f"API Error: {str(e)}", status)
+                metrics.inc("genius_retries_total", endpoint=endpoint, reason=status)
+                delay = parse_retry_after(e.response.headers.get("Retry-After"))
+                if delay is None:
+                    delay = backoff_delay(attempt)
+                delay = min(delay, GENIUS_BACKOFF_CAP)
+                if status == 429:
+                    # Hold back every caller sharing the limiter, not just this one
+                    self.rate_limiter.pause(delay)
+                else:
+                    time.sleep(delay)
+                continue
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.circuit_breaker.record_failure()
+                metrics.inc("genius_requests_total", endpoint=endpoint, status="error")
+                if attempt == self.max_retries:
+                    raise GeniusAPIError(f"API Error: {str(e)}")
+                metrics.inc("genius_retries_total", endpoint=endpoint, reason="connection")
+                time.sleep(backoff_delay(attempt))
+                continue
+            except requests.exceptions.RequestException as e:
+                self.circuit_breaker.abort_trial()
+                raise GeniusAPIError(f"API Error: {str(e)}")
+            except BaseException:
+                self.circuit_breaker.abort_trial()
+                raise
+
+            self.circuit_breaker.record_success()
+            data = decode_response(response)
+            slim = RESPONSE_SLIMMERS.get(endpoint)
+            return slim(data) if slim is not None else data
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+
+_client: Optional[GeniusClient] = None
+_client_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_client() -> GeniusClient:
+    """Return the process-wide Genius client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GeniusClient(cache=create_response_cache())
+    return _client
+
+
+def set_client(client: Optional[GeniusClient]):
+    """Replace the shared client, closing the previous one."""
+    global _client
+    with _client_lock:
+        if _client is not None and _client is not client:
+            _client.close()
+        _client = client
+
+
+def reset_client():
+    """Close and drop the shared client (used by tests and on config changes)."""
+    set_client(None)
+
+
+def _cache_metrics() -> Dict:
+    # Polled by the metrics endpoint; must not create the client
+    client = _client
+    return client.cache.stats() if client is not None and client.cache is not None else {}
+
+
+get_metrics().register_collector("genius_cache", _cache_metrics)
+
+
+def get_cache_stats() -> Dict:
+    """Return hit/miss counters of the shared client's response cache."""
+    cache = get_client().cache
+    return cache.stats() if cache is not None else {}
+
+
+def call_genius_api(endpoint, **kwargs):
+    """
+    A helper function to call the Genius API.
+    endpoint: (str) The API endpoint (e.g., "/songs/{song_id}" or "/artists/{artist_id}/songs/{song_id}").
+    **kwargs: Format parameters for the endpoint and query parameters.
+    """
+    return get_client().get(endpoint, **kwargs)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Worker threads for async calls, sized to match the connection pool."""
+    global _executor
+    if _executor is None:
+        with _client_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=GENIUS_POOL_SIZE, thread_name_prefix="genius"
+                )
+    return _executor
+
+
+async def async_call_genius_api(endpoint, **kwargs):
+    """
+    Async counterpart of call_genius_api.
+    The request runs on a worker thread through the shared pooled client,
+    so it benefits from the same connection reuse, response cache and
+    in-flight de-duplication.
+    """
+    return await get_client().get_async(endpoint, **kwargs)
@@ -1,13 +1,39 @@
 import os
+import asyncio
+import queue
+import threading
+import time
 import streamlit as st
-from whosampled.api.genius_client import call_genius_api
-from openai import OpenAI
-from typing import List, Dict, Optional
+from whosampled.api.genius_client import call_genius_api, async_call_genius_api
+from whosampled.api.description_cache import description_cache_key, get_description_cache
+from whosampled.api.records import SampleRecord, SongRecord, parse_sample_record, parse_sampled_in
+from whosampled.config import GENIUS_MAX_CONCURRENCY, MODEL_FALLBACK_TTL, SAMPLED_IN_PAGE_SIZE
+from whosampled.store.sample_store import get_store
+from whosampled.utils.metrics import get_metrics
+from typing import TYPE_CHECKING, List, Dict, Optional, Iterable, Iterator, Tuple
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 # Constants for OpenAI
 MAX_TOKENS_PER_REQUEST = 150
+PRIMARY_MODEL = "gpt-4"
 FALLBACK_MODEL = "gpt-3.5-turbo"  # Cheaper fallback model
 
+SYSTEM_PROMPT = (
+    "You are a music expert who writes concise, engaging descriptions of how songs "
+    "sample other music. Focus on the historical context and significance of the samples."
+)
+USER_PROMPT_TEMPLATE = """Write a brief, engaging description of how the song "{song_title}" samples these songs:
+{samples_info}
+
+Keep it under 3 sentences and focus on the most interesting aspects of the sampling."""
+
+_openai_client: Optional["OpenAI"] = None
+_openai_lock = threading.Lock()
+# Model name -> monotonic time until which it is skipped after a failure
+_model_unavailable_until: Dict[str, float] = {}
+
 
 def get_artist_name(song_id):
     data = call_genius_api("/songs/{song_id}", song_id=song_id)
@@ -16,97 +42,346 @@ def get_artist_name(song_id):
     return artist_name
 
 
-def get_sampled_songs(song_id):
+def get_sampled_songs(song_id) -> SampleRecord:
+    store = get_store()
+    if store is not None:
+        song_data = store.get_sampled_songs(song_id)
+        if song_data is not None:
+            return song_data
+
     data = call_genius_api("/songs/{song_id}", song_id=song_id)
-    relationships = data["response"]["song"].get("song_relationships", [])
-    sampled_songs = []
+    song_data = parse_sampled_songs(song_id, data)
+    if store is not None:
+        store.upsert_song_data(song_data, sampled_in=parse_sampled_in(data))
+    return song_data
 
-    # Get the release year of the main song
-    main_song_year = None
-    if "release_date" in data["response"]["song"]:
-        # Try to extract year from release_date (format: "YYYY-MM-DD")
-        try:
-            main_song_year = int(data["response"]["song"]["release_date"].split("-")[0])
-        except (ValueError, IndexError):
-            pass
-
-    for rel in relationships:
-        if rel["type"] == "samples":
-            for sampled in rel["songs"]:
-                # The sampled song data already includes release_date_components
-                sampled_year = sampled.get("release_date_components", {}).get("year")
-                sampled_songs.append(
-                    {
-                        "id": sampled["id"],
-                        "title": sampled["title"],
-                        "artist": sampled["primary_artist"]["name"],
-                        "year": sampled_year,
-                    }
-                )
 
-    # Add the main song to the list with its year
-    return {
-        "main_song": {
-            "id": song_id,
-            "title": data["response"]["song"]["title"],
-            "artist": data["response"]["song"]["primary_artist"]["name"],
-            "year": main_song_year,
-        },
-        "sampled_songs": sampled_songs,
-    }
+def parse_sampled_songs(song_id, data: Dict) -> SampleRecord:
+    """Turn a /songs/{song_id} response into the main song and its samples."""
+    return parse_sample_record(song_id, data)
 
 
-def generate_sample_description(song_title: str, sampled_songs: List[Dict]) -> str:
+def get_sampled_in_page(
+    song_id: int, page: int = 1, per_page: int = SAMPLED_IN_PAGE_SIZE
+) -> Tuple[List[SongRecord], bool]:
     """
-    Generate a natural language description of the samples used in a song using OpenAI.
+    Get one page of the songs that sample song_id, oldest first.
+    Pages are read from the sample store's reverse index. The song itself
+    is only fetched when its "sampled in" list is missing or stale.
+    Returns the records and whether more pages follow.
     """
-    try:
-        client = OpenAI(api_key=st.secrets["openai_api_key"])
-
-        # Prepare the sampled songs information
-        samples_info = "\n".join(
-            [
-                f"- {song['title']} by {song['artist']} (ID: {song['id']})"
-                for song in sampled_songs
-            ]
+    store = get_store()
+    offset = (page - 1) * per_page
+    if store is None:
+        data = call_genius_api("/songs/{song_id}", song_id=song_id)
+        songs = sorted(
+            parse_sampled_in(data), key=lambda song: (song.year is None, song.year or 0, song.id)
+        )
+        return songs[offset:offset + per_page], len(songs) > offset + per_page
+
+    if not store.has_sampled_in(song_id):
+        data = call_genius_api("/songs/{song_id}", song_id=song_id)
+        store.upsert_song_data(
+            parse_sampled_songs(song_id, data), sampled_in=parse_sampled_in(data)
         )
+    # One extra row tells whether another page follows
+    songs = store.sampled_in_page(song_id, offset, per_page + 1)
+    return songs[:per_page], len(songs) > per_page
+
+
+def iter_sampled_in(
+    song_id: int, per_page: int = SAMPLED_IN_PAGE_SIZE, max_results: Optional[int] = None
+) -> Iterator[SongRecord]:
+    """
+    Stream the songs that sample song_id page by page, like
+    iter_search_results: a page is only read once the previous one is used.
+    """
+    count = 0
+    page = 1
+    while True:
+        songs, has_more = get_sampled_in_page(song_id, page, per_page)
+        for song in songs:
+            yield song
+            count += 1
+            if max_results is not None and count >= max_results:
+                return
+        if not has_more:
+            return
+        page += 1
+
+
+async def fetch_songs_async(
+    song_ids: Iterable[int], max_concurrency: int = GENIUS_MAX_CONCURRENCY
+) -> List[Optional[SampleRecord]]:
+    """
+    Fetch and parse several songs concurrently, at most max_concurrency at a time.
+    Returns one get_sampled_songs-shaped record per ID, in input order,
+    with None for songs that could not be fetched.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    store = get_store()
+
+    async def fetch_one(song_id):
+        if store is not None:
+            song_data = store.get_sampled_songs(song_id)
+            if song_data is not None:
+                return song_data
+        async with semaphore:
+            try:
+                data = await async_call_genius_api("/songs/{song_id}", song_id=song_id)
+                song_data = parse_sampled_songs(song_id, data)
+                if store is not None:
+                    store.upsert_song_data(song_data, sampled_in=parse_sampled_in(data))
+                return song_data
+            except Exception as e:
+                print(f"Error fetching song {song_id}: {e}")
+                return None
+
+    return await asyncio.gather(*(fetch_one(song_id) for song_id in song_ids))
+
+
+def fetch_songs(
+    song_ids: Iterable[int], max_concurrency: int = GENIUS_MAX_CONCURRENCY
+) -> List[Optional[SampleRecord]]:
+    """Blocking wrapper around fetch_songs_async for non-async callers."""
+    return asyncio.run(fetch_songs_async(song_ids, max_concurrency))
+
+
+def get_openai_client() -> "OpenAI":
+    """
+    Return the process-wide OpenAI client, creating it on first use.
+    The openai package is only imported here, so startup does not pay for it.
+    """
+    global _openai_client
+    if _openai_client is None:
+        with _openai_lock:
+            if _openai_client is None:
+                from openai import OpenAI
+
+                _openai_client = OpenAI(api_key=st.secrets["openai_api_key"])
+    return _openai_client
+
 
-        messages = [
-            {
-                "role": "system",
-                "content": "You are a music expert who writes concise, engaging descriptions of how songs sample other music. Focus on the historical context and significance of the samples.",
-            },
-            {
-                "role": "user",
-                "content": f"""Write a brief, engaging description of how the song "{song_title}" samples these songs:
-                {samples_info}
-                
-                Keep it under 3 sentences and focus on the most interesting aspects of the sampling.""",
-            },
+def build_description_messages(song_title: str, sampled_songs: List[Dict]) -> List[Dict]:
+    """Build the chat messages asking for a description of a song's samples."""
+    # Prepare the sampled songs information
+    samples_info = "\n".join(
+        [
+            f"- {song['title']} by {song['artist']} (ID: {song['id']})"
+            for song in sampled_songs
         ]
+    )
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": USER_PROMPT_TEMPLATE.format(
+                song_title=song_title, samples_info=samples_info
+            ),
+        },
+    ]
 
-        # Try GPT-4 first, fall back to GPT-3.5 if there's an error
+
+def primary_model_available() -> bool:
+    """Whether the primary model has not failed within MODEL_FALLBACK_TTL."""
+    return time.monotonic() >= _model_unavailable_until.get(PRIMARY_MODEL, 0.0)
+
+
+def mark_model_unavailable(model: str, ttl: float = MODEL_FALLBACK_TTL):
+    """Remember that a model failed, so requests skip it for ttl seconds."""
+    _model_unavailable_until[model] = time.monotonic() + ttl
+
+
+def create_description_completion(
+    messages: List[Dict], stream: bool = False, client: Optional["OpenAI"] = None
+):
+    """
+    Request a description from the primary model, falling back to
+    FALLBACK_MODEL if it fails. A failure is remembered for
+    MODEL_FALLBACK_TTL seconds so later requests go straight to the fallback
+    instead of paying for a failed round-trip each time.
+    Returns the completion (or stream), the model used and whether the
+    primary model failed on this call. The shared client is used unless
+    one is passed in.
+    """
+    client = client if client is not None else get_openai_client()
+    primary_failed = False
+    if primary_model_available():
         try:
             completion = client.chat.completions.create(
-                model="gpt-4",
+                model=PRIMARY_MODEL,
                 messages=messages,
                 max_tokens=MAX_TOKENS_PER_REQUEST,
                 temperature=0.7,
+                stream=stream,
             )
-        except Exception as e:
+            return completion, PRIMARY_MODEL, False
+        except Exception:
+            mark_model_unavailable(PRIMARY_MODEL)
+            primary_failed = True
+
+    completion = client.chat.completions.create(
+        model=FALLBACK_MODEL,
+        messages=messages,
+        max_tokens=MAX_TOKENS_PER_REQUEST,
+        temperature=0.7,
+        stream=stream,
+    )
+    return completion, FALLBACK_MODEL, primary_failed
+
+
+def record_token_usage(model: str, usage):
+    """Count the prompt and completion tokens reported by a completion."""
+    if usage is None:
+        return
+    for kind in ("prompt", "completion"):
+        tokens = getattr(usage, f"{kind}_tokens", None)
+        if isinstance(tokens, int):
+            get_metrics().inc("description_tokens_total", tokens, model=model, kind=kind)
+
+
+def _description_cache_keys(song_title: str, sampled_songs: List[Dict]) -> Dict[str, str]:
+    prompt = SYSTEM_PROMPT + USER_PROMPT_TEMPLATE
+    return {
+        model: description_cache_key(song_title, sampled_songs, model, prompt)
+        for model in (PRIMARY_MODEL, FALLBACK_MODEL)
+    }
+
+
+def get_cached_description(song_title: str, sampled_songs: List[Dict]) -> Optional[str]:
+    """Return a cached description from either model, or None."""
+    cache = get_description_cache()
+    if cache is None:
+        return None
+    keys = _description_cache_keys(song_title, sampled_songs)
+    for model in (PRIMARY_MODEL, FALLBACK_MODEL):
+        description = cache.get(keys[model])
+        if description is not None:
+            return description
+    return None
+
+
+def _cache_description(song_title: str, sampled_songs: List[Dict], model: str, description: str):
+    cache = get_description_cache()
+    if cache is not None and description:
+        cache.set(_description_cache_keys(song_title, sampled_songs)[model], description)
+
+
+def generate_sample_description(song_title: str, sampled_songs: List[Dict]) -> str:
+    """
+    Generate a natural language description of the samples used in a song using OpenAI.
+    Descriptions are cached by song title, sampled-song IDs, model and prompt,
+    so the same song is only sent to the API once per cache TTL.
+    """
+    metrics = get_metrics()
+    description = get_cached_description(song_title, sampled_songs)
+    if description is not None:
+        metrics.inc("description_requests_total", model="cache", mode="complete")
+        return description
+
+    try:
+        messages = build_description_messages(song_title, sampled_songs)
+
+        # Try GPT-4 first, fall back to GPT-3.5 if there's an error
+        with metrics.timer("description_seconds", mode="complete") as labels:
+            completion, model, primary_failed = create_description_completion(messages)
+            labels["model"] = model
+        metrics.inc("description_requests_total", model=model, mode="complete")
+        record_token_usage(model, getattr(completion, "usage", None))
+        if primary_failed:
             st.warning(
                 "Falling back to GPT-3.5-turbo due to GPT-4 availability or cost concerns."
             )
-            completion = client.chat.completions.create(
-                model=FALLBACK_MODEL,
-                messages=messages,
-                max_tokens=MAX_TOKENS_PER_REQUEST,
-                temperature=0.7,
-            )
 
-        return completion.choices[0].message.content
+        description = completion.choices[0].message.content
+        _cache_description(song_title, sampled_songs, model, description)
+        return description
 
     except Exception as e:
         error_msg = f"Unable to generate description: {str(e)}"
         st.error(error_msg)
         return None
+
+
+def stream_sample_description(
+    song_title: str, sampled_songs: List[Dict], client: Optional["OpenAI"] = None
+) -> Iterator[str]:
+    """
+    Yield the description of a song's samples as it is generated.
+    A cached description is yielded in one piece; a freshly streamed one is
+    cached once complete. Given a client, it makes no Streamlit calls, so it
+    can run on a background thread (see DescriptionStream); otherwise the
+    shared client is created from st.secrets if needed.
+    """
+    metrics = get_metrics()
+    description = get_cached_description(song_title, sampled_songs)
+    if description is not None:
+        metrics.inc("description_requests_total", model="cache", mode="stream")
+        yield description
+        return
+
+    start = time.perf_counter()
+    messages = build_description_messages(song_title, sampled_songs)
+    stream, model, _ = create_description_completion(messages, stream=True, client=client)
+    metrics.inc("description_requests_total", model=model, mode="stream")
+    parts = []
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        text = chunk.choices[0].delta.content
+        if text:
+            if not parts:
+                metrics.observe(
+                    "description_first_token_seconds", time.perf_counter() - start, model=model
+                )
+            parts.append(text)
+            yield text
+    metrics.observe("description_seconds", time.perf_counter() - start, model=model, mode="stream")
+    # Streamed responses carry no usage block, so count content chunks rather than tokens
+    metrics.inc("description_stream_chunks_total", len(parts), model=model)
+    _cache_description(song_title, sampled_songs, model, "".join(parts))
+
+
+class DescriptionStream:
+    """
+    Runs stream_sample_description on a background thread as soon as it is
+    created, buffering chunks until the caller iterates. This lets the LLM
+    request overlap with graph rendering; pass the instance to
+    st.write_stream afterwards to show the tokens. The OpenAI client (and
+    so st.secrets) is resolved on the calling thread; the worker makes no
+    Streamlit calls.
+    """
+
+    _DONE = object()
+
+    def __init__(self, song_title: str, sampled_songs: List[Dict]):
+        self.error: Optional[Exception] = None
+        self._queue: "queue.Queue" = queue.Queue()
+        client = None
+        if get_cached_description(song_title, sampled_songs) is None:
+            try:
+                client = get_openai_client()
+            except Exception as e:
+                self.error = e
+                self._queue.put(self._DONE)
+                return
+        self._thread = threading.Thread(
+            target=self._run, args=(song_title, sampled_songs, client), daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, song_title: str, sampled_songs: List[Dict], client: Optional["OpenAI"]):
+        try:
+            for chunk in stream_sample_description(song_title, sampled_songs, client):
+                self._queue.put(chunk)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._queue.put(self._DONE)
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            chunk = self._queue.get()
+            if chunk is self._DONE:
+                return
+            yield chunk
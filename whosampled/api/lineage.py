@@ -0,0 +1,79 @@
+import asyncio
+from typing import Dict, List, Tuple
+
+from whosampled.api.get_song_info import fetch_songs_async
+from whosampled.config import GENIUS_MAX_CONCURRENCY
+
+DEFAULT_MAX_DEPTH = 2
+DEFAULT_MAX_NODES = 500
+
+
+async def crawl_sample_lineage_async(
+    song_id: int,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    max_nodes: int = DEFAULT_MAX_NODES,
+    max_concurrency: int = GENIUS_MAX_CONCURRENCY,
+) -> Dict:
+    """
+    Follow "samples" relationships breadth-first from song_id.
+    Each frontier level is fetched concurrently, songs are de-duplicated by
+    Genius ID and no song is fetched twice. max_depth is the number of hops
+    from the root (1 matches get_sampled_songs); max_nodes caps the graph size.
+
+    Returns {"main_song": {...}, "songs": {id: {...}}, "edges": [(from_id, to_id)]}
+    where each song also carries its "depth" from the root.
+    """
+    songs: Dict[int, Dict] = {}
+    edges: List[Tuple[int, int]] = []
+    seen_edges = set()
+    fetched = set()
+    frontier = [song_id]
+    main_song = None
+
+    for depth in range(max_depth):
+        if not frontier:
+            break
+        fetched.update(frontier)
+        records = await fetch_songs_async(frontier, max_concurrency)
+
+        next_frontier = []
+        for record in records:
+            if record is None:
+                continue
+            main = record.main_song
+            known = songs.get(main.id, {})
+            songs[main.id] = {
+                **main.to_dict(),
+                "year": main.year or known.get("year"),
+                "depth": known.get("depth", depth),
+            }
+            if main_song is None and main.id == song_id:
+                main_song = songs[main.id]
+
+            for sampled in record.sampled_songs:
+                if sampled.id not in songs:
+                    if len(songs) >= max_nodes:
+                        continue
+                    songs[sampled.id] = {**sampled.to_dict(), "depth": depth + 1}
+                    if sampled.id not in fetched:
+                        next_frontier.append(sampled.id)
+                edge = (main.id, sampled.id)
+                if edge not in seen_edges:
+                    seen_edges.add(edge)
+                    edges.append(edge)
+
+        frontier = next_frontier
+
+    return {"main_song": main_song, "songs": songs, "edges": edges}
+
+
+def crawl_sample_lineage(
+    song_id: int,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    max_nodes: int = DEFAULT_MAX_NODES,
+    max_concurrency: int = GENIUS_MAX_CONCURRENCY,
+) -> Dict:
+    """Blocking wrapper around crawl_sample_lineage_async."""
+    return asyncio.run(
+        crawl_sample_lineage_async(song_id, max_depth, max_nodes, max_concurrency)
+    )
@@ -0,0 +1,160 @@
+# rate_limit.py
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from whosampled.config import (
+    GENIUS_BACKOFF_BASE,
+    GENIUS_BACKOFF_CAP,
+    GENIUS_BREAKER_RESET,
+    GENIUS_BREAKER_THRESHOLD,
+    GENIUS_RATE_BURST,
+    GENIUS_RATE_LIMIT,
+)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: refills at `rate` tokens per second up to
+    `capacity`. acquire() blocks until a token is available; pause() makes
+    every caller wait, e.g. after the upstream answered 429.
+    """
+
+    def __init__(self, rate: float = GENIUS_RATE_LIMIT, capacity: float = GENIUS_RATE_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take one token, waiting at most timeout seconds. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold back all callers for the next `seconds` seconds."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests after `failure_threshold` consecutive upstream
+    failures. After `reset_timeout` seconds one trial request is let through
+    (half-open); its outcome closes the circuit or opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = GENIUS_BREAKER_THRESHOLD,
+        reset_timeout: float = GENIUS_BREAKER_RESET,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def abort_trial(self):
+        """
+        Count a request that ended without a verdict (a 429, a client-side
+        error) as a failure if it was the half-open trial, so the circuit
+        reopens instead of waiting forever for the trial's outcome.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._failures += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+def backoff_delay(
+    attempt: int, base: float = GENIUS_BACKOFF_BASE, cap: float = GENIUS_BACKOFF_CAP
+) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (0-based)."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_rate_limiter: Optional[TokenBucket] = None
+_circuit_breaker: Optional[CircuitBreaker] = None
+_lock = threading.Lock()
+
+
+def get_rate_limiter() -> TokenBucket:
+    """Return the process-wide token bucket shared by all sessions and threads."""
+    global _rate_limiter
+    with _lock:
+        if _rate_limiter is None:
+            _rate_limiter = TokenBucket()
+        return _rate_limiter
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Return the process-wide circuit breaker for the Genius API."""
+    global _circuit_breaker
+    with _lock:
+        if _circuit_breaker is None:
+            _circuit_breaker = CircuitBreaker()
+        return _circuit_breaker
@@ -0,0 +1,180 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class SongRecord:
+    """
+    The four fields we use from a Genius song. Slotted, so a record costs a
+    fraction of the dict it replaces. Mapping-style reads (song["title"],
+    song.get("year")) still work for code written against the old dicts.
+    """
+
+    __slots__ = ("id", "title", "artist", "year")
+
+    def __init__(self, id: int, title: str, artist: Optional[str] = None, year: Optional[int] = None):
+        self.id = id
+        self.title = title
+        self.artist = artist
+        self.year = year
+
+    @classmethod
+    def from_dict(cls, song: Dict) -> "SongRecord":
+        return cls(song["id"], song["title"], song.get("artist"), song.get("year"))
+
+    def to_dict(self) -> Dict:
+        return {"id": self.id, "title": self.title, "artist": self.artist, "year": self.year}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SongRecord):
+            return NotImplemented
+        return (self.id, self.title, self.artist, self.year) == (
+            other.id, other.title, other.artist, other.year
+        )
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"SongRecord(id={self.id!r}, title={self.title!r}, artist={self.artist!r}, year={self.year!r})"
+
+    def __getstate__(self):
+        return (self.id, self.title, self.artist, self.year)
+
+    def __setstate__(self, state):
+        self.id, self.title, self.artist, self.year = state
+
+
+class SampleRecord:
+    """
+    A song and the songs it samples, in Genius order: what get_sampled_songs
+    returns. record["main_song"] and record["sampled_songs"] keep working.
+    """
+
+    __slots__ = ("main_song", "sampled_songs")
+
+    def __init__(self, main_song: SongRecord, sampled_songs: Iterable[SongRecord] = ()):
+        self.main_song = main_song
+        self.sampled_songs: Tuple[SongRecord, ...] = tuple(sampled_songs)
+
+    @classmethod
+    def from_dict(cls, song_data: Dict) -> "SampleRecord":
+        return cls(
+            SongRecord.from_dict(song_data["main_song"]),
+            (SongRecord.from_dict(song) for song in song_data["sampled_songs"]),
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "main_song": self.main_song.to_dict(),
+            "sampled_songs": [song.to_dict() for song in self.sampled_songs],
+        }
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SampleRecord):
+            return NotImplemented
+        return self.main_song == other.main_song and self.sampled_songs == other.sampled_songs
+
+    def __repr__(self):
+        return f"SampleRecord(main_song={self.main_song!r}, sampled_songs={len(self.sampled_songs)})"
+
+    def __getstate__(self):
+        return (self.main_song, self.sampled_songs)
+
+    def __setstate__(self, state):
+        self.main_song, self.sampled_songs = state
+
+
+def _year(release_date: Optional[str]) -> Optional[int]:
+    # release_date is "YYYY-MM-DD" (sometimes only "YYYY")
+    try:
+        return int(release_date.split("-")[0])
+    except (AttributeError, ValueError, IndexError):
+        return None
+
+
+def _pick(data: Dict, keys: Tuple[str, ...]) -> Dict:
+    return {key: data[key] for key in keys if key in data}
+
+
+def _slim_song(song: Dict, keys: Tuple[str, ...]) -> Dict:
+    slim = _pick(song, keys)
+    if isinstance(song.get("primary_artist"), dict):
+        slim["primary_artist"] = _pick(song["primary_artist"], ("name",))
+    if isinstance(song.get("release_date_components"), dict):
+        slim["release_date_components"] = _pick(song["release_date_components"], ("year",))
+    return slim
+
+
+def slim_song_response(data: Dict) -> Dict:
+    """
+    Reduce a /songs/{id} response to the fields parse_sample_record and
+    get_artist_name read, keeping the response shape. The full body carries
+    descriptions, media and stats that would otherwise sit in the response
+    cache for every song. Responses of any other shape are returned as is.
+    """
+    song = data.get("response", {}).get("song") if isinstance(data, dict) else None
+    if not isinstance(song, dict):
+        return data
+    slim = _slim_song(song, ("id", "title", "full_title", "artist_names", "release_date"))
+    if "song_relationships" in song:
+        slim["song_relationships"] = [
+            {
+                "type": rel.get("type"),
+                "songs": [_slim_song(related, ("id", "title")) for related in rel.get("songs", [])],
+            }
+            for rel in song["song_relationships"]
+            if rel.get("type") in ("samples", "sampled_in")
+        ]
+    return {"response": {"song": slim}}
+
+
+def parse_sample_record(song_id: int, data: Dict) -> SampleRecord:
+    """Build a SampleRecord from a (full or slimmed) /songs/{song_id} response."""
+    song = data["response"]["song"]
+    sampled_songs = [
+        SongRecord(
+            sampled["id"],
+            sampled["title"],
+            sampled["primary_artist"]["name"],
+            # The sampled song data already includes release_date_components
+            (sampled.get("release_date_components") or {}).get("year"),
+        )
+        for rel in song.get("song_relationships", [])
+        if rel["type"] == "samples"
+        for sampled in rel["songs"]
+    ]
+    main_song = SongRecord(
+        song_id, song["title"], song["primary_artist"]["name"], _year(song.get("release_date"))
+    )
+    return SampleRecord(main_song, sampled_songs)
+
+
+def parse_sampled_in(data: Dict) -> List[SongRecord]:
+    """The songs that sample the song of a (full or slimmed) /songs/{id} response."""
+    song = data["response"]["song"]
+    return [
+        SongRecord(
+            sampling["id"],
+            sampling["title"],
+            sampling["primary_artist"]["name"],
+            (sampling.get("release_date_components") or {}).get("year"),
+        )
+        for rel in song.get("song_relationships", [])
+        if rel["type"] == "sampled_in"
+        for sampling in rel["songs"]
+    ]
@@ -1,5 +1,8 @@
 import streamlit as st
+from typing import Iterator, List, Optional, Tuple
 from whosampled.api.genius_client import call_genius_api
+from whosampled.config import SEARCH_PAGE_SIZE
+from whosampled.utils.title_index import get_title_index
 
 def search_song(song_title):
     """Search for a song and return its ID"""
@@ -18,6 +21,15 @@ def search_song(song_title):
         print(f"Error searching for song: {e}")
         return None
 
+def lookup_song_id(song_title: str) -> Optional[int]:
+    """
+    Return the ID of the top search hit for a title, or None when nothing
+    matches. Unlike search_song, API errors are raised to the caller.
+    """
+    data = call_genius_api("/search", q=song_title)
+    hits = data["response"]["hits"]
+    return hits[0]["result"]["id"] if hits else None
+
 def get_search_results(query):
     """Get search results from Genius API for the dropdown menu"""
     if not query:
@@ -33,7 +45,50 @@ def get_search_results(query):
             result = hit["result"]
             display_text = result['full_title']
             results.append((display_text, result['id']))
+
+        # Remember every title we have seen for local typeahead lookups
+        get_title_index().add_many(results)
         return results
     except Exception as e:
         st.error(f"Error fetching search results: {e}")
-        return []
\ No newline at end of file
+        return []
+
+def get_search_page(
+    query: str, page: int = 1, per_page: int = SEARCH_PAGE_SIZE
+) -> Tuple[List[Tuple[str, int]], bool]:
+    """
+    Get one page of search results.
+    Returns the (display_text, song_id) tuples and whether more pages may follow.
+    """
+    data = call_genius_api("/search", q=query, page=page, per_page=per_page)
+    hits = data["response"]["hits"]
+    results = [(hit["result"]["full_title"], hit["result"]["id"]) for hit in hits]
+    get_title_index().add_many(results)
+    return results, len(hits) >= per_page
+
+def iter_search_results(
+    query: str,
+    per_page: int = SEARCH_PAGE_SIZE,
+    max_results: Optional[int] = None,
+    start_page: int = 1,
+) -> Iterator[Tuple[str, int]]:
+    """
+    Stream (display_text, song_id) tuples page by page.
+    A page is only requested once the previous one has been consumed, so
+    stopping early (or reaching max_results) never fetches unused pages.
+    """
+    if not query:
+        return
+
+    count = 0
+    page = start_page
+    while True:
+        results, has_more = get_search_page(query, page, per_page)
+        for result in results:
+            yield result
+            count += 1
+            if max_results is not None and count >= max_results:
+                return
+        if not has_more:
+            return
+        page += 1
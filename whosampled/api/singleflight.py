@@ -0,0 +1,71 @@
+# singleflight.py
+import asyncio
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs the
+    function, everyone else arriving while it is in flight waits on the same
+    future. Sync callers block on it, async callers await it, so threads and
+    event loops share one upstream request.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Return the in-flight future for key and whether the caller leads it."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(self, key: str, future: Future, fn: Callable[[], Any]) -> Any:
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn for key, or wait for the identical call already in flight."""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        return self._finish(key, future, fn)
+
+    async def do_async(
+        self, key: str, fn: Callable[[], Any], executor: Optional[Executor] = None
+    ) -> Any:
+        """Async variant of do: the leader runs fn on executor, followers await it."""
+        future, leader = self._join(key)
+        if leader:
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(executor, self._finish_quietly, key, future, fn)
+        return await asyncio.wrap_future(future)
+
+    def _finish_quietly(self, key: str, future: Future, fn: Callable[[], Any]):
+        try:
+            self._finish(key, future, fn)
+        except BaseException:
+            # Delivered to every waiter through the future
+            pass
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -1,51 +1,72 @@
-from typing import Dict, List
 import streamlit as st
-import pandas as pd
-from .utils.graph_utils import build_graph, plot_graph
-from .api.get_song_info import get_sampled_songs, generate_sample_description
+from .api.records import SampleRecord
+from .api.get_song_info import (
+    generate_sample_description,
+    stream_sample_description,
+)
 from .components.search_components import render_search_input, render_song_selector
-from .services.search_service import handle_search, handle_song_selection
+from .services.search_service import (
+    handle_search,
+    handle_paginated_search,
+    handle_song_selection,
+    load_more_search_results,
+)
+from .services.song_service import get_samples_table, get_song_data, get_song_figure
+from .components.analytics_view import render_analytics_view
+from .components.debug_panel import render_debug_panel
+from .components.exploration_view import render_exploration
+from .components.graph_components import render_graph_mode, render_sampled_in
+from .services.snapshot_service import warm_start
 from .state.app_state import initialize_state, get_selected_song_id
-
-
-def display_song_graph(song_data: Dict):
-    """Display a chronological graph of the song and its samples."""
-    main_song = song_data["main_song"]
-    sampled_songs = song_data["sampled_songs"]
+from .utils.metrics import get_metrics, record_timings, start_metrics_server
+from .config import (
+    DEBUG_PANEL,
+    METRICS_PORT,
+    SEARCH_PAGINATED,
+    SEARCH_TYPEAHEAD,
+    STREAM_DESCRIPTIONS,
+)
+
+
+def display_song_graph(song_data: SampleRecord):
+    """Display a chronological graph of the song and its samples (or the songs sampling it)."""
+    main_song = song_data.main_song
+    sampled_songs = song_data.sampled_songs
+
+    graph_mode = render_graph_mode()
+    if graph_mode == "sampled_in":
+        render_sampled_in(main_song.id)
+        return
+    if graph_mode == "explore":
+        render_exploration(main_song.id)
+        return
 
     if not sampled_songs:
         st.info("No samples found for this song.")
         return
 
-    # Build and plot the graph
-    G = build_graph(main_song, sampled_songs)
-    fig = plot_graph(G)
-
-    # Display the graph
-    st.plotly_chart(fig, use_container_width=True)
+    # Display the graph, built once per song and shared across sessions
+    st.plotly_chart(get_song_figure(main_song.id), use_container_width=True)
 
     # Add a button to generate AI description
     if st.button("Generate AI Description of Samples"):
-        with st.spinner("Generating description..."):
-            description = generate_sample_description(main_song["title"], sampled_songs)
-            if description:
-                st.markdown(f"**Sample Description:** {description}")
-            else:
-                st.error("Could not generate description. Please try again.")
+        if STREAM_DESCRIPTIONS:
+            st.markdown("**Sample Description:**")
+            try:
+                st.write_stream(stream_sample_description(main_song.title, sampled_songs))
+            except Exception as e:
+                st.error(f"Could not generate description: {e}")
+        else:
+            with st.spinner("Generating description..."):
+                description = generate_sample_description(main_song.title, sampled_songs)
+                if description:
+                    st.markdown(f"**Sample Description:** {description}")
+                else:
+                    st.error("Could not generate description. Please try again.")
 
     # Display a table of samples below the graph
     st.subheader("Sample Details")
-    samples_df = pd.DataFrame(
-        [
-            {
-                "Song": song["title"],
-                "Artist": song["artist"],
-                "Year": song["year"] if song["year"] else "Unknown",
-            }
-            for song in sampled_songs
-        ]
-    )
-    st.dataframe(samples_df, use_container_width=True)
+    st.dataframe(get_samples_table(main_song.id), use_container_width=True)
 
 
 def main():
@@ -54,22 +75,48 @@ def main():
     st.title("WhoSampled Explorer")
     st.markdown("""
     Explore song samples and their relationships. Enter a song title to see what songs it samples
-    and get AI-generated descriptions of the sampling relationships.
+    (or which songs sample it) and get AI-generated descriptions of the sampling relationships.
     """)
 
     # Initialize application state
     initialize_state()
+    # Load the warm-start snapshot (once per process) if WARM_START_SNAPSHOT is set
+    warm_start()
 
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
+
+    view = st.sidebar.radio("View", ["Explorer", "Corpus analytics"], key="view")
+
+    with record_timings() as timings:
+        with get_metrics().timer("rerun_seconds"):
+            if view == "Corpus analytics":
+                render_analytics_view()
+            else:
+                render_explorer()
+        if DEBUG_PANEL:
+            render_debug_panel(timings)
+
+
+def render_explorer():
+    """Search for a song and show its sample graph."""
     # Render search input and get query
     search_query = render_search_input()
 
     # Handle search and get results
-    results = handle_search(search_query)
+    if SEARCH_PAGINATED:
+        results, has_more = handle_paginated_search(
+            search_query, typeahead=SEARCH_TYPEAHEAD
+        )
+    else:
+        results, has_more = handle_search(search_query, typeahead=SEARCH_TYPEAHEAD), False
 
     # If we have results, render the song selector
     if results:
         selected_song_display, selected_id = render_song_selector(
-            results=results, current_song_id=get_selected_song_id()
+            results=results,
+            current_song_id=get_selected_song_id(),
+            load_more=load_more_search_results if has_more else None,
         )
         handle_song_selection(selected_song_display, selected_id)
 
@@ -77,7 +124,7 @@ def main():
         if selected_id:
             # Add a loading spinner while fetching and processing data
             with st.spinner("Loading sample data and generating graph..."):
-                song_data = get_sampled_songs(selected_id)
+                song_data = get_song_data(selected_id)
                 if song_data:
                     display_song_graph(song_data)
                 else:
@@ -0,0 +1,94 @@
+import argparse
+import sys
+from typing import List, Optional
+
+from whosampled.config import EXPORT_BATCH_SIZE, GENIUS_MAX_CONCURRENCY, SNAPSHOT_COMPRESSION_LEVEL
+
+
+def run_export(args: argparse.Namespace) -> int:
+    from whosampled.services.export_service import export_catalog
+
+    stats = export_catalog(
+        args.input,
+        args.out,
+        fmt=args.format,
+        workers=args.workers,
+        batch_size=args.batch_size,
+    )
+    print(
+        f"Exported {stats['exported']} songs "
+        f"({stats['skipped']} already done, {stats['not_found']} not found, "
+        f"{stats['failed']} failed)"
+    )
+    return 1 if stats["failed"] else 0
+
+
+def run_snapshot(args: argparse.Namespace) -> int:
+    import json
+
+    from whosampled.services.snapshot_service import (
+        SnapshotError,
+        SnapshotReader,
+        export_snapshot,
+        import_snapshot,
+    )
+
+    try:
+        if args.action == "export":
+            counts = export_snapshot(args.path, level=args.level)
+        elif args.action == "import":
+            counts = import_snapshot(args.path)
+        else:
+            with SnapshotReader(args.path) as reader:
+                counts = reader.info()
+    except (OSError, SnapshotError) as e:
+        print(f"Snapshot {args.action} failed: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(counts, indent=2))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="whosampled", description="WhoSampled batch tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser(
+        "export",
+        help="Export sample graphs for a list of songs",
+        description=(
+            "Resolve each line of INPUT (a song title or Genius song ID) and write "
+            "node and edge tables to OUT. Rerun the same command to resume."
+        ),
+    )
+    export.add_argument("input", help="File with one song title or Genius ID per line")
+    export.add_argument("out", help="Output directory (also holds the checkpoint)")
+    export.add_argument("--format", choices=("jsonl", "parquet"), default="jsonl")
+    export.add_argument("--workers", type=int, default=GENIUS_MAX_CONCURRENCY)
+    export.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    export.set_defaults(func=run_export)
+
+    snapshot = commands.add_parser(
+        "snapshot",
+        help="Export or import a warm-start cache snapshot",
+        description=(
+            "Bundle cached searches, stored songs and sample relationships, and cached "
+            "descriptions into one compressed file, or merge such a file into the local "
+            "caches. Set WARM_START_SNAPSHOT to import a bundle when the app starts."
+        ),
+    )
+    snapshot.add_argument("action", choices=("export", "import", "info"))
+    snapshot.add_argument("path", help="Snapshot file")
+    snapshot.add_argument(
+        "--level", type=int, default=SNAPSHOT_COMPRESSION_LEVEL, help="zlib level for export (0-9)"
+    )
+    snapshot.set_defaults(func=run_snapshot)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
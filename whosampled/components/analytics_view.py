@@ -0,0 +1,59 @@
+import streamlit as st
+from whosampled.services.analytics_service import get_corpus_analytics, get_sample_chain
+from whosampled.services.export_service import resolve_song_id
+
+def render_analytics_view():
+    """Render corpus-wide statistics over every song in the sample store"""
+    st.header("Corpus Analytics")
+    analytics = get_corpus_analytics()
+    if analytics is None or analytics.graph.n_nodes == 0:
+        st.info("No songs stored yet. Explore or export some songs to build the corpus.")
+        return
+
+    graph = analytics.graph
+    st.caption(
+        f"{graph.n_nodes:,} songs, {graph.n_edges:,} sample relationships, "
+        f"{len(analytics.component_sizes):,} connected groups"
+    )
+    limit = st.slider("Rows", min_value=5, max_value=100, value=20, key="analytics_limit")
+
+    songs_tab, artists_tab, influence_tab, components_tab, chain_tab = st.tabs(
+        ["Most sampled songs", "Most sampled artists", "Influence", "Components", "Sample chain"]
+    )
+    with songs_tab:
+        st.dataframe(analytics.most_sampled_songs(limit), use_container_width=True)
+    with artists_tab:
+        st.dataframe(analytics.most_sampled_artists(limit), use_container_width=True)
+    with influence_tab:
+        st.caption("PageRank over sample relationships: sampled by influential songs counts more.")
+        st.dataframe(analytics.most_influential(limit), use_container_width=True)
+    with components_tab:
+        st.caption("Sizes of the largest groups of songs linked by samples in either direction.")
+        st.bar_chart(analytics.component_sizes[:limit])
+    with chain_tab:
+        render_sample_chain()
+
+def render_sample_chain():
+    """Render the shortest sample chain between two songs"""
+    col_from, col_to = st.columns(2)
+    from_entry = col_from.text_input("From song (title or Genius ID):", key="chain_from")
+    to_entry = col_to.text_input("To song (title or Genius ID):", key="chain_to")
+    directed = not st.checkbox("Allow samples in either direction", key="chain_undirected")
+    if not from_entry or not to_entry:
+        return
+
+    try:
+        from_id, to_id = resolve_song_id(from_entry), resolve_song_id(to_entry)
+    except Exception as e:
+        st.error(f"Error searching for songs: {e}")
+        return
+    if from_id is None or to_id is None:
+        st.error("Could not find one of the songs.")
+        return
+
+    chain = get_sample_chain(from_id, to_id, directed=directed)
+    if chain is None:
+        st.write("No sample chain found between these songs in the stored corpus.")
+    else:
+        st.write(f"Chain of {len(chain) - 1} samples:")
+        st.dataframe(chain, use_container_width=True)
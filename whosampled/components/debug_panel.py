@@ -0,0 +1,15 @@
+import streamlit as st
+from typing import Dict, List
+from whosampled.utils.metrics import get_metrics
+
+def render_debug_panel(timings: List[Dict]):
+    """Render this rerun's timings and the process-wide metrics"""
+    with st.expander("Debug: performance", expanded=False):
+        total = next((t["ms"] for t in reversed(timings) if t["metric"] == "rerun_seconds"), None)
+        if total is not None:
+            st.caption(f"Rerun took {total:.0f} ms across {len(timings) - 1} timed operations")
+        if timings:
+            st.dataframe(timings, use_container_width=True)
+        else:
+            st.caption("Nothing was timed during this rerun.")
+        st.code(get_metrics().render_prometheus(), language="text")
@@ -0,0 +1,57 @@
+import streamlit as st
+from whosampled.services.song_service import get_song_data
+from whosampled.state.app_state import get_exploration, set_exploration
+
+EXPLORE_CHART_KEY = "explore_chart"
+
+def render_exploration(song_id: int):
+    """
+    Render a sample graph that grows as the user clicks songs in it.
+    Clicks arrive as the chart's selection before it is drawn again, so the
+    clicked songs are expanded first and their samples appear in this rerun.
+    st.plotly_chart sends the whole figure on every rerun; keeping it to two
+    traces at least stops the trace count from growing with each click.
+    """
+    from whosampled.utils.exploration import GraphExploration
+
+    exploration = get_exploration()
+    if exploration is None or exploration.root_id != song_id:
+        song_data = get_song_data(song_id)
+        if not song_data:
+            st.error("Could not find song details. Please try another song.")
+            return
+        exploration = GraphExploration(song_data)
+        set_exploration(exploration)
+        st.session_state.pop(EXPLORE_CHART_KEY, None)
+
+    expand_selected_songs(exploration)
+
+    st.caption(
+        f"{len(exploration.songs)} songs, {len(exploration.edges)} samples, "
+        f"{len(exploration.expanded)} expanded. Click a song to show what it samples."
+    )
+    st.plotly_chart(
+        exploration.figure,
+        use_container_width=True,
+        key=EXPLORE_CHART_KEY,
+        on_select="rerun",
+        selection_mode="points",
+    )
+    if st.button("Start over", key="explore_reset"):
+        set_exploration(None)
+        st.rerun()
+
+def expand_selected_songs(exploration):
+    """Fetch and add the samples of every selected song not yet expanded"""
+    chart_state = st.session_state.get(EXPLORE_CHART_KEY) or {}
+    points = (chart_state.get("selection") or {}).get("points", [])
+    for point in points:
+        song_id = exploration.song_at(point.get("curve_number", -1), point.get("point_index", -1))
+        if song_id is None or song_id in exploration.expanded:
+            continue
+        with st.spinner("Loading samples..."):
+            song_data = get_song_data(song_id)
+        if song_data:
+            exploration.expand(song_data)
+        else:
+            st.warning(f"Could not load the samples of song {song_id}.")
@@ -0,0 +1,38 @@
+import streamlit as st
+from whosampled.config import SAMPLED_IN_PAGE_SIZE
+from whosampled.services.song_service import get_sampled_in, get_samples_table, get_song_figure
+from whosampled.state.app_state import get_sampled_in_limit, set_sampled_in_limit
+
+GRAPH_MODES = {"Samples": "samples", "Sampled in": "sampled_in", "Explore": "explore"}
+
+def render_graph_mode() -> str:
+    """Render the graph mode toggle and return "samples", "sampled_in" or "explore" """
+    label = st.radio("Show:", options=list(GRAPH_MODES), horizontal=True, key="graph_mode")
+    return GRAPH_MODES[label]
+
+def render_sampled_in(song_id: int):
+    """
+    Render the songs that sample song_id as a graph and a table.
+    A page of songs is shown at first; "Load more" adds one page per click.
+    """
+    limit = get_sampled_in_limit(song_id, SAMPLED_IN_PAGE_SIZE)
+    sampled_in = get_sampled_in(song_id, limit)
+    if not sampled_in or not sampled_in[0]:
+        st.info("No songs found that sample this song.")
+        return
+
+    songs, has_more = sampled_in
+    st.plotly_chart(
+        get_song_figure(song_id, direction="sampled_in", limit=limit), use_container_width=True
+    )
+    st.subheader(f"Sampled In ({len(songs)}{'+' if has_more else ''})")
+    st.dataframe(
+        get_samples_table(song_id, direction="sampled_in", limit=limit), use_container_width=True
+    )
+    if has_more:
+        st.button(
+            "Load more",
+            on_click=set_sampled_in_limit,
+            args=(song_id, limit + SAMPLED_IN_PAGE_SIZE),
+            key="load_more_sampled_in",
+        )
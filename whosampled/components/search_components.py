@@ -1,5 +1,5 @@
 import streamlit as st
-from typing import List, Tuple, Optional
+from typing import Callable, List, Tuple, Optional
 
 def render_search_input() -> str:
     """Render the search input component and return the search query"""
@@ -7,9 +7,14 @@ def render_search_input() -> str:
 
 def render_song_selector(
     results: List[Tuple[str, int]],
-    current_song_id: Optional[int]
+    current_song_id: Optional[int],
+    load_more: Optional[Callable[[], None]] = None
 ) -> Tuple[str, Optional[int]]:
-    """Render the song selector component and return the selected song display and ID"""
+    """
+    Render the song selector component and return the selected song display and ID.
+    When load_more is given, a button below the selector calls it to fetch
+    the next page of results before the app reruns.
+    """
     if not results:
         return None, None
         
@@ -28,6 +33,9 @@ def render_song_selector(
         key="song_select"
     )
 
+    if load_more is not None:
+        st.button("Load more results", on_click=load_more, key="load_more_results")
+
     # Find the ID for the currently selected song display text
     selected_id = next((r[1] for r in results if r[0] == selected_song_display), None)
     
@@ -2,4 +2,95 @@ import os
 from dotenv import load_dotenv
 
 load_dotenv()
-ACCESS_TOKEN = os.getenv("GENIUS_ACCESS_TOKEN")
\ No newline at end of file
+ACCESS_TOKEN = os.getenv("GENIUS_ACCESS_TOKEN")
+GENIUS_BASE_URL = os.getenv("GENIUS_BASE_URL", "https://api.genius.com")
+
+# HTTP connection pool settings for the Genius API client
+GENIUS_POOL_SIZE = int(os.getenv("GENIUS_POOL_SIZE", "20"))
+GENIUS_KEEP_ALIVE = os.getenv("GENIUS_KEEP_ALIVE", "1") != "0"
+GENIUS_CONNECT_TIMEOUT = float(os.getenv("GENIUS_CONNECT_TIMEOUT", "3.05"))
+GENIUS_READ_TIMEOUT = float(os.getenv("GENIUS_READ_TIMEOUT", "10"))
+GENIUS_COMPRESSION = os.getenv("GENIUS_COMPRESSION", "1") != "0"
+
+# Genius API response cache (in-process LRU in front of SQLite)
+CACHE_DIR = os.getenv(
+    "WHOSAMPLED_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "whosampled")
+)
+GENIUS_CACHE_ENABLED = os.getenv("GENIUS_CACHE_ENABLED", "1") != "0"
+GENIUS_CACHE_PATH = os.getenv("GENIUS_CACHE_PATH", os.path.join(CACHE_DIR, "genius.sqlite3"))
+GENIUS_CACHE_MEMORY_ENTRIES = int(os.getenv("GENIUS_CACHE_MEMORY_ENTRIES", "1024"))
+GENIUS_CACHE_MAX_BYTES = int(os.getenv("GENIUS_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+GENIUS_CACHE_STALE_TTL = float(os.getenv("GENIUS_CACHE_STALE_TTL", str(24 * 60 * 60)))
+
+# Maximum number of concurrent Genius requests for batch fetches
+GENIUS_MAX_CONCURRENCY = int(os.getenv("GENIUS_MAX_CONCURRENCY", "8"))
+
+# Local sample graph store
+SAMPLE_STORE_ENABLED = os.getenv("SAMPLE_STORE_ENABLED", "1") != "0"
+SAMPLE_STORE_PATH = os.getenv("SAMPLE_STORE_PATH", os.path.join(CACHE_DIR, "samples.sqlite3"))
+SAMPLE_STORE_TTL = float(os.getenv("SAMPLE_STORE_TTL", str(7 * 24 * 60 * 60)))
+# Songs per page of "sampled in" results; classic breaks have hundreds
+SAMPLED_IN_PAGE_SIZE = int(os.getenv("SAMPLED_IN_PAGE_SIZE", "25"))
+
+# Rate limiting, retries and circuit breaking for the Genius API
+GENIUS_RATE_LIMIT = float(os.getenv("GENIUS_RATE_LIMIT", "10"))
+GENIUS_RATE_BURST = float(os.getenv("GENIUS_RATE_BURST", "20"))
+GENIUS_MAX_RETRIES = int(os.getenv("GENIUS_MAX_RETRIES", "3"))
+GENIUS_BACKOFF_BASE = float(os.getenv("GENIUS_BACKOFF_BASE", "0.5"))
+GENIUS_BACKOFF_CAP = float(os.getenv("GENIUS_BACKOFF_CAP", "30"))
+GENIUS_BREAKER_THRESHOLD = int(os.getenv("GENIUS_BREAKER_THRESHOLD", "5"))
+GENIUS_BREAKER_RESET = float(os.getenv("GENIUS_BREAKER_RESET", "30"))
+
+# Search-as-you-type
+SEARCH_TYPEAHEAD = os.getenv("SEARCH_TYPEAHEAD", "1") != "0"
+TITLE_INDEX_MAX_TITLES = int(os.getenv("TITLE_INDEX_MAX_TITLES", "50000"))
+
+# Search pagination
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "10"))
+SEARCH_PAGINATED = os.getenv("SEARCH_PAGINATED", "1") != "0"
+
+# Graph rendering: switch to WebGL traces above this many nodes
+PLOT_WEBGL_THRESHOLD = int(os.getenv("PLOT_WEBGL_THRESHOLD", "300"))
+LAYOUT_CACHE_SIZE = int(os.getenv("LAYOUT_CACHE_SIZE", "128"))
+
+# Cache of generated sample descriptions
+DESCRIPTION_CACHE_ENABLED = os.getenv("DESCRIPTION_CACHE_ENABLED", "1") != "0"
+DESCRIPTION_CACHE_PATH = os.getenv(
+    "DESCRIPTION_CACHE_PATH", os.path.join(CACHE_DIR, "descriptions.sqlite3")
+)
+DESCRIPTION_CACHE_TTL = float(os.getenv("DESCRIPTION_CACHE_TTL", str(30 * 24 * 60 * 60)))
+DESCRIPTION_CACHE_MAX_BYTES = int(
+    os.getenv("DESCRIPTION_CACHE_MAX_BYTES", str(16 * 1024 * 1024))
+)
+
+# LLM descriptions
+STREAM_DESCRIPTIONS = os.getenv("STREAM_DESCRIPTIONS", "1") != "0"
+MODEL_FALLBACK_TTL = float(os.getenv("MODEL_FALLBACK_TTL", str(60 * 60)))
+
+# Derived artifacts (graphs, figures, tables) shared across Streamlit sessions
+ARTIFACT_CACHE_MAX_BYTES = int(os.getenv("ARTIFACT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+ARTIFACT_CACHE_TTL = float(os.getenv("ARTIFACT_CACHE_TTL", str(10 * 60)))
+
+# Cold start: import-time budget for the app entry points, checked by the tests
+STARTUP_IMPORT_BUDGET = float(os.getenv("STARTUP_IMPORT_BUDGET", "3.0"))
+
+# Batch export
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+
+# Metrics: Prometheus text endpoint port (0 disables) and bind address, JSON log lines, debug panel
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_LOG = os.getenv("METRICS_LOG", "0") != "0"
+DEBUG_PANEL = os.getenv("DEBUG_PANEL", "0") != "0"
+
+# Background prefetch of the top search hits
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1") != "0"
+PREFETCH_TOP_K = int(os.getenv("PREFETCH_TOP_K", "3"))
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "3"))
+
+# Corpus analytics are rebuilt from the sample store at most this often (seconds)
+ANALYTICS_REFRESH_INTERVAL = float(os.getenv("ANALYTICS_REFRESH_INTERVAL", "60"))
+
+# Warm-start snapshots (see `python -m whosampled snapshot`)
+WARM_START_SNAPSHOT = os.getenv("WARM_START_SNAPSHOT", "")
+SNAPSHOT_COMPRESSION_LEVEL = int(os.getenv("SNAPSHOT_COMPRESSION_LEVEL", "6"))
@@ -0,0 +1,64 @@
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from whosampled.config import ANALYTICS_REFRESH_INTERVAL
+from whosampled.store.sample_store import get_store
+from whosampled.utils.metrics import get_metrics
+
+if TYPE_CHECKING:
+    from whosampled.utils.corpus_analytics import CorpusAnalytics
+
+_analytics: Optional["CorpusAnalytics"] = None
+_analytics_version = None
+_checked_at = 0.0
+_analytics_lock = threading.Lock()
+
+
+def get_corpus_analytics(
+    max_age: float = ANALYTICS_REFRESH_INTERVAL,
+) -> Optional["CorpusAnalytics"]:
+    """
+    Return the process-wide analytics snapshot of the sample store, or None
+    when the store is disabled. The store version is checked at most every
+    max_age seconds and the snapshot is only rebuilt when it changed, so
+    requests read precomputed results.
+    """
+    global _analytics, _analytics_version, _checked_at
+    store = get_store()
+    if store is None:
+        return None
+
+    with _analytics_lock:
+        now = time.monotonic()
+        if _analytics is not None and now - _checked_at < max_age:
+            return _analytics
+        _checked_at = now
+        version = store.version()
+        if _analytics is not None and version == _analytics_version:
+            return _analytics
+
+        from whosampled.utils.corpus_analytics import CorpusAnalytics, corpus_graph
+
+        with get_metrics().timer("analytics_build_seconds"):
+            songs, edges = store.corpus()
+            _analytics = CorpusAnalytics(corpus_graph(songs, edges), previous=_analytics)
+        _analytics_version = version
+        return _analytics
+
+
+def reset_corpus_analytics():
+    """Drop the analytics snapshot so the next request rebuilds it (used by tests)."""
+    global _analytics, _analytics_version, _checked_at
+    with _analytics_lock:
+        _analytics = None
+        _analytics_version = None
+        _checked_at = 0.0
+
+
+def get_sample_chain(from_id: int, to_id: int, directed: bool = True) -> Optional[List[Dict]]:
+    """Shortest sample chain between two stored songs, or None."""
+    analytics = get_corpus_analytics()
+    if analytics is None:
+        return None
+    return analytics.shortest_chain(from_id, to_id, directed)
@@ -0,0 +1,289 @@
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from whosampled.api.get_song_info import get_sampled_songs
+from whosampled.api.records import SampleRecord
+from whosampled.api.search import lookup_song_id
+from whosampled.config import EXPORT_BATCH_SIZE, GENIUS_MAX_CONCURRENCY
+
+CHECKPOINT_FILE = "checkpoint.jsonl"
+
+
+def read_inputs(path: str) -> Iterator[str]:
+    """Yield the non-empty, non-comment lines of an input file, one at a time."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+def resolve_song_id(entry: str) -> Optional[int]:
+    """
+    A numeric entry is a Genius song ID; anything else is a title to search.
+    None means no song matched; search errors are raised.
+    """
+    if entry.isdigit():
+        return int(entry)
+    return lookup_song_id(entry)
+
+
+def export_song(entry: str) -> Optional[SampleRecord]:
+    """Resolve one input line and fetch its samples; None if the title is not found."""
+    song_id = resolve_song_id(entry)
+    if song_id is None:
+        return None
+    return get_sampled_songs(song_id)
+
+
+def song_rows(song_data: SampleRecord) -> Tuple[List[Dict], List[Dict]]:
+    """Node and edge rows for one get_sampled_songs result."""
+    main_song = song_data.main_song
+    nodes = [song.to_dict() for song in (main_song, *song_data.sampled_songs)]
+    edges = [
+        {"song_id": main_song.id, "sampled_id": song.id, "position": position}
+        for position, song in enumerate(song_data.sampled_songs)
+    ]
+    return nodes, edges
+
+
+def trim_partial_line(path: str):
+    """Cut a file back to its last complete line, dropping a write cut short by a crash."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        end = pos = f.seek(0, os.SEEK_END)
+        while pos > 0:
+            step = min(pos, 64 * 1024)
+            f.seek(pos - step)
+            newline = f.read(step).rfind(b"\n")
+            if newline >= 0:
+                pos = pos - step + newline + 1
+                break
+            pos -= step
+        if pos != end:
+            f.truncate(pos)
+
+
+class Checkpoint:
+    """
+    Append-only log of the inputs already exported. Each line is flushed
+    and fsynced only after the batch it covers has been written, so a run
+    killed at any point never loses songs. A batch written to the tables
+    but not yet checkpointed is exported again on resume; the node and
+    edge writers skip rows already on disk, so nothing is duplicated.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Set[str] = set()
+        trim_partial_line(path)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.done.add(json.loads(line)["input"])
+                    except (ValueError, KeyError):
+                        continue
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __contains__(self, entry: str) -> bool:
+        return entry in self.done
+
+    def record(self, entries: Iterable[Tuple[str, int]]):
+        for entry, song_id in entries:
+            self._file.write(json.dumps({"input": entry, "song_id": song_id}) + "\n")
+            self.done.add(entry)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlTableWriter:
+    """
+    Appends rows to <out_dir>/<name>.jsonl. A last line left incomplete by
+    an interrupted run is cut off first, so new rows start on a fresh line.
+    """
+
+    def __init__(self, out_dir: str, name: str):
+        self.path = os.path.join(out_dir, f"{name}.jsonl")
+        trim_partial_line(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def existing(self, *columns: str) -> Set:
+        """Values of columns (tuples when several) already written by earlier runs."""
+        values = set()
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                    values.add(_key(row, columns))
+                except (ValueError, KeyError):
+                    continue
+        return values
+
+    def write(self, rows: List[Dict]):
+        self._file.writelines(json.dumps(row) + "\n" for row in rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetTableWriter:
+    """
+    Writes each batch as a complete part file under <out_dir>/<name>/, so
+    every file on disk is readable even if the run is interrupted.
+    Requires pyarrow, which is only imported here.
+    """
+
+    def __init__(self, out_dir: str, name: str):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)") from e
+        self.dir = os.path.join(out_dir, name)
+        os.makedirs(self.dir, exist_ok=True)
+        self._parts = len(self._part_files())
+
+    def _part_files(self) -> List[str]:
+        return sorted(
+            os.path.join(self.dir, f) for f in os.listdir(self.dir) if f.endswith(".parquet")
+        )
+
+    def existing(self, *columns: str) -> Set:
+        import pyarrow.parquet as pq
+
+        values = set()
+        for path in self._part_files():
+            table = pq.read_table(path, columns=list(columns)).to_pydict()
+            values.update(zip(*(table[column] for column in columns)))
+        if len(columns) == 1:
+            values = {value for (value,) in values}
+        return values
+
+    def write(self, rows: List[Dict]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not rows:
+            return
+        path = os.path.join(self.dir, f"part-{self._parts:05d}.parquet")
+        pq.write_table(pa.Table.from_pylist(rows), path + ".tmp")
+        os.replace(path + ".tmp", path)
+        self._parts += 1
+
+    def close(self):
+        pass
+
+
+def _key(row: Dict, columns: Tuple[str, ...]):
+    if len(columns) == 1:
+        return row[columns[0]]
+    return tuple(row[column] for column in columns)
+
+
+def open_table_writer(fmt: str, out_dir: str, name: str):
+    if fmt == "jsonl":
+        return JsonlTableWriter(out_dir, name)
+    if fmt == "parquet":
+        return ParquetTableWriter(out_dir, name)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def export_catalog(
+    input_path: str,
+    out_dir: str,
+    fmt: str = "jsonl",
+    workers: int = GENIUS_MAX_CONCURRENCY,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Dict[str, int]:
+    """
+    Export the sample graph of every song listed in input_path (titles or
+    Genius IDs, one per line) as node and edge tables in out_dir.
+
+    Inputs are streamed from the file and fetched by a pool of workers
+    with at most 2 * workers songs in flight, and rows are written every
+    batch_size songs, so fetched data never piles up. The bookkeeping
+    does grow with the catalog: the checkpointed and queued inputs and
+    the node IDs and edge pairs already written are held in memory sets,
+    a few dozen bytes per entry. Completed songs are checkpointed after
+    each batch is written. Inputs in the checkpoint are skipped, so
+    rerunning after an interruption resumes where the last run stopped.
+    Unresolved titles and failed fetches are not checkpointed and are
+    retried on the next run. Songs appearing in several lineages are only
+    written once to the node table, and edges already written by an
+    interrupted run are not written again.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    checkpoint = Checkpoint(os.path.join(out_dir, CHECKPOINT_FILE))
+    nodes = open_table_writer(fmt, out_dir, "nodes")
+    edges = open_table_writer(fmt, out_dir, "edges")
+    seen_nodes = nodes.existing("id")
+    seen_edges = edges.existing("song_id", "sampled_id")
+    stats = {"exported": 0, "skipped": 0, "not_found": 0, "failed": 0}
+    queued: Set[str] = set()
+
+    node_rows: List[Dict] = []
+    edge_rows: List[Dict] = []
+    completed: List[Tuple[str, int]] = []
+
+    def flush():
+        nodes.write(node_rows)
+        edges.write(edge_rows)
+        checkpoint.record(completed)
+        node_rows.clear()
+        edge_rows.clear()
+        completed.clear()
+
+    def collect(entry: str, future):
+        try:
+            song_data = future.result()
+        except Exception as e:
+            print(f"Error exporting {entry!r}: {e}")
+            stats["failed"] += 1
+            return
+        if song_data is None:
+            print(f"No matching song found for {entry!r}")
+            stats["not_found"] += 1
+            return
+        song_nodes, song_edges = song_rows(song_data)
+        for row in song_nodes:
+            if row["id"] not in seen_nodes:
+                seen_nodes.add(row["id"])
+                node_rows.append(row)
+        for row in song_edges:
+            key = (row["song_id"], row["sampled_id"])
+            if key not in seen_edges:
+                seen_edges.add(key)
+                edge_rows.append(row)
+        completed.append((entry, song_data.main_song.id))
+        stats["exported"] += 1
+        if len(completed) >= batch_size:
+            flush()
+
+    pending = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for entry in read_inputs(input_path):
+                if entry in checkpoint or entry in queued:
+                    stats["skipped"] += 1
+                    continue
+                queued.add(entry)
+                if len(pending) >= 2 * workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(pending.pop(future), future)
+                pending[pool.submit(export_song, entry)] = entry
+            for future in list(pending):
+                collect(pending.pop(future), future)
+        flush()
+    finally:
+        nodes.close()
+        edges.close()
+        checkpoint.close()
+    return stats
@@ -0,0 +1,121 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+from whosampled.config import PREFETCH_ENABLED, PREFETCH_TOP_K, PREFETCH_WORKERS
+from whosampled.utils.metrics import get_metrics
+
+
+class Prefetcher:
+    """
+    Warms songs in the background on a bounded, process-wide thread pool.
+    Each owner (a browser session) has one batch of prefetches at a time:
+    scheduling a new batch cancels the previous batch's queued songs, and
+    songs from a superseded batch that reach a worker are skipped, so a
+    changed query never waits behind prefetches for the old one. Results
+    live in the artifact cache, not here: futures resolve to None and a
+    batch is dropped as soon as all of its songs are done.
+    """
+
+    def __init__(self, fetch: Callable[[int], Any], workers: int = PREFETCH_WORKERS):
+        self._fetch = fetch
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._batches: Dict[Hashable, Dict] = {}
+        # Reentrant: done callbacks run inline when a future is cancelled under the lock
+        self._lock = threading.RLock()
+
+    def schedule(self, owner: Hashable, song_ids: Sequence[int]) -> List[Future]:
+        """Prefetch song_ids for owner, replacing its previous batch."""
+        song_ids = list(song_ids)
+        if not song_ids:
+            # Nothing would ever complete to drop an empty batch; clear any old one instead
+            self.cancel(owner)
+            return []
+        metrics = get_metrics()
+        with self._lock:
+            batch = self._batches.get(owner)
+            if batch is not None and batch["song_ids"] == song_ids:
+                return batch["futures"]
+            if batch is not None:
+                for future in batch["futures"]:
+                    if future.cancel():
+                        metrics.inc("prefetch_songs_total", result="cancelled")
+            batch = {"song_ids": song_ids, "futures": [], "pending": len(song_ids)}
+            self._batches[owner] = batch
+            batch["futures"] = [
+                self._executor.submit(self._run, owner, batch, song_id) for song_id in song_ids
+            ]
+            for future in batch["futures"]:
+                future.add_done_callback(lambda _, batch=batch: self._done(owner, batch))
+            return batch["futures"]
+
+    def cancel(self, owner: Hashable):
+        """Drop owner's batch, cancelling whatever has not started yet."""
+        with self._lock:
+            batch = self._batches.pop(owner, None)
+        if batch is not None:
+            for future in batch["futures"]:
+                if future.cancel():
+                    get_metrics().inc("prefetch_songs_total", result="cancelled")
+
+    def _done(self, owner: Hashable, batch: Dict):
+        with self._lock:
+            batch["pending"] -= 1
+            if batch["pending"] == 0 and self._batches.get(owner) is batch:
+                del self._batches[owner]
+
+    def _run(self, owner: Hashable, batch: Dict, song_id: int):
+        metrics = get_metrics()
+        with self._lock:
+            current = self._batches.get(owner) is batch
+        if not current:
+            metrics.inc("prefetch_songs_total", result="stale")
+            return
+        try:
+            # The result is kept by the artifact cache; holding it here would not be bounded
+            self._fetch(song_id)
+        except Exception:
+            # The song is fetched again (and the error shown) if it is selected
+            metrics.inc("prefetch_songs_total", result="failed")
+            return
+        metrics.inc("prefetch_songs_total", result="fetched")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def prefetch_song(song_id: int):
+    """Fetch a song and build its figure into the shared artifact cache."""
+    from whosampled.services.song_service import get_song_figure
+
+    get_song_figure(song_id)
+
+
+_prefetcher: Optional[Prefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> Prefetcher:
+    """Return the process-wide prefetcher shared by all sessions."""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher(prefetch_song)
+        return _prefetcher
+
+
+def set_prefetcher(prefetcher: Optional[Prefetcher]):
+    """Replace the process-wide prefetcher (used by tests)."""
+    global _prefetcher
+    with _prefetcher_lock:
+        _prefetcher = prefetcher
+
+
+def prefetch_top_hits(owner: Hashable, results, k: int = PREFETCH_TOP_K) -> List[Future]:
+    """Start warming the first k (display_text, song_id) search results for owner."""
+    if not PREFETCH_ENABLED:
+        return []
+    if not results:
+        get_prefetcher().cancel(owner)
+        return []
+    return get_prefetcher().schedule(owner, [song_id for _, song_id in results[:k]])
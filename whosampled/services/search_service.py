@@ -1,21 +1,181 @@
 from typing import List, Tuple, Optional
-from whosampled.api.search import get_search_results
-from whosampled.state.app_state import get_selected_song_id, set_selected_song_id, clear_selected_song
+from whosampled.api.search import get_search_results, get_search_page
+from whosampled.services.prefetch_service import prefetch_top_hits
+from whosampled.state.app_state import (
+    get_selected_song_id,
+    set_selected_song_id,
+    clear_selected_song,
+    get_search_history,
+    add_search_history,
+    get_complete_searches,
+    get_search_pager,
+    set_search_pager,
+    get_session_id,
+)
+from whosampled.utils.title_index import get_title_index, normalize_title
 import streamlit as st
 
-def handle_search(query: str) -> List[Tuple[str, int]]:
-    """Handle the search process and return results"""
+def handle_search(query: str, typeahead: bool = False) -> List[Tuple[str, int]]:
+    """
+    Handle the search process and return results.
+    The top hits start loading in the background straight away, so the song
+    a user picks is usually ready by the time they select it.
+    """
     if not query:
         clear_selected_song()
+        prefetch_top_hits(get_session_id(), [])
         return []
-    
-    results = get_search_results(query)
+
+    if typeahead:
+        results = handle_typeahead(query)
+    else:
+        results = get_search_results(query)
+    prefetch_top_hits(get_session_id(), results)
+    return results
+
+def handle_typeahead(query: str, limit: int = 10) -> List[Tuple[str, int]]:
+    """
+    Answer a submitted query locally first, then from the API.
+    When an earlier query this one extends came back as a complete page,
+    filtering its hits is exact and no /search request is made. Otherwise
+    local matches (filtered earlier results, then titles from the shared
+    title index) are shown straight away while the API search runs, and
+    any the API missed are listed after its results. A query already
+    answered in this session is served from its history.
+    """
+    normalized = normalize_title(query)
+    history = get_search_history()
+    if normalized in history:
+        return history[normalized]
+
+    narrowed = narrow_complete_search(normalized)
+    if narrowed is not None:
+        add_search_history(normalized, narrowed, complete=True)
+        return narrowed
+
+    local = add_local_matches(normalized, [], limit)
+    placeholder = show_instant_results(local) if local else None
+    try:
+        results, has_more = get_search_page(query, 1)
+    except Exception as e:
+        st.error(f"Error fetching search results: {e}")
+        return local
+    finally:
+        if placeholder is not None:
+            placeholder.empty()
+
+    results = add_local_matches(normalized, results, limit)
+    add_search_history(normalized, results, complete=not has_more)
     return results
 
+def show_instant_results(results: List[Tuple[str, int]]):
+    """Show local matches in a placeholder the caller empties once the API answers"""
+    placeholder = st.empty()
+    titles = "\n".join(f"- {title}" for title, _ in results)
+    placeholder.markdown(f"Searching Genius... local matches:\n{titles}")
+    return placeholder
+
+def narrow_complete_search(normalized: str) -> Optional[List[Tuple[str, int]]]:
+    """
+    Filter the results of the longest earlier query this one extends, if
+    that query's API results fitted on one page; None otherwise.
+    """
+    prefix = longest_prefix(normalized, get_search_history())
+    if prefix is None or prefix not in get_complete_searches():
+        return None
+    return filter_prefix_results(normalized, get_search_history())
+
+def add_local_matches(
+    normalized: str, results: List[Tuple[str, int]], limit: int = 10
+) -> List[Tuple[str, int]]:
+    """Append up to limit locally known matches that are not already in results"""
+    history = get_search_history()
+    local = filter_prefix_results(normalized, history)
+    local += get_title_index().search(normalized, limit=limit)
+    seen = {song_id for _, song_id in results}
+    extra = []
+    for result in local:
+        if result[1] not in seen and len(extra) < limit:
+            extra.append(result)
+            seen.add(result[1])
+    return results + extra
+
+def longest_prefix(normalized: str, history) -> Optional[str]:
+    """The longest earlier query that this one extends, if any"""
+    prefixes = [q for q in history if normalized.startswith(q) and q != normalized]
+    return max(prefixes, key=len) if prefixes else None
+
+def filter_prefix_results(normalized: str, history) -> List[Tuple[str, int]]:
+    """Filter results of the longest earlier query that is a prefix of this one"""
+    prefix = longest_prefix(normalized, history)
+    if prefix is None:
+        return []
+    return [
+        result for result in history[prefix]
+        if normalized in normalize_title(result[0])
+    ]
+
+def handle_paginated_search(
+    query: str, typeahead: bool = False
+) -> Tuple[List[Tuple[str, int]], bool]:
+    """
+    Handle a search whose results can be extended page by page.
+    Returns the first page plus any pages loaded so far (followed by
+    local typeahead matches when enabled), and whether more pages may be
+    available.
+    """
+    if not query:
+        handle_search(query)
+        set_search_pager(None)
+        return [], False
+
+    pager = get_search_pager()
+    if pager is None or pager["query"] != query:
+        normalized = normalize_title(query)
+        narrowed = narrow_complete_search(normalized) if typeahead else None
+        if narrowed is not None:
+            results, has_more = narrowed, False
+        else:
+            try:
+                results, has_more = get_search_page(query, 1)
+            except Exception as e:
+                st.error(f"Error fetching search results: {e}")
+                results, has_more = [], False
+        local = []
+        if typeahead:
+            local = add_local_matches(normalized, results)[len(results):]
+            add_search_history(normalized, results + local, complete=not has_more)
+        pager = {
+            "query": query, "results": results, "local": local,
+            "next_page": 2, "has_more": has_more,
+        }
+        set_search_pager(pager)
+
+    seen = {song_id for _, song_id in pager["results"]}
+    results = pager["results"] + [result for result in pager["local"] if result[1] not in seen]
+    prefetch_top_hits(get_session_id(), results)
+    return results, pager["has_more"]
+
+def load_more_search_results():
+    """Fetch the next results page for the current query (Load more callback)"""
+    pager = get_search_pager()
+    if not pager or not pager["has_more"]:
+        return
+
+    try:
+        results, has_more = get_search_page(pager["query"], pager["next_page"])
+    except Exception as e:
+        st.error(f"Error fetching more search results: {e}")
+        return
+
+    pager["results"].extend(results)
+    pager["next_page"] += 1
+    pager["has_more"] = has_more
+
 def handle_song_selection(selected_song_display: str, selected_id: Optional[int]):
     """Handle song selection and update state"""
     set_selected_song_id(selected_id)
-    
+
     # Display the selected song ID if one is selected
     if selected_id:
-        st.write(f"Selected song ID: {selected_id}") 
\ No newline at end of file
+        st.write(f"Selected song ID: {selected_id}")
@@ -0,0 +1,447 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import uuid
+import zlib
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from whosampled.config import CACHE_DIR, SNAPSHOT_COMPRESSION_LEVEL, WARM_START_SNAPSHOT
+from whosampled.utils.metrics import get_metrics
+
+# File layout (little-endian):
+#   header   MAGIC, format version, section count, section table offset,
+#            created_at, snapshot ID
+#   sections one zlib stream each, of rows framed as u32 length + row bytes
+#   table    per section: tag, offset, compressed length, CRC-32 of the
+#            compressed bytes, uncompressed length, row count
+# A row starts with a null bitmap byte, followed by its non-null fields.
+# Readers skip sections with unknown tags, so new sections can be added
+# without a version bump; changing an existing schema needs one.
+MAGIC = b"WSSNAP\x00\x00"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sHHQd16s")
+_SECTION = struct.Struct("<4sQQIQQ")
+_FRAME = struct.Struct("<I")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+
+# Row schema per section: q = int64, d = float64, s = UTF-8 string
+SCHEMAS = {
+    b"RESP": "ssdd",  # cached Genius responses: key, JSON payload, stored_at, expires_at
+    b"SONG": "qssqdd",  # id, title, artist, year, fetched_at, sampled_in_at
+    b"EDGE": "qqq",  # song_id, sampled_id, position
+    b"DESC": "ssdd",  # cached LLM descriptions: key, text (JSON), stored_at, expires_at
+}
+
+# Rows of all-numeric schemas without nulls are packed and unpacked in one call
+_FIXED_ROWS = {
+    schema: struct.Struct("<B" + schema) for schema in SCHEMAS.values() if "s" not in schema
+}
+
+# Response cache entries worth shipping; /songs bodies are already in the store
+SNAPSHOT_ENDPOINTS = ("/search",)
+_IMPORT_BATCH = 5000
+_READ_CHUNK = 1 << 20
+
+
+class SnapshotError(ValueError):
+    """The file is not a snapshot, is corrupt, or uses a newer format."""
+
+
+class SectionInfo(NamedTuple):
+    tag: bytes
+    offset: int
+    length: int
+    crc: int
+    raw_length: int
+    rows: int
+
+
+def encode_row(schema: str, row: tuple) -> bytes:
+    fixed = _FIXED_ROWS.get(schema)
+    if fixed is not None and None not in row:
+        return fixed.pack(0, *row)
+    nulls = 0
+    parts = []
+    for i, (kind, value) in enumerate(zip(schema, row)):
+        if value is None:
+            nulls |= 1 << i
+        elif kind == "q":
+            parts.append(_INT.pack(value))
+        elif kind == "d":
+            parts.append(_FLOAT.pack(value))
+        else:
+            data = value.encode("utf-8")
+            parts.append(_FRAME.pack(len(data)))
+            parts.append(data)
+    return bytes([nulls]) + b"".join(parts)
+
+
+def decode_row(schema: str, data: memoryview) -> tuple:
+    nulls = data[0]
+    if nulls == 0 and schema in _FIXED_ROWS:
+        return _FIXED_ROWS[schema].unpack(data)[1:]
+    pos = 1
+    row = []
+    for i, kind in enumerate(schema):
+        if nulls & (1 << i):
+            row.append(None)
+        elif kind == "q":
+            row.append(_INT.unpack_from(data, pos)[0])
+            pos += 8
+        elif kind == "d":
+            row.append(_FLOAT.unpack_from(data, pos)[0])
+            pos += 8
+        else:
+            (size,) = _FRAME.unpack_from(data, pos)
+            pos += 4
+            row.append(bytes(data[pos:pos + size]).decode("utf-8"))
+            pos += size
+    return tuple(row)
+
+
+class SnapshotWriter:
+    """
+    Writes a snapshot file section by section. Rows are compressed as they
+    are produced, so exporting never holds a whole table in memory. The
+    file is written next to path and renamed into place when closed.
+    """
+
+    def __init__(self, path: str, level: int = SNAPSHOT_COMPRESSION_LEVEL):
+        self.path = path
+        self.level = level
+        self.snapshot_id = uuid.uuid4().bytes
+        self.sections: List[SectionInfo] = []
+        self._tmp = f"{path}.tmp"
+        self._file = open(self._tmp, "wb")
+        self._file.write(b"\x00" * _HEADER.size)
+
+    def write_section(self, tag: bytes, rows: Iterable[tuple]) -> int:
+        """Compress rows into a new section; returns the number of rows."""
+        schema = SCHEMAS[tag]
+        offset = self._file.tell()
+        compressor = zlib.compressobj(self.level)
+        crc = raw_length = count = 0
+        buffer = []
+        buffered = 0
+
+        def flush(data: bytes):
+            nonlocal crc
+            if data:
+                crc = zlib.crc32(data, crc)
+                self._file.write(data)
+
+        for row in rows:
+            encoded = encode_row(schema, row)
+            buffer.append(_FRAME.pack(len(encoded)))
+            buffer.append(encoded)
+            buffered += 4 + len(encoded)
+            count += 1
+            if buffered >= _READ_CHUNK:
+                chunk = b"".join(buffer)
+                raw_length += len(chunk)
+                flush(compressor.compress(chunk))
+                buffer, buffered = [], 0
+        chunk = b"".join(buffer)
+        raw_length += len(chunk)
+        flush(compressor.compress(chunk))
+        flush(compressor.flush())
+
+        length = self._file.tell() - offset
+        self.sections.append(SectionInfo(tag, offset, length, crc, raw_length, count))
+        return count
+
+    def close(self):
+        table_offset = self._file.tell()
+        for section in self.sections:
+            self._file.write(_SECTION.pack(*section))
+        self._file.seek(0)
+        self._file.write(
+            _HEADER.pack(
+                MAGIC, FORMAT_VERSION, len(self.sections), table_offset, time.time(),
+                self.snapshot_id,
+            )
+        )
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        self._file.close()
+        os.remove(self._tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class SnapshotReader:
+    """
+    Reads a snapshot through a memory map. Opening only parses the header
+    and section table; rows(tag) then decompresses its section in chunks
+    and yields rows as they are decoded, so memory use stays flat however
+    large the bundle is.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SnapshotError(f"{path} is empty")
+        try:
+            self._read_header()
+        except SnapshotError:
+            self.close()
+            raise
+
+    def _read_header(self):
+        if len(self._map) < _HEADER.size:
+            raise SnapshotError(f"{self.path} is too short to be a snapshot")
+        magic, version, count, table_offset, created_at, snapshot_id = _HEADER.unpack_from(
+            self._map, 0
+        )
+        if magic != MAGIC:
+            raise SnapshotError(f"{self.path} is not a snapshot")
+        if version > FORMAT_VERSION:
+            raise SnapshotError(
+                f"{self.path} uses snapshot format {version}; this version reads up to {FORMAT_VERSION}"
+            )
+        if table_offset + count * _SECTION.size > len(self._map):
+            raise SnapshotError(f"{self.path} is truncated")
+        self.version = version
+        self.created_at = created_at
+        self.snapshot_id = snapshot_id
+        self.sections: Dict[bytes, SectionInfo] = {}
+        for i in range(count):
+            section = SectionInfo(*_SECTION.unpack_from(self._map, table_offset + i * _SECTION.size))
+            if section.tag in SCHEMAS:
+                self.sections[section.tag] = section
+
+    def _chunks(self, section: SectionInfo) -> Iterator[bytes]:
+        end = section.offset + section.length
+        for start in range(section.offset, end, _READ_CHUNK):
+            # Slicing the map pages in just this chunk of the file
+            yield self._map[start:min(start + _READ_CHUNK, end)]
+
+    def verify(self, tags: Optional[Iterable[bytes]] = None):
+        """
+        Check the CRC of each section (all by default) and raise
+        SnapshotError on a mismatch, before any of its rows are used.
+        """
+        for tag in self.sections if tags is None else tags:
+            section = self.sections.get(tag)
+            if section is None:
+                continue
+            crc = 0
+            for chunk in self._chunks(section):
+                crc = zlib.crc32(chunk, crc)
+            if crc != section.crc:
+                raise SnapshotError(f"Section {tag.decode()} of {self.path} is corrupt")
+
+    def rows(self, tag: bytes) -> Iterator[tuple]:
+        """
+        Yield the rows of a section; nothing if the snapshot lacks it.
+        The section's CRC is checked before the first row is yielded.
+        """
+        section = self.sections.get(tag)
+        if section is None:
+            return
+        self.verify((tag,))
+        schema = SCHEMAS[tag]
+        decompressor = zlib.decompressobj()
+        pending = bytearray()
+        try:
+            for chunk in self._chunks(section):
+                pending += decompressor.decompress(chunk)
+                yield from self._frames(schema, pending)
+            pending += decompressor.flush()
+            yield from self._frames(schema, pending)
+        except zlib.error as e:
+            raise SnapshotError(f"Section {tag.decode()} of {self.path} is corrupt: {e}")
+        if pending or not decompressor.eof:
+            raise SnapshotError(f"Section {tag.decode()} of {self.path} is corrupt")
+
+    @staticmethod
+    def _frames(schema: str, pending: bytearray) -> Iterator[tuple]:
+        """Decode every complete frame in pending and drop it from the buffer."""
+        pos = 0
+        rows = []
+        with memoryview(pending) as data:
+            while pos + 4 <= len(data):
+                (size,) = _FRAME.unpack_from(data, pos)
+                if pos + 4 + size > len(data):
+                    break
+                with data[pos + 4:pos + 4 + size] as frame:
+                    rows.append(decode_row(schema, frame))
+                pos += 4 + size
+        del pending[:pos]
+        yield from rows
+
+    def info(self) -> Dict:
+        return {
+            "version": self.version,
+            "created_at": self.created_at,
+            "snapshot_id": self.snapshot_id.hex(),
+            "sections": {
+                tag.decode(): {"rows": s.rows, "bytes": s.length, "raw_bytes": s.raw_length}
+                for tag, s in self.sections.items()
+            },
+        }
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _response_disk_cache():
+    from whosampled.api.genius_client import get_client
+
+    cache = get_client().cache
+    return cache.disk if cache is not None else None
+
+
+def _description_disk_cache():
+    from whosampled.api.description_cache import get_description_cache
+
+    cache = get_description_cache()
+    return cache.store if cache is not None else None
+
+
+def export_snapshot(
+    path: str, level: int = SNAPSHOT_COMPRESSION_LEVEL, endpoints: Tuple[str, ...] = SNAPSHOT_ENDPOINTS
+) -> Dict[str, int]:
+    """
+    Write cached search responses, the sample store's songs and
+    relationships, and cached LLM descriptions to a snapshot at path.
+    Returns the row count of each section.
+    """
+    from whosampled.store.sample_store import get_store
+
+    responses, store, descriptions = _response_disk_cache(), get_store(), _description_disk_cache()
+    with get_metrics().timer("snapshot_seconds", operation="export"):
+        with SnapshotWriter(path, level) as writer:
+            if responses is not None:
+                writer.write_section(
+                    b"RESP",
+                    (row for endpoint in endpoints for row in responses.iter_rows(endpoint + "?")),
+                )
+            if store is not None:
+                writer.write_section(b"SONG", store.iter_song_rows())
+                writer.write_section(b"EDGE", store.iter_edge_rows())
+            if descriptions is not None:
+                writer.write_section(b"DESC", descriptions.iter_rows())
+    return {section.tag.decode(): section.rows for section in writer.sections}
+
+
+def _batches(rows: Iterable[tuple], size: int = _IMPORT_BATCH) -> Iterator[List[tuple]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _search_titles(rows: List[tuple]) -> List[Tuple[str, int]]:
+    titles = []
+    for key, payload, _, _ in rows:
+        if key.startswith("/search?"):
+            try:
+                hits = json.loads(payload)["response"]["hits"]
+                titles.extend((hit["result"]["full_title"], hit["result"]["id"]) for hit in hits)
+            except (ValueError, KeyError, TypeError):
+                continue
+    return titles
+
+
+def import_snapshot(path: str) -> Dict[str, int]:
+    """
+    Merge a snapshot into the local response cache, sample store and
+    description cache, streaming each section in batches. Entries already
+    present locally win when they are newer. Titles of cached searches are
+    added to the typeahead index. Returns the row count read per section.
+    """
+    from whosampled.store.sample_store import get_store
+    from whosampled.utils.title_index import get_title_index
+
+    responses, store, descriptions = _response_disk_cache(), get_store(), _description_disk_cache()
+    counts = {}
+    with get_metrics().timer("snapshot_seconds", operation="import"):
+        with SnapshotReader(path) as reader:
+            # Refuse a damaged bundle before anything is merged
+            reader.verify()
+            for tag in reader.sections:
+                counts[tag.decode()] = 0
+            if responses is not None:
+                for batch in _batches(reader.rows(b"RESP")):
+                    responses.set_rows(batch)
+                    get_title_index().add_many(_search_titles(batch))
+                    counts["RESP"] += len(batch)
+            if store is not None and (b"SONG" in reader.sections or b"EDGE" in reader.sections):
+                # One transaction: which side's edges win depends on the songs
+                counts["SONG"], counts["EDGE"] = store.import_rows(
+                    songs=reader.rows(b"SONG"), edges=reader.rows(b"EDGE")
+                )
+            if descriptions is not None:
+                for batch in _batches(reader.rows(b"DESC")):
+                    descriptions.set_rows(batch)
+                    counts["DESC"] += len(batch)
+    return counts
+
+
+_warm_started = False
+_warm_start_lock = threading.Lock()
+
+
+def warm_start(path: Optional[str] = WARM_START_SNAPSHOT, marker_dir: str = CACHE_DIR) -> bool:
+    """
+    Import the snapshot at path once per process, before the first request
+    is served. A marker file remembers the last imported snapshot ID, so a
+    restarted container with the same bundle skips the import. Returns
+    whether a snapshot was imported. A missing or broken bundle is logged
+    and ignored: the app still works, just cold.
+    """
+    global _warm_started
+    if not path:
+        return False
+    with _warm_start_lock:
+        if _warm_started:
+            return False
+        _warm_started = True
+        marker = os.path.join(marker_dir, "snapshot.imported")
+        try:
+            with SnapshotReader(path) as reader:
+                snapshot_id = reader.snapshot_id.hex()
+            if os.path.exists(marker):
+                with open(marker, encoding="utf-8") as f:
+                    if f.read().strip() == snapshot_id:
+                        return False
+            counts = import_snapshot(path)
+            os.makedirs(marker_dir, exist_ok=True)
+            with open(marker, "w", encoding="utf-8") as f:
+                f.write(snapshot_id)
+        except (OSError, SnapshotError) as e:
+            print(f"Warm-start snapshot not loaded: {e}")
+            return False
+        print(f"Warm-started from {path}: {counts}")
+        return True
@@ -0,0 +1,110 @@
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from whosampled.api.get_song_info import get_sampled_in_page, get_sampled_songs
+from whosampled.api.records import SampleRecord, SongRecord
+from whosampled.config import SAMPLED_IN_PAGE_SIZE
+from whosampled.utils.artifact_cache import get_artifact_cache
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    from whosampled.utils.compact_graph import CompactGraph
+
+# NumPy, pandas and Plotly are imported inside the builders so that importing
+# the app does not load them before the first song is shown.
+
+
+def get_song_data(song_id: int) -> Optional[SampleRecord]:
+    """Get a song and its samples, shared across sessions"""
+    return get_artifact_cache().get_or_create(
+        ("song_data", song_id), lambda: get_sampled_songs(song_id)
+    )
+
+
+def get_sampled_in(
+    song_id: int, limit: int = SAMPLED_IN_PAGE_SIZE
+) -> Optional[Tuple[Tuple[SongRecord, ...], bool]]:
+    """
+    Get the first limit songs that sample a song, oldest first, and
+    whether there are more. Shared across sessions per song and limit.
+    """
+    def build():
+        songs, has_more = get_sampled_in_page(song_id, page=1, per_page=limit)
+        return tuple(songs), has_more
+
+    return get_artifact_cache().get_or_create(("sampled_in", song_id, limit), build)
+
+
+def _graph_key(kind: str, song_id: int, direction: str, limit: int) -> Tuple:
+    if direction == "samples":
+        return (kind, song_id)
+    if direction == "sampled_in":
+        return (kind, song_id, direction, limit)
+    raise ValueError(f"Unknown direction: {direction}")
+
+
+def get_song_graph(
+    song_id: int, direction: str = "samples", limit: int = SAMPLED_IN_PAGE_SIZE
+) -> Optional["CompactGraph"]:
+    """
+    Get the sample graph of a song, built once per song. direction is
+    "samples" (what the song samples) or "sampled_in" (the first limit
+    songs that sample it).
+    """
+    def build():
+        from whosampled.utils.graph_utils import build_compact_graph, build_sampled_in_graph
+
+        song_data = get_song_data(song_id)
+        if not song_data:
+            return None
+        if direction == "sampled_in":
+            sampling_songs, _ = get_sampled_in(song_id, limit)
+            return build_sampled_in_graph(song_data.main_song, sampling_songs)
+        return build_compact_graph(song_data.main_song, song_data.sampled_songs)
+
+    return get_artifact_cache().get_or_create(
+        _graph_key("graph", song_id, direction, limit), build
+    )
+
+
+def get_song_figure(
+    song_id: int, direction: str = "samples", limit: int = SAMPLED_IN_PAGE_SIZE
+) -> Optional["go.Figure"]:
+    """Get the Plotly figure of a song's sample graph, built once per song"""
+    def build():
+        from whosampled.utils.graph_utils import plot_graph
+
+        graph = get_song_graph(song_id, direction, limit)
+        return plot_graph(graph) if graph is not None else None
+
+    return get_artifact_cache().get_or_create(
+        _graph_key("figure", song_id, direction, limit), build
+    )
+
+
+def get_samples_table(
+    song_id: int, direction: str = "samples", limit: int = SAMPLED_IN_PAGE_SIZE
+) -> Optional["pd.DataFrame"]:
+    """Get the table of a song's samples (or sampling songs) shown below the graph"""
+    def build():
+        import pandas as pd
+
+        song_data = get_song_data(song_id)
+        if not song_data:
+            return None
+        if direction == "sampled_in":
+            songs, _ = get_sampled_in(song_id, limit)
+        else:
+            songs = song_data.sampled_songs
+        return pd.DataFrame(
+            {
+                "Song": [song.title for song in songs],
+                "Artist": [song.artist for song in songs],
+                "Year": [song.year if song.year else "Unknown" for song in songs],
+            }
+        )
+
+    return get_artifact_cache().get_or_create(
+        _graph_key("samples_table", song_id, direction, limit), build
+    )
@@ -1,5 +1,9 @@
+import uuid
 import streamlit as st
-from typing import Optional
+from typing import Dict, List, Optional, Set, Tuple
+
+# Number of past queries kept per session for typeahead prefix reuse
+MAX_SEARCH_HISTORY = 50
 
 def initialize_state():
     """Initialize the application state"""
@@ -16,4 +20,57 @@ def set_selected_song_id(song_id: Optional[int]):
 
 def clear_selected_song():
     """Clear the selected song from state"""
-    st.session_state['selected_song_id'] = None 
\ No newline at end of file
+    st.session_state['selected_song_id'] = None
+
+def get_search_history() -> Dict[str, List[Tuple[str, int]]]:
+    """Get this session's search results keyed by normalized query"""
+    return st.session_state.setdefault('search_history', {})
+
+def get_complete_searches() -> Set[str]:
+    """Get the normalized queries whose API results all fitted on one page"""
+    return st.session_state.setdefault('complete_searches', set())
+
+def add_search_history(query: str, results: List[Tuple[str, int]], complete: bool = False):
+    """Remember the search results for a normalized query, and whether they were complete"""
+    history = get_search_history()
+    complete_searches = get_complete_searches()
+    history.pop(query, None)
+    history[query] = results
+    if complete:
+        complete_searches.add(query)
+    else:
+        complete_searches.discard(query)
+    while len(history) > MAX_SEARCH_HISTORY:
+        oldest = next(iter(history))
+        del history[oldest]
+        complete_searches.discard(oldest)
+
+def get_search_pager() -> Optional[Dict]:
+    """Get the pagination state of the current search query"""
+    return st.session_state.get('search_pager')
+
+def set_search_pager(pager: Optional[Dict]):
+    """Set the pagination state of the current search query"""
+    st.session_state['search_pager'] = pager
+
+def get_session_id() -> str:
+    """Get a stable identifier for this browser session"""
+    if 'session_id' not in st.session_state:
+        st.session_state['session_id'] = uuid.uuid4().hex
+    return st.session_state['session_id']
+
+def get_sampled_in_limit(song_id: int, default: int) -> int:
+    """Get how many "sampled in" songs are shown for a song"""
+    return st.session_state.get('sampled_in_limits', {}).get(song_id, default)
+
+def set_sampled_in_limit(song_id: int, limit: int):
+    """Set how many "sampled in" songs are shown for a song"""
+    st.session_state.setdefault('sampled_in_limits', {})[song_id] = limit
+
+def get_exploration():
+    """Get the click-to-expand graph of this session, if any"""
+    return st.session_state.get('exploration')
+
+def set_exploration(exploration):
+    """Set (or clear, with None) the click-to-expand graph of this session"""
+    st.session_state['exploration'] = exploration
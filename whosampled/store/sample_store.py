@@ -0,0 +1,418 @@
+import os
+import sqlite3
+import threading
+import time
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from whosampled.api.records import SampleRecord, SongRecord
+from whosampled.config import SAMPLE_STORE_ENABLED, SAMPLE_STORE_PATH, SAMPLE_STORE_TTL
+
+# SQLite limits the number of bound parameters per statement
+_MAX_PARAMS = 500
+# Below every Genius song ID; starts keyset pagination
+_MIN_ID = -(2 ** 63)
+# Rows per executemany call when importing a snapshot
+_IMPORT_BATCH = 5000
+
+_IMPORT_SONG_SQL = """INSERT INTO songs (id, title, artist, year, fetched_at, sampled_in_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        title = CASE WHEN {newer} THEN excluded.title ELSE songs.title END,
+        artist = CASE WHEN {newer} THEN excluded.artist ELSE songs.artist END,
+        year = CASE WHEN {newer} THEN COALESCE(excluded.year, songs.year)
+            ELSE COALESCE(songs.year, excluded.year) END,
+        fetched_at = NULLIF(
+            MAX(COALESCE(excluded.fetched_at, 0), COALESCE(songs.fetched_at, 0)), 0
+        ),
+        sampled_in_at = NULLIF(
+            MAX(COALESCE(excluded.sampled_in_at, 0), COALESCE(songs.sampled_in_at, 0)), 0
+        )""".format(newer="COALESCE(excluded.fetched_at, 0) > COALESCE(songs.fetched_at, 0)")
+
+
+class SampleStore:
+    """
+    Persistent sample graph keyed by Genius song ID.
+    Song records live in `songs`; `samples` holds one row per "A samples B"
+    edge with indexes in both directions, so forward ("samples") and reverse
+    ("sampled in") neighbors are plain indexed reads. Edges from both
+    directions of every fetched song land in the same table, so the reverse
+    index covers everything we have ever fetched. `songs.sampled_in_at`
+    records when a song's full "sampled in" list was last stored.
+    """
+
+    def __init__(self, path: str = SAMPLE_STORE_PATH, ttl: float = SAMPLE_STORE_TTL):
+        self.path = path
+        self.ttl = ttl
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        # Bumped on every write through this instance; see version()
+        self._revision = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS songs (
+                id INTEGER PRIMARY KEY,
+                title TEXT NOT NULL,
+                artist TEXT,
+                year INTEGER,
+                fetched_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS samples (
+                song_id INTEGER NOT NULL,
+                sampled_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                PRIMARY KEY (song_id, sampled_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS samples_reverse ON samples (sampled_id, song_id);
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(songs)")}
+        if "sampled_in_at" not in columns:
+            # Stores created before reverse relationships were kept
+            self._conn.execute("ALTER TABLE songs ADD COLUMN sampled_in_at REAL")
+        self._conn.commit()
+
+    def _upsert_song(self, song: Dict, fetched_at: Optional[float] = None):
+        self._conn.execute(
+            """INSERT INTO songs (id, title, artist, year, fetched_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                title = excluded.title,
+                artist = excluded.artist,
+                year = COALESCE(excluded.year, songs.year),
+                fetched_at = COALESCE(excluded.fetched_at, songs.fetched_at)""",
+            (song["id"], song["title"], song["artist"], song["year"], fetched_at),
+        )
+
+    def upsert_song_data(self, song_data: Dict, sampled_in: Optional[Iterable[Dict]] = None):
+        """
+        Store a get_sampled_songs result: the main song is marked as fetched
+        and its forward edges are replaced by the ones in song_data.
+        sampled_in, when given, is the complete list of songs sampling the
+        main song (parse_sampled_in); their edges are added to the index.
+        """
+        main_song = song_data["main_song"]
+        with self._lock:
+            self._upsert_song(main_song, fetched_at=time.time())
+            for song in song_data["sampled_songs"]:
+                self._upsert_song(song)
+            self._conn.execute("DELETE FROM samples WHERE song_id = ?", (main_song["id"],))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO samples (song_id, sampled_id, position) VALUES (?, ?, ?)",
+                [
+                    (main_song["id"], song["id"], position)
+                    for position, song in enumerate(song_data["sampled_songs"])
+                ],
+            )
+            if sampled_in is not None:
+                self._upsert_sampled_in(main_song["id"], sampled_in)
+            self._conn.commit()
+            self._revision += 1
+
+    def _upsert_sampled_in(self, song_id: int, sampled_in: Iterable[Dict]):
+        for song in sampled_in:
+            self._upsert_song(song)
+            # Appended after the sampling song's own samples, which a later
+            # fetch of that song replaces in Genius order
+            self._conn.execute(
+                """INSERT OR IGNORE INTO samples (song_id, sampled_id, position)
+                SELECT ?, ?, COALESCE(MAX(position) + 1, 0) FROM samples WHERE song_id = ?""",
+                (song["id"], song_id, song["id"]),
+            )
+        self._conn.execute(
+            "UPDATE songs SET sampled_in_at = ? WHERE id = ?", (time.time(), song_id)
+        )
+
+    def get_song(self, song_id: int) -> Optional[Dict]:
+        """Return the stored record for a song, or None."""
+        songs = self.get_songs([song_id])
+        return songs.get(song_id)
+
+    def get_songs(self, song_ids: Iterable[int]) -> Dict[int, Dict]:
+        """Return stored records for the given IDs as dicts, keyed by ID."""
+        return {
+            song_id: {"id": song_id, "title": title, "artist": artist, "year": year}
+            for song_id, title, artist, year in self._song_rows(song_ids)
+        }
+
+    def get_song_records(self, song_ids: Iterable[int]) -> Dict[int, SongRecord]:
+        """Return stored records for the given IDs as SongRecords, keyed by ID."""
+        return {row[0]: SongRecord(*row) for row in self._song_rows(song_ids)}
+
+    def _song_rows(self, song_ids: Iterable[int]) -> List[tuple]:
+        rows = []
+        for chunk in _chunks(list(song_ids)):
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows.extend(self._conn.execute(
+                    f"SELECT id, title, artist, year FROM songs WHERE id IN ({placeholders})",
+                    chunk,
+                ).fetchall())
+        return rows
+
+    def is_fresh(self, song_id: int) -> bool:
+        """Whether the song's relationships were fetched within the TTL."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at FROM songs WHERE id = ?", (song_id,)
+            ).fetchone()
+        return bool(row and row[0] is not None and time.time() - row[0] < self.ttl)
+
+    def has_sampled_in(self, song_id: int) -> bool:
+        """Whether the song's full "sampled in" list was stored within the TTL."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sampled_in_at FROM songs WHERE id = ?", (song_id,)
+            ).fetchone()
+        return bool(row and row[0] is not None and time.time() - row[0] < self.ttl)
+
+    def get_sampled_songs(self, song_id: int) -> Optional[SampleRecord]:
+        """
+        Return a get_sampled_songs-shaped record from the store, or None
+        when the song's relationships have not been fetched or are stale.
+        """
+        if not self.is_fresh(song_id):
+            return None
+        sampled_ids = self.samples_of(song_id)
+        songs = self.get_song_records([song_id] + sampled_ids)
+        return SampleRecord(songs[song_id], (songs[i] for i in sampled_ids if i in songs))
+
+    def samples_of(self, song_id: int) -> List[int]:
+        """IDs of songs that song_id samples, in Genius order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sampled_id FROM samples WHERE song_id = ? ORDER BY position",
+                (song_id,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def sampled_in(self, song_id: int) -> List[int]:
+        """IDs of songs that sample song_id."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT song_id FROM samples WHERE sampled_id = ? ORDER BY song_id",
+                (song_id,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def sampled_in_page(
+        self, song_id: int, offset: int = 0, limit: Optional[int] = None
+    ) -> List[SongRecord]:
+        """
+        Records of songs that sample song_id, oldest first (unknown years
+        last), skipping offset songs and returning at most limit.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT songs.id, songs.title, songs.artist, songs.year
+                FROM samples JOIN songs ON songs.id = samples.song_id
+                WHERE samples.sampled_id = ?
+                ORDER BY songs.year IS NULL, songs.year, songs.id
+                LIMIT ? OFFSET ?""",
+                (song_id, -1 if limit is None else limit, offset),
+            ).fetchall()
+        return [SongRecord(*row) for row in rows]
+
+    def count_sampled_in(self, song_id: int) -> int:
+        """Number of songs known to sample song_id."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM samples WHERE sampled_id = ?", (song_id,)
+            ).fetchone()
+        return row[0]
+
+    def neighborhood(
+        self, song_id: int, k: int = 1, direction: str = "samples", max_nodes: Optional[int] = None
+    ) -> Dict:
+        """
+        Return the k-hop neighborhood of song_id as a crawl_sample_lineage
+        shaped dict. direction is "samples" (forward) or "sampled_in" (reverse);
+        edges always point from the sampling song to the sampled song.
+        Each hop is a single indexed query over the whole frontier.
+        """
+        if direction == "samples":
+            query, reverse = "SELECT song_id, sampled_id FROM samples WHERE song_id IN ({})", False
+        elif direction == "sampled_in":
+            query, reverse = "SELECT song_id, sampled_id FROM samples WHERE sampled_id IN ({})", True
+        else:
+            raise ValueError(f"Unknown direction: {direction}")
+
+        depths = {song_id: 0}
+        edges = []
+        frontier = [song_id]
+        for depth in range(1, k + 1):
+            if not frontier:
+                break
+            next_frontier = []
+            for chunk in _chunks(frontier):
+                with self._lock:
+                    rows = self._conn.execute(
+                        query.format(",".join("?" * len(chunk))) + " ORDER BY position", chunk
+                    ).fetchall()
+                for from_id, to_id in rows:
+                    neighbor = from_id if reverse else to_id
+                    if neighbor not in depths:
+                        if max_nodes is not None and len(depths) >= max_nodes:
+                            continue
+                        depths[neighbor] = depth
+                        next_frontier.append(neighbor)
+                    edges.append((from_id, to_id))
+            frontier = next_frontier
+
+        songs = self.get_songs(depths)
+        for node_id, song in songs.items():
+            song["depth"] = depths[node_id]
+        return {"main_song": songs.get(song_id), "songs": songs, "edges": edges}
+
+    def version(self) -> Tuple[int, int]:
+        """
+        Changes whenever the store's contents may have changed, whether
+        written through this instance or by another process (SQLite's
+        data_version), without reading any table.
+        """
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return self._revision, data_version
+
+    def corpus(self) -> Tuple[List[tuple], List[tuple]]:
+        """
+        Every stored song as an (id, title, artist, year) row ordered by ID,
+        and every (song_id, sampled_id) edge.
+        """
+        with self._lock:
+            songs = self._conn.execute(
+                "SELECT id, title, artist, year FROM songs ORDER BY id"
+            ).fetchall()
+            edges = self._conn.execute("SELECT song_id, sampled_id FROM samples").fetchall()
+        return songs, edges
+
+    def iter_song_rows(self, chunk_size: int = 1000) -> Iterator[tuple]:
+        """
+        Yield every song as (id, title, artist, year, fetched_at, sampled_in_at)
+        in ID order, holding the lock for one chunk at a time.
+        """
+        last = _MIN_ID
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    """SELECT id, title, artist, year, fetched_at, sampled_in_at FROM songs
+                    WHERE id > ? ORDER BY id LIMIT ?""",
+                    (last, chunk_size),
+                ).fetchall()
+            if not rows:
+                return
+            yield from rows
+            last = rows[-1][0]
+
+    def iter_edge_rows(self, chunk_size: int = 5000) -> Iterator[tuple]:
+        """Yield every edge as (song_id, sampled_id, position), a chunk at a time."""
+        last = (_MIN_ID, _MIN_ID)
+        while True:
+            with self._lock:
+                # Keyset pagination over the primary key, so each chunk is an index seek
+                rows = self._conn.execute(
+                    """SELECT song_id, sampled_id, position FROM samples
+                    WHERE (song_id, sampled_id) > (?, ?)
+                    ORDER BY song_id, sampled_id LIMIT ?""",
+                    (*last, chunk_size),
+                ).fetchall()
+            if not rows:
+                return
+            yield from rows
+            last = rows[-1][:2]
+
+    def import_rows(
+        self, songs: Iterable[tuple] = (), edges: Iterable[tuple] = ()
+    ) -> Tuple[int, int]:
+        """
+        Merge rows in iter_song_rows / iter_edge_rows shape in one
+        transaction; songs are consumed before edges. Newer fetch times win
+        and known years are never lost. A song's outgoing edges come wholly
+        from whichever copy was fetched last: the local list is replaced
+        when the imported song is newer and kept when the local one is.
+        Edges of songs neither side fetched (learned from "sampled in"
+        lists) are merged. Returns the number of song and edge rows read.
+        """
+        song_count = edge_count = 0
+        songs, edges = iter(songs), iter(edges)
+        with self._lock:
+            try:
+                # Per imported song: 1 if its edges replace ours, 0 if ours are newer
+                self._conn.execute(
+                    "CREATE TEMP TABLE IF NOT EXISTS import_owner (id INTEGER PRIMARY KEY, newer INTEGER)"
+                )
+                self._conn.execute("DELETE FROM temp.import_owner")
+                for batch in iter(lambda: list(islice(songs, _IMPORT_BATCH)), []):
+                    self._conn.executemany(
+                        """INSERT INTO temp.import_owner (id, newer)
+                        SELECT ?1, COALESCE(?2, 0) > COALESCE(local, 0)
+                        FROM (SELECT (SELECT fetched_at FROM songs WHERE id = ?1) AS local)
+                        WHERE ?2 IS NOT NULL OR local IS NOT NULL""",
+                        ((row[0], row[4]) for row in batch),
+                    )
+                    self._conn.executemany(_IMPORT_SONG_SQL, batch)
+                    song_count += len(batch)
+                self._conn.execute(
+                    """DELETE FROM samples
+                    WHERE song_id IN (SELECT id FROM temp.import_owner WHERE newer)"""
+                )
+                for batch in iter(lambda: list(islice(edges, _IMPORT_BATCH)), []):
+                    self._conn.executemany(
+                        """INSERT OR IGNORE INTO samples (song_id, sampled_id, position)
+                        SELECT ?1, ?2, ?3 WHERE NOT EXISTS (
+                            SELECT 1 FROM temp.import_owner WHERE id = ?1 AND NOT newer
+                        )""",
+                        batch,
+                    )
+                    edge_count += len(batch)
+                self._conn.execute("DELETE FROM temp.import_owner")
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._revision += 1
+        return song_count, edge_count
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM samples")
+            self._conn.execute("DELETE FROM songs")
+            self._conn.commit()
+            self._revision += 1
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _chunks(items: List, size: int = _MAX_PARAMS):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+_store: Optional[SampleStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> Optional[SampleStore]:
+    """Return the process-wide sample store, or None when disabled."""
+    global _store
+    if _store is None and SAMPLE_STORE_ENABLED:
+        with _store_lock:
+            if _store is None:
+                try:
+                    _store = SampleStore()
+                except (sqlite3.Error, OSError) as e:
+                    print(f"Sample store unavailable: {e}")
+                    return None
+    return _store
+
+
+def set_store(store: Optional[SampleStore]):
+    """Replace the process-wide sample store (used by tests)."""
+    global _store
+    with _store_lock:
+        _store = store
@@ -0,0 +1,151 @@
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple
+
+from whosampled.api.singleflight import SingleFlight
+from whosampled.config import ARTIFACT_CACHE_MAX_BYTES, ARTIFACT_CACHE_TTL
+from whosampled.utils.metrics import get_metrics
+
+
+# Figure size model: fixed layout cost, per point coordinates, per labelled point text
+FIGURE_BASE_BYTES = 5_000
+FIGURE_POINT_BYTES = 16
+FIGURE_TEXT_BYTES = 100
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate memory held by a cached artifact, in bytes.
+    DataFrames and objects exposing `nbytes` (NumPy arrays, CompactGraph)
+    report their own buffers, and Plotly figures are sized from the lengths
+    of their trace arrays. Only anything else is pickled to be measured.
+    """
+    if hasattr(value, "memory_usage") and hasattr(value, "columns"):
+        return int(value.memory_usage(deep=True).sum())
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    if hasattr(value, "to_plotly_json") and hasattr(value, "data"):
+        return _figure_size(value)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+def _figure_size(figure) -> int:
+    size = FIGURE_BASE_BYTES
+    for trace in figure.data:
+        x = getattr(trace, "x", None)
+        points = len(x) if x is not None else 0
+        labelled = getattr(trace, "text", None) is not None or getattr(trace, "hovertext", None) is not None
+        size += points * (FIGURE_POINT_BYTES + (FIGURE_TEXT_BYTES if labelled else 0))
+    return size
+
+
+class _Artifact(NamedTuple):
+    value: Any
+    size: int
+    expires_at: float
+
+
+class ArtifactCache:
+    """
+    Process-wide LRU of derived artifacts (graphs, figures, tables) shared
+    by every Streamlit session, bounded by estimated bytes rather than entry
+    count. Concurrent requests for the same key build the artifact once.
+    """
+
+    def __init__(self, max_bytes: int = ARTIFACT_CACHE_MAX_BYTES, ttl: float = ARTIFACT_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.total_bytes = 0
+        self._data: "OrderedDict[Hashable, _Artifact]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight = SingleFlight()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value for key, or None if absent or expired."""
+        with self._lock:
+            artifact = self._data.get(key)
+            if artifact is None:
+                return None
+            if artifact.expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return artifact.value
+
+    def set(self, key: Hashable, value: Any):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = _Artifact(value, size, time.time() + self.ttl)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                self._remove(next(iter(self._data)))
+                self._stats["evictions"] += 1
+
+    def _remove(self, key: Hashable):
+        self.total_bytes -= self._data.pop(key).size
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return the cached value for key, building it with factory on a miss."""
+        value = self.get(key)
+        if value is not None:
+            self._count("hits")
+            return value
+
+        def build():
+            value = self.get(key)
+            if value is None:
+                self._count("misses")
+                value = factory()
+                if value is not None:
+                    self.set(key, value)
+            return value
+
+        return self._inflight.do(repr(key), build)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._data), "bytes": self.total_bytes}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_artifact_cache() -> ArtifactCache:
+    """Return the artifact cache shared by all sessions in this process."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ArtifactCache()
+        return _cache
+
+
+get_metrics().register_collector(
+    "artifact_cache", lambda: _cache.stats() if _cache is not None else {}
+)
@@ -0,0 +1,307 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Stored in the year column when the release year is unknown
+UNKNOWN_YEAR = 0
+# Rough per-entry sizes for nbytes: a short str object, and a dict slot with its int key
+OBJECT_BYTES = 64
+INDEX_ENTRY_BYTES = 100
+
+
+class CompactGraph:
+    """
+    Directed sample graph keyed by Genius song ID and stored in NumPy arrays.
+    Nodes are numbered 0..n-1 in insertion order; `ids`, `titles`, `artists`,
+    `years` and `depths` are columns indexed by node number. Edges point from
+    the sampling song to the sampled song and are held in CSR form in both
+    directions (`indptr`/`indices` for successors, `in_indptr`/`in_indices`
+    for predecessors). Instances are immutable once built.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        titles: np.ndarray,
+        artists: np.ndarray,
+        years: np.ndarray,
+        depths: np.ndarray,
+        src: np.ndarray,
+        dst: np.ndarray,
+    ):
+        n = len(ids)
+        self.ids = ids
+        self.titles = titles
+        self.artists = artists
+        self.years = years
+        self.depths = depths
+        self._index = {int(song_id): i for i, song_id in enumerate(ids)}
+
+        # Drop duplicate edges, then sort by source (and target) for CSR
+        keys = np.unique(src.astype(np.int64) * max(n, 1) + dst)
+        src, dst = keys // max(n, 1), keys % max(n, 1)
+        self.src = src.astype(np.int32)
+        self.dst = dst.astype(np.int32)
+        self.indptr, self.indices = _csr(self.src, self.dst, n)
+        self.in_indptr, self.in_indices = _csr(self.dst, self.src, n)
+
+    @classmethod
+    def from_songs(
+        cls, songs: Iterable[Dict], edges: Iterable[Tuple[int, int]]
+    ) -> "CompactGraph":
+        """
+        Build a graph from song records ({"id", "title", "artist", "year", ...})
+        and (from_id, to_id) edges. Duplicate songs keep their first record;
+        edges to unknown IDs are ignored.
+        """
+        records: Dict[int, Dict] = {}
+        for song in songs:
+            records.setdefault(song["id"], song)
+        values = list(records.values())
+        n = len(values)
+
+        ids = np.fromiter((song["id"] for song in values), dtype=np.int64, count=n)
+        titles = np.array([song["title"] for song in values], dtype=object)
+        artists = np.array([song["artist"] for song in values], dtype=object)
+        years = np.fromiter(
+            (song.get("year") or UNKNOWN_YEAR for song in values), dtype=np.int32, count=n
+        )
+        depths = np.fromiter((song.get("depth", 0) for song in values), dtype=np.int32, count=n)
+
+        index = {song_id: i for i, song_id in enumerate(records)}
+        pairs = [
+            (index[a], index[b]) for a, b in edges if a in index and b in index
+        ]
+        edge_array = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        return cls(ids, titles, artists, years, depths, edge_array[:, 0], edge_array[:, 1])
+
+    @classmethod
+    def from_song_data(cls, song_data) -> "CompactGraph":
+        """
+        Build a graph from a get_sampled_songs result (a SampleRecord or the
+        equivalent dict). The main song is node 0 at depth 0, its samples
+        are at depth 1; records are read in place rather than copied.
+        """
+        main_song = song_data["main_song"]
+        sampled = song_data["sampled_songs"]
+        edges = [(main_song["id"], song["id"]) for song in sampled]
+        graph = cls.from_songs([main_song, *sampled], edges)
+        graph.depths = (np.arange(graph.n_nodes) > 0).astype(np.int32)
+        return graph
+
+    @classmethod
+    def from_sampled_in(cls, main_song, sampling_songs: Sequence) -> "CompactGraph":
+        """
+        Build the reverse graph of a song: the songs that sample it, each
+        with an edge to it. The main song is node 0 at depth 0 and the
+        sampling songs are at depth 1, as in from_song_data.
+        """
+        edges = [(song["id"], main_song["id"]) for song in sampling_songs]
+        graph = cls.from_songs([main_song, *sampling_songs], edges)
+        graph.depths = (np.arange(graph.n_nodes) > 0).astype(np.int32)
+        return graph
+
+    @classmethod
+    def from_lineage(cls, lineage: Dict) -> "CompactGraph":
+        """Build a graph from a crawl_sample_lineage or SampleStore.neighborhood result."""
+        return cls.from_songs(lineage["songs"].values(), lineage["edges"])
+
+    @classmethod
+    def from_networkx(cls, G) -> "CompactGraph":
+        """
+        Build a graph from a networkx.DiGraph such as build_graph returns.
+        Node keys become titles; the "id" attribute is used when present.
+        """
+        songs = []
+        keys = {}
+        for i, (key, data) in enumerate(G.nodes(data=True)):
+            song_id = data.get("id", -(i + 1))
+            keys[key] = song_id
+            songs.append(
+                {
+                    "id": song_id,
+                    "title": key,
+                    "artist": data.get("artist"),
+                    "year": data.get("year"),
+                    "depth": data.get("depth", 0),
+                }
+            )
+        edges = [(keys[a], keys[b]) for a, b in G.edges()]
+        return cls.from_songs(songs, edges)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Approximate memory held by the graph: the buffers of its arrays,
+        with each title and artist string counted at OBJECT_BYTES, plus the
+        ID index.
+        """
+        total = 0
+        for array in (
+            self.ids, self.titles, self.artists, self.years, self.depths,
+            self.src, self.dst, self.indptr, self.indices, self.in_indptr, self.in_indices,
+        ):
+            total += array.nbytes
+            if array.dtype == object:
+                total += len(array) * OBJECT_BYTES
+        return total + len(self._index) * INDEX_ENTRY_BYTES
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.indices)
+
+    def __len__(self):
+        return self.n_nodes
+
+    def __contains__(self, song_id) -> bool:
+        return int(song_id) in self._index
+
+    def index_of(self, song_id: int) -> int:
+        """Node number of a song ID; raises KeyError if absent."""
+        return self._index[int(song_id)]
+
+    def node(self, song_id: int) -> Dict:
+        """Return the attributes of a song as a dict."""
+        i = self.index_of(song_id)
+        return {
+            "id": int(self.ids[i]),
+            "title": self.titles[i],
+            "artist": self.artists[i],
+            "year": int(self.years[i]) or None,
+            "depth": int(self.depths[i]),
+        }
+
+    def out_degree(self) -> np.ndarray:
+        """Number of songs each node samples."""
+        return np.diff(self.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        """Number of songs that sample each node."""
+        return np.diff(self.in_indptr)
+
+    def roots(self) -> np.ndarray:
+        """Song IDs that no song in the graph samples."""
+        return self.ids[self.in_degree() == 0]
+
+    def successors(self, song_id: int) -> np.ndarray:
+        """IDs of the songs sampled by song_id."""
+        i = self.index_of(song_id)
+        return self.ids[self.indices[self.indptr[i]:self.indptr[i + 1]]]
+
+    def predecessors(self, song_id: int) -> np.ndarray:
+        """IDs of the songs that sample song_id."""
+        i = self.index_of(song_id)
+        return self.ids[self.in_indices[self.in_indptr[i]:self.in_indptr[i + 1]]]
+
+    def bfs(
+        self, song_id: int, max_depth: Optional[int] = None, direction: str = "samples"
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Breadth-first traversal from song_id following "samples" (successors)
+        or "sampled_in" (predecessors). Returns node numbers in visit order and
+        their hop distance. Each level is expanded with vectorized CSR slicing.
+        """
+        if direction == "samples":
+            indptr, indices = self.indptr, self.indices
+        elif direction == "sampled_in":
+            indptr, indices = self.in_indptr, self.in_indices
+        else:
+            raise ValueError(f"Unknown direction: {direction}")
+
+        dist = np.full(self.n_nodes, -1, dtype=np.int32)
+        frontier = np.array([self.index_of(song_id)], dtype=np.int64)
+        dist[frontier] = 0
+        order = [frontier]
+        depth = 0
+        while len(frontier) and (max_depth is None or depth < max_depth):
+            depth += 1
+            neighbors = expand_frontier(indptr, indices, frontier)
+            neighbors = np.unique(neighbors[dist[neighbors] < 0])
+            dist[neighbors] = depth
+            order.append(neighbors)
+            frontier = neighbors
+
+        visited = np.concatenate(order)
+        return visited, dist[visited]
+
+    def neighborhood(
+        self, song_id: int, k: int = 1, direction: str = "samples"
+    ) -> np.ndarray:
+        """Song IDs within k hops of song_id, including song_id itself."""
+        visited, _ = self.bfs(song_id, max_depth=k, direction=direction)
+        return self.ids[visited]
+
+    def subgraph(self, song_ids: Sequence[int]) -> "CompactGraph":
+        """Graph induced by the given song IDs."""
+        keep = np.zeros(self.n_nodes, dtype=bool)
+        keep[[self.index_of(song_id) for song_id in song_ids]] = True
+        remap = np.cumsum(keep) - 1
+        edge_mask = keep[self.src] & keep[self.dst]
+        return CompactGraph(
+            self.ids[keep],
+            self.titles[keep],
+            self.artists[keep],
+            self.years[keep],
+            self.depths[keep],
+            remap[self.src[edge_mask]],
+            remap[self.dst[edge_mask]],
+        )
+
+    def labels(self) -> List[str]:
+        """Display labels per node; repeated titles get the artist appended."""
+        labels = []
+        seen = set()
+        for song_id, title, artist in zip(self.ids, self.titles, self.artists):
+            label = title
+            if label in seen:
+                label = f"{title} ({artist})"
+            if label in seen:
+                label = f"{title} ({artist}, {song_id})"
+            seen.add(label)
+            labels.append(label)
+        return labels
+
+    def to_networkx(self):
+        """
+        Export to a networkx.DiGraph keyed by display label, with the same
+        node attributes build_graph sets plus "id" and "depth".
+        Requires networkx, which is only imported here.
+        """
+        import networkx as nx
+
+        labels = self.labels()
+        G = nx.DiGraph()
+        for i, label in enumerate(labels):
+            G.add_node(
+                label,
+                id=int(self.ids[i]),
+                year=int(self.years[i]) or None,
+                artist=self.artists[i],
+                depth=int(self.depths[i]),
+            )
+        G.add_edges_from((labels[a], labels[b]) for a, b in zip(self.src, self.dst))
+        return G
+
+
+def _csr(src: np.ndarray, dst: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(src, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return indptr, dst[order].astype(np.int32)
+
+
+def expand_frontier(
+    indptr: np.ndarray, indices: np.ndarray, frontier: np.ndarray
+) -> np.ndarray:
+    """Concatenate the CSR neighbor slices of every node in frontier."""
+    starts = indptr[frontier]
+    counts = indptr[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return indices[offsets + np.arange(total)].astype(np.int64)
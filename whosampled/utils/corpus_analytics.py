@@ -0,0 +1,248 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from whosampled.utils.compact_graph import CompactGraph
+
+# Shown for songs stored without an artist name
+UNKNOWN_ARTIST = "Unknown"
+
+
+def corpus_graph(songs: Sequence[tuple], edges: Sequence[tuple]) -> CompactGraph:
+    """
+    Build a CompactGraph from SampleStore.corpus() rows: songs as
+    (id, title, artist, year) ordered by ID, edges as (song_id, sampled_id).
+    Edges are mapped to node numbers with one vectorized search instead of
+    a dict lookup per edge.
+    """
+    n = len(songs)
+    ids = np.fromiter((row[0] for row in songs), dtype=np.int64, count=n)
+    titles = np.array([row[1] for row in songs], dtype=object)
+    artists = np.array([row[2] or UNKNOWN_ARTIST for row in songs], dtype=object)
+    years = np.fromiter((row[3] or 0 for row in songs), dtype=np.int32, count=n)
+
+    pairs = np.array(edges, dtype=np.int64).reshape(-1, 2)
+    src = np.searchsorted(ids, pairs[:, 0])
+    dst = np.searchsorted(ids, pairs[:, 1])
+    known = (src < n) & (dst < n)
+    known[known] &= (ids[src[known]] == pairs[known, 0]) & (ids[dst[known]] == pairs[known, 1])
+    return CompactGraph(
+        ids, titles, artists, years, np.zeros(n, dtype=np.int32), src[known], dst[known]
+    )
+
+
+def pagerank(
+    graph: CompactGraph,
+    damping: float = 0.85,
+    tol: float = 1e-10,
+    max_iter: int = 100,
+    start: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    PageRank over sample edges, so a song gains influence from the songs
+    that sample it. Each power iteration is one bincount over the edge
+    arrays; songs that sample nothing spread their score evenly. start
+    (e.g. the previous scores) lets a refresh converge in a few iterations.
+    """
+    n = graph.n_nodes
+    if n == 0:
+        return np.zeros(0)
+    rank = np.full(n, 1.0 / n) if start is None else start / start.sum()
+    out_degree = graph.out_degree().astype(float)
+    dangling = out_degree == 0
+    share = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    for _ in range(max_iter):
+        flow = np.bincount(graph.dst, weights=(rank * share)[graph.src], minlength=n)
+        new = (1 - damping) / n + damping * (flow + rank[dangling].sum() / n)
+        converged = np.abs(new - rank).sum() < tol
+        rank = new
+        if converged:
+            break
+    return rank
+
+
+def component_labels(graph: CompactGraph) -> np.ndarray:
+    """
+    Weakly connected component of every node, labelled by its smallest node
+    number. Uses vectorized hooking and pointer jumping over the edge
+    arrays, so it takes a few passes rather than one traversal per song.
+    """
+    labels = np.arange(graph.n_nodes)
+    src, dst = graph.src, graph.dst
+    while True:
+        lowest = np.minimum(labels[src], labels[dst])
+        hooked = labels.copy()
+        np.minimum.at(hooked, labels[src], lowest)
+        np.minimum.at(hooked, labels[dst], lowest)
+        while True:
+            jumped = hooked[hooked]
+            if np.array_equal(jumped, hooked):
+                break
+            hooked = jumped
+        if np.array_equal(hooked, labels):
+            return labels
+        labels = hooked
+
+
+def _expand(
+    graph: CompactGraph, frontier: np.ndarray, directions: Sequence[str]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Neighbors of a frontier and, for each, the frontier node it came from."""
+    neighbors, parents = [], []
+    for direction in directions:
+        if direction == "samples":
+            indptr, indices = graph.indptr, graph.indices
+        else:
+            indptr, indices = graph.in_indptr, graph.in_indices
+        counts = indptr[frontier + 1] - indptr[frontier]
+        starts = np.repeat(indptr[frontier] - np.cumsum(counts) + counts, counts)
+        neighbors.append(indices[starts + np.arange(int(counts.sum()))].astype(np.int64))
+        parents.append(np.repeat(frontier, counts))
+    return np.concatenate(neighbors), np.concatenate(parents)
+
+
+def shortest_chain(
+    graph: CompactGraph, from_id: int, to_id: int, directed: bool = True
+) -> Optional[List[int]]:
+    """
+    Shortest sample chain from from_id to to_id as a list of song IDs, or
+    None when they are not connected. Directed chains follow "samples"
+    edges (from_id samples ... samples to_id); undirected chains may use
+    edges either way. A bidirectional BFS always grows the smaller
+    frontier, so it visits far fewer songs than a BFS from one end.
+    """
+    source, target = graph.index_of(from_id), graph.index_of(to_id)
+    if source == target:
+        return [int(from_id)]
+
+    n = graph.n_nodes
+    forward = ("samples",) if directed else ("samples", "sampled_in")
+    backward = ("sampled_in",) if directed else ("samples", "sampled_in")
+    dist = [np.full(n, -1, dtype=np.int64), np.full(n, -1, dtype=np.int64)]
+    parent = [np.full(n, -1, dtype=np.int64), np.full(n, -1, dtype=np.int64)]
+    frontier = [np.array([source]), np.array([target])]
+    dist[0][source] = dist[1][target] = 0
+
+    while len(frontier[0]) and len(frontier[1]):
+        side = 0 if len(frontier[0]) <= len(frontier[1]) else 1
+        neighbors, parents = _expand(graph, frontier[side], forward if side == 0 else backward)
+        fresh = dist[side][neighbors] < 0
+        neighbors, first = np.unique(neighbors[fresh], return_index=True)
+        dist[side][neighbors] = dist[side][frontier[side][0]] + 1
+        parent[side][neighbors] = parents[fresh][first]
+        frontier[side] = neighbors
+
+        other = 1 - side
+        meets = neighbors[dist[other][neighbors] >= 0]
+        if len(meets):
+            # Every meeting node is equally far from this side; pick the one
+            # closest to the other side for the shortest chain
+            meet = int(meets[np.argmin(dist[other][meets])])
+            return _join_chain(graph, parent, meet)
+    return None
+
+
+def _join_chain(graph: CompactGraph, parent: List[np.ndarray], meet: int) -> List[int]:
+    head = [meet]
+    while parent[0][head[-1]] >= 0:
+        head.append(int(parent[0][head[-1]]))
+    tail = [meet]
+    while parent[1][tail[-1]] >= 0:
+        tail.append(int(parent[1][tail[-1]]))
+    nodes = head[::-1] + tail[1:]
+    return [int(graph.ids[i]) for i in nodes]
+
+
+class CorpusAnalytics:
+    """
+    Corpus-wide statistics over every stored sample relationship, computed
+    once per snapshot of the store: times sampled per song and artist,
+    PageRank influence and weakly connected components. Queries then only
+    slice the precomputed arrays. Passing the previous snapshot warm-starts
+    PageRank from its scores, so a refresh after a few new songs converges
+    in a handful of iterations.
+    """
+
+    def __init__(self, graph: CompactGraph, previous: Optional["CorpusAnalytics"] = None):
+        self.graph = graph
+        self.times_sampled = graph.in_degree()
+        self.samples_count = graph.out_degree()
+        self.influence = pagerank(graph, start=self._warm_start(previous))
+
+        labels = component_labels(graph)
+        _, self.component, self._component_counts = np.unique(
+            labels, return_inverse=True, return_counts=True
+        )
+        self.component_sizes = np.sort(self._component_counts)[::-1]
+
+        self.artist_names, artist_codes = np.unique(
+            graph.artists.astype(str), return_inverse=True
+        )
+        self.artist_times_sampled = np.bincount(
+            artist_codes, weights=self.times_sampled, minlength=len(self.artist_names)
+        ).astype(np.int64)
+        self.artist_songs_sampled = np.bincount(
+            artist_codes, weights=self.times_sampled > 0, minlength=len(self.artist_names)
+        ).astype(np.int64)
+
+        # Orders used by the top-N queries, ties broken by song ID
+        self._by_times_sampled = np.lexsort((graph.ids, -self.times_sampled))
+        self._by_influence = np.lexsort((graph.ids, -self.influence))
+        self._by_artist = np.lexsort((self.artist_names, -self.artist_times_sampled))
+
+    def _warm_start(self, previous: Optional["CorpusAnalytics"]) -> Optional[np.ndarray]:
+        if previous is None or previous.graph.n_nodes == 0 or self.graph.n_nodes == 0:
+            return None
+        old_ids = previous.graph.ids
+        order = np.argsort(old_ids)
+        position = np.searchsorted(old_ids, self.graph.ids, sorter=order)
+        position = order[np.minimum(position, len(old_ids) - 1)]
+        known = old_ids[position] == self.graph.ids
+        start = np.full(self.graph.n_nodes, 1.0 / self.graph.n_nodes)
+        start[known] = previous.influence[position[known]]
+        return start
+
+    def _song(self, i: int) -> Dict:
+        song = self.graph.node(int(self.graph.ids[i]))
+        del song["depth"]
+        return song
+
+    def most_sampled_songs(self, limit: int = 20) -> List[Dict]:
+        """The songs sampled by the most stored songs."""
+        return [
+            {**self._song(i), "times_sampled": int(self.times_sampled[i])}
+            for i in self._by_times_sampled[:limit]
+            if self.times_sampled[i] > 0
+        ]
+
+    def most_sampled_artists(self, limit: int = 20) -> List[Dict]:
+        """Artists ranked by how often their songs are sampled."""
+        return [
+            {
+                "artist": str(self.artist_names[i]),
+                "times_sampled": int(self.artist_times_sampled[i]),
+                "songs_sampled": int(self.artist_songs_sampled[i]),
+            }
+            for i in self._by_artist[:limit]
+            if self.artist_times_sampled[i] > 0
+        ]
+
+    def most_influential(self, limit: int = 20) -> List[Dict]:
+        """Songs with the highest PageRank influence score."""
+        return [
+            {**self._song(i), "influence": float(self.influence[i])}
+            for i in self._by_influence[:limit]
+        ]
+
+    def component_size(self, song_id: int) -> int:
+        """Number of songs connected to song_id by samples in either direction."""
+        return int(self._component_counts[self.component[self.graph.index_of(song_id)]])
+
+    def shortest_chain(self, from_id: int, to_id: int, directed: bool = True) -> Optional[List[Dict]]:
+        """The songs on the shortest sample chain between two stored songs."""
+        if from_id not in self.graph or to_id not in self.graph:
+            return None
+        chain = shortest_chain(self.graph, from_id, to_id, directed)
+        if chain is None:
+            return None
+        return [self._song(self.graph.index_of(song_id)) for song_id in chain]
@@ -0,0 +1,170 @@
+from statistics import median
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from whosampled.api.records import SampleRecord, SongRecord
+from whosampled.utils.layout import TIE_SPACING
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+
+def _median_year(songs: List[SongRecord]) -> Optional[float]:
+    years = [song.year for song in songs if song.year]
+    return float(median(years)) if years else None
+
+
+# Trace numbers in the figure; clicks report these as curve_number
+EDGE_TRACE, NODE_TRACE = 0, 1
+
+
+class GraphExploration:
+    """
+    A sample graph grown one song at a time, for click-to-expand browsing.
+    Songs keep the position they were given when first added (release year
+    across, hops from the starting song down), so expanding a song only
+    places its new samples. The figure is built once with one edge trace
+    and one node trace; each expansion appends the new points to those two
+    traces, so point indexes stay stable for click handling and the number
+    of traces never grows. A fixed uirevision keeps the user's zoom across
+    reruns.
+    """
+
+    def __init__(self, song_data: SampleRecord):
+        main_song = song_data.main_song
+        self.root_id = main_song.id
+        self.songs: Dict[int, SongRecord] = {}
+        self.depths: Dict[int, int] = {}
+        self.positions: Dict[int, Tuple[float, float]] = {}
+        self.edges: Set[Tuple[int, int]] = set()
+        self.expanded: Set[int] = set()
+        # Songs placed per (depth, anchor x) cell, for spreading ties apart
+        self._cells: Dict[Tuple[int, float], int] = {}
+        # Point data of the single edge and node traces, in the order songs were added
+        self._edge_x: List[Optional[float]] = []
+        self._edge_y: List[Optional[float]] = []
+        self._node_ids: List[int] = []
+        self._nodes: Dict[str, List] = {key: [] for key in ("x", "y", "hovertext", "text", "color")}
+        self._figure: Optional["go.Figure"] = None
+
+        # Like chronological_layout, a song without a year sits at the median known year
+        anchor = main_song.year or _median_year(song_data.sampled_songs)
+        self._place(main_song, 0, float(anchor or 0))
+        self._extend([main_song.id], [])
+        self.expand(song_data)
+
+    def _place(self, song: SongRecord, depth: int, anchor: float):
+        cell = (depth, round(anchor, 3))
+        k = self._cells.get(cell, 0)
+        self._cells[cell] = k + 1
+        # 0, +1, -1, +2, -2, ... ties from the anchor
+        offset = (k + 1) // 2 * (1 if k % 2 else -1) * TIE_SPACING
+        self.songs[song.id] = song
+        self.depths[song.id] = depth
+        self.positions[song.id] = (anchor + offset, -float(depth))
+
+    def expand(self, song_data: SampleRecord) -> Dict[str, List]:
+        """
+        Add the samples of a song already in the graph. Returns the IDs of
+        the songs and the edges that were new; expanding a song twice is a
+        no-op.
+        """
+        song_id = song_data.main_song.id
+        if song_id in self.expanded or song_id not in self.songs:
+            return {"songs": [], "edges": []}
+        self.expanded.add(song_id)
+
+        depth = self.depths[song_id] + 1
+        unknown_x = _median_year(song_data.sampled_songs) or self.positions[song_id][0]
+        new_songs, new_edges = [], []
+        for song in song_data.sampled_songs:
+            if song.id not in self.songs:
+                self._place(song, depth, float(song.year or unknown_x))
+                new_songs.append(song.id)
+            edge = (song_id, song.id)
+            if edge not in self.edges:
+                self.edges.add(edge)
+                new_edges.append(edge)
+        if new_songs or new_edges:
+            self._extend(new_songs, new_edges)
+        return {"songs": new_songs, "edges": new_edges}
+
+    def song_at(self, curve_number: int, point_index: int) -> Optional[int]:
+        """The song ID of a clicked point, or None for edges and unknown points."""
+        if curve_number != NODE_TRACE or not 0 <= point_index < len(self._node_ids):
+            return None
+        return self._node_ids[point_index]
+
+    def _extend(self, song_ids: List[int], edges: List[Tuple[int, int]]):
+        import plotly.graph_objects as go
+
+        for from_id, to_id in edges:
+            (x0, y0), (x1, y1) = self.positions[from_id], self.positions[to_id]
+            self._edge_x += [x0, x1, None]
+            self._edge_y += [y0, y1, None]
+        for i in song_ids:
+            song = self.songs[i]
+            self._node_ids.append(i)
+            self._nodes["x"].append(self.positions[i][0])
+            self._nodes["y"].append(self.positions[i][1])
+            self._nodes["hovertext"].append(
+                f"{song.title} by {song.artist}\n"
+                f"{f'Year: {song.year}' if song.year else 'Year: Unknown'}"
+            )
+            self._nodes["text"].append(song.title)
+            self._nodes["color"].append("red" if i == self.root_id else "blue")
+
+        nodes = self._nodes
+        if self._figure is None:
+            self._figure = go.Figure(
+                data=[
+                    go.Scatter(
+                        x=self._edge_x, y=self._edge_y, mode="lines", hoverinfo="none",
+                        line=dict(width=1, color="#888"),
+                    ),
+                    go.Scatter(
+                        x=nodes["x"], y=nodes["y"],
+                        mode="markers+text",
+                        hoverinfo="text",
+                        hovertext=nodes["hovertext"],
+                        text=nodes["text"],
+                        textposition="top center",
+                        customdata=self._node_ids,
+                        marker=dict(size=20, line_width=2, color=nodes["color"]),
+                    ),
+                ],
+                layout=self._layout(),
+            )
+            return
+        with self._figure.batch_update():
+            self._figure.data[EDGE_TRACE].update(x=self._edge_x, y=self._edge_y)
+            self._figure.data[NODE_TRACE].update(
+                x=nodes["x"], y=nodes["y"], hovertext=nodes["hovertext"], text=nodes["text"],
+                customdata=self._node_ids, marker_color=nodes["color"],
+            )
+            if not self._figure.layout.xaxis.showticklabels and any(
+                self.songs[i].year for i in song_ids
+            ):
+                self._figure.update_layout(xaxis=self._layout()["xaxis"])
+
+    def _layout(self) -> Dict:
+        show_years = any(song.year for song in self.songs.values())
+        return dict(
+            title="Song Sampling Network (click a song to expand it)",
+            showlegend=False,
+            hovermode="closest",
+            clickmode="event+select",
+            margin=dict(b=20, l=5, r=5, t=40),
+            # Keep zoom and pan across reruns while traces are appended
+            uirevision=self.root_id,
+            xaxis=dict(
+                showgrid=show_years,
+                zeroline=False,
+                showticklabels=show_years,
+                title="Release year" if show_years else None,
+            ),
+            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+        )
+
+    @property
+    def figure(self) -> "go.Figure":
+        return self._figure
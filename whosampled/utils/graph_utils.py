@@ -1,35 +1,40 @@
-import networkx as nx
-import plotly.graph_objects as go
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple, Union
 import numpy as np
+from whosampled.api.records import SongRecord
+from whosampled.config import PLOT_WEBGL_THRESHOLD
+from whosampled.utils.compact_graph import CompactGraph
+from whosampled.utils.layout import chronological_layout
+from whosampled.utils.metrics import get_metrics, timed
+
+if TYPE_CHECKING:
+    import networkx as nx
+    import plotly.graph_objects as go
+
+# Sampled songs (0) are blue, main songs (1) are red
+NODE_COLORSCALE = [[0, "blue"], [1, "red"]]
 
 
 def calculate_node_positions(
     main_song: Dict, sampled_songs: List[Dict]
 ) -> Dict[str, Tuple[float, float]]:
     """
-    Calculate node positions using a simple hierarchical layout.
-    Returns a dictionary mapping song titles to (x, y) coordinates.
+    Title-keyed positions of plot_graph's "hierarchical" layout for a song
+    and its samples (see hierarchical_positions). plot_graph itself lays
+    graphs out chronologically by default.
     """
-    positions = {}
-
-    # Position main song at the top
-    positions[main_song["title"]] = (0, 1)
-
-    # Position sampled songs below, spread horizontally
-    for i, song in enumerate(sampled_songs):
-        x_pos = (i - len(sampled_songs) / 2) / (
-            len(sampled_songs) + 1
-        )  # Center the nodes
-        positions[song["title"]] = (x_pos, 0)
-
-    return positions
+    x, y = hierarchical_positions(np.array([0] + [1] * len(sampled_songs)))
+    songs = [main_song, *sampled_songs]
+    return {song["title"]: (float(x[i]), float(y[i])) for i, song in enumerate(songs)}
 
 
-def build_graph(main_song: Dict, sampled_songs: List[Dict]) -> nx.DiGraph:
+@timed("build_graph_seconds")
+def build_graph(main_song: SongRecord, sampled_songs: Sequence[SongRecord]) -> "nx.DiGraph":
     """
     Build a directed graph with chronological layout.
+    Songs may be SongRecords or the equivalent dicts.
     """
+    import networkx as nx
+
     G = nx.DiGraph()
 
     # Add nodes with year information
@@ -45,34 +50,152 @@ def build_graph(main_song: Dict, sampled_songs: List[Dict]) -> nx.DiGraph:
     return G
 
 
-def plot_graph(G: nx.DiGraph) -> go.Figure:
+@timed("build_compact_graph_seconds")
+def build_compact_graph(
+    main_song: SongRecord, sampled_songs: Sequence[SongRecord]
+) -> CompactGraph:
     """
-    Create a Plotly figure with a hierarchical layout.
+    Build an ID-keyed CompactGraph of a song and its samples.
+    Unlike build_graph, songs sharing a title stay separate nodes.
     """
-    # Calculate node positions
-    main_song = next(
-        (node for node in G.nodes(data=True) if G.in_degree(node[0]) == 0), None
+    return CompactGraph.from_song_data(
+        {"main_song": main_song, "sampled_songs": sampled_songs}
     )
-    sampled_songs = [node for node in G.nodes(data=True) if G.in_degree(node[0]) > 0]
 
-    if main_song is None:
-        return go.Figure()  # Return empty figure if no main song found
 
-    positions = calculate_node_positions(
-        {"title": main_song[0], **main_song[1]},
-        [{"title": song[0], **song[1]} for song in sampled_songs],
-    )
+@timed("build_sampled_in_graph_seconds")
+def build_sampled_in_graph(
+    main_song: SongRecord, sampling_songs: Sequence[SongRecord]
+) -> CompactGraph:
+    """
+    Build an ID-keyed CompactGraph of a song and the songs that sample it.
+    Edges still point from the sampling song to the sampled one, so
+    plot_graph draws the sampling songs in red above the main song.
+    """
+    return CompactGraph.from_sampled_in(main_song, sampling_songs)
+
+
+def build_lineage_graph(lineage: Dict) -> "nx.DiGraph":
+    """
+    Build a directed graph from a crawl_sample_lineage result.
+    Nodes are keyed by title like build_graph, so plot_graph can render it;
+    titles shared by different songs get the artist appended, and the song
+    ID too if that still clashes (as in CompactGraph.labels).
+    """
+    import networkx as nx
+
+    G = nx.DiGraph()
+    labels = {}
+
+    for song_id, song in lineage["songs"].items():
+        label = song["title"]
+        if label in G:
+            label = f"{song['title']} ({song['artist']})"
+        if label in G:
+            label = f"{song['title']} ({song['artist']}, {song_id})"
+        labels[song_id] = label
+        G.add_node(
+            label, id=song_id, year=song["year"], artist=song["artist"], depth=song["depth"]
+        )
+
+    for from_id, to_id in lineage["edges"]:
+        G.add_edge(labels[from_id], labels[to_id])
+
+    return G
 
-    # Create edge traces
-    edge_x = []
-    edge_y = []
-    for edge in G.edges():
-        x0, y0 = positions[edge[0]]
-        x1, y1 = positions[edge[1]]
-        edge_x.extend([x0, x1, None])
-        edge_y.extend([y0, y1, None])
 
-    edge_trace = go.Scatter(
+def hierarchical_positions(in_degree: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Positions for plot_graph(layout="hierarchical"); the default layout is
+    chronological_layout. Songs nobody samples go on the top row, every
+    other song is spread along the bottom row in node order.
+    """
+    is_root = in_degree == 0
+    x = np.zeros(len(in_degree))
+    y = is_root.astype(float)
+
+    def spread(count: int) -> np.ndarray:
+        return (np.arange(count) - count / 2) / (count + 1)  # Center the nodes
+
+    roots = int(is_root.sum())
+    if roots > 1:
+        x[is_root] = spread(roots)
+    x[~is_root] = spread(len(in_degree) - roots)
+    return x, y
+
+
+def edge_segments(
+    x: np.ndarray, y: np.ndarray, src: np.ndarray, dst: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Edge line coordinates as [x0, x1, NaN, ...] so one trace draws every edge."""
+    gap = np.full(len(src), np.nan)
+    edge_x = np.column_stack([x[src], x[dst], gap]).ravel()
+    edge_y = np.column_stack([y[src], y[dst], gap]).ravel()
+    return edge_x, edge_y
+
+
+def node_hover_text(graph: CompactGraph, labels: List[str]) -> List[str]:
+    """Hover text for every node, built in a single pass over the columns."""
+    return [
+        f"{label} by {artist}\n{f'Year: {year}' if year else 'Year: Unknown'}"
+        for label, artist, year in zip(labels, graph.artists, graph.years.tolist())
+    ]
+
+
+def plot_graph(
+    G: Union["nx.DiGraph", CompactGraph],
+    webgl_threshold: int = PLOT_WEBGL_THRESHOLD,
+    layout: str = "chronological",
+) -> "go.Figure":
+    """
+    Create a Plotly figure of a sample graph.
+    layout is "chronological" (release year across, lineage depth down; see
+    chronological_layout) or "hierarchical" (main song above its samples).
+    Accepts a networkx graph or a CompactGraph. Coordinates, colors and
+    sizes are computed as NumPy arrays; graphs with more than
+    webgl_threshold nodes are drawn with WebGL (Scattergl) and without
+    on-canvas labels so the browser stays responsive.
+    """
+    with get_metrics().timer("plot_graph_seconds") as labels:
+        fig = _plot_graph(G, webgl_threshold, layout)
+        labels["renderer"] = "webgl" if fig.data and fig.data[0].type == "scattergl" else "svg"
+    return fig
+
+
+def _plot_graph(G, webgl_threshold: int, layout: str):
+    import plotly.graph_objects as go
+
+    graph = G if isinstance(G, CompactGraph) else CompactGraph.from_networkx(G)
+    in_degree = graph.in_degree()
+    is_root = in_degree == 0
+
+    if not is_root.any():
+        return go.Figure()  # Return empty figure if no main song found
+
+    if layout == "chronological":
+        x, y = chronological_layout(graph)
+    elif layout == "hierarchical":
+        x, y = hierarchical_positions(in_degree)
+    else:
+        raise ValueError(f"Unknown layout: {layout}")
+    show_years = layout == "chronological" and bool((graph.years > 0).any())
+    edge_x, edge_y = edge_segments(x, y, graph.src, graph.dst)
+
+    large = graph.n_nodes > webgl_threshold
+    scatter = go.Scattergl if large else go.Scatter
+    labels = graph.titles.tolist() if not isinstance(G, CompactGraph) else graph.labels()
+    hover_text = node_hover_text(graph, labels)
+
+    # Color nodes based on whether they're the main song or a sample. A numeric
+    # array mapped through a two-color scale validates far faster than strings.
+    node_colors = is_root.astype(np.int8)
+    if large:
+        # Scale markers by how connected a song is instead of labelling every node
+        node_sizes = 6 + 3 * np.log1p(in_degree + graph.out_degree())
+    else:
+        node_sizes = np.full(graph.n_nodes, 20)
+
+    edge_trace = scatter(
         x=edge_x,
         y=edge_y,
         line=dict(width=1, color="#888"),
@@ -80,32 +203,23 @@ def plot_graph(G: nx.DiGraph) -> go.Figure:
         mode="lines",
     )
 
-    # Create node traces
-    node_x = []
-    node_y = []
-    node_text = []
-    node_colors = []
-
-    for node in G.nodes(data=True):
-        x, y = positions[node[0]]
-        node_x.append(x)
-        node_y.append(y)
-
-        # Create hover text with song info
-        year_str = f"Year: {node[1]['year']}" if node[1]["year"] else "Year: Unknown"
-        node_text.append(f"{node[0]} by {node[1]['artist']}\n{year_str}")
-
-        # Color nodes based on whether they're the main song or a sample
-        node_colors.append("red" if G.in_degree(node[0]) == 0 else "blue")
-
-    node_trace = go.Scatter(
-        x=node_x,
-        y=node_y,
-        mode="markers+text",
+    node_trace = scatter(
+        x=x,
+        y=y,
+        mode="markers" if large else "markers+text",
         hoverinfo="text",
-        text=node_text,
+        hovertext=hover_text,
+        text=None if large else hover_text,
         textposition="top center",
-        marker=dict(showscale=False, color=node_colors, size=20, line_width=2),
+        marker=dict(
+            showscale=False,
+            color=node_colors,
+            colorscale=NODE_COLORSCALE,
+            cmin=0,
+            cmax=1,
+            size=node_sizes,
+            line_width=2,
+        ),
     )
 
     # Create the figure
@@ -117,7 +231,12 @@ def plot_graph(G: nx.DiGraph) -> go.Figure:
             showlegend=False,
             hovermode="closest",
             margin=dict(b=20, l=5, r=5, t=40),
-            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            xaxis=dict(
+                showgrid=show_years,
+                zeroline=False,
+                showticklabels=show_years,
+                title="Release year" if show_years else None,
+            ),
             yaxis=dict(
                 showgrid=False,
                 zeroline=False,
@@ -0,0 +1,148 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+import numpy as np
+
+from whosampled.config import LAYOUT_CACHE_SIZE
+from whosampled.utils.compact_graph import CompactGraph, expand_frontier
+
+# Horizontal gap, in years, between songs sharing a layer and release year
+TIE_SPACING = 0.35
+
+_cache: "OrderedDict[str, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def graph_hash(graph: CompactGraph) -> str:
+    """Content hash of the parts of a graph that affect its layout."""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in (graph.ids, graph.years, graph.src, graph.dst):
+        digest.update(np.ascontiguousarray(array).tobytes())
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+def layer_depths(graph: CompactGraph) -> np.ndarray:
+    """
+    Lineage depth of every node: hops from the nearest song nobody samples.
+    Computed with a multi-source BFS over the CSR arrays; nodes only reachable
+    through cycles go in an extra layer below the deepest one.
+    """
+    n = graph.n_nodes
+    depth = np.full(n, -1, dtype=np.int32)
+    frontier = np.flatnonzero(graph.in_degree() == 0)
+    if len(frontier) == 0 and n:
+        frontier = np.array([0])
+    depth[frontier] = 0
+    level = 0
+    while len(frontier):
+        level += 1
+        neighbors = expand_frontier(graph.indptr, graph.indices, frontier)
+        neighbors = np.unique(neighbors[depth[neighbors] < 0])
+        depth[neighbors] = level
+        frontier = neighbors
+
+    unreached = depth < 0
+    if unreached.any():
+        depth[unreached] = depth.max() + 1
+    return depth
+
+
+def _barycenter(graph: CompactGraph, x: np.ndarray, reverse: bool = False) -> np.ndarray:
+    """Mean x of each node's parents (or children when reverse); NaN if none."""
+    src, dst = (graph.dst, graph.src) if reverse else (graph.src, graph.dst)
+    known = ~np.isnan(x[src])
+    sums = np.bincount(dst[known], weights=x[src][known], minlength=graph.n_nodes)
+    counts = np.bincount(dst[known], minlength=graph.n_nodes)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def chronological_layout(
+    graph: CompactGraph, sweeps: int = 2
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lay out a sample graph with release year on the x axis and lineage
+    depth on the y axis (the main song on top, y = -depth).
+
+    Songs without a known year take the barycenter of their neighbors'
+    positions. Songs that share a layer and a year are spread apart in
+    barycenter order, which keeps edges from crossing inside a year column.
+    When no years are known at all each layer is ordered by barycenter
+    instead. Alternating down/up sweeps refine the result. Every step is
+    vectorized, and results are cached per graph hash so re-renders do not
+    recompute.
+    """
+    key = graph_hash(graph)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    depth = layer_depths(graph)
+    y = -depth.astype(float)
+    years = graph.years.astype(float)
+    known = years > 0
+    has_years = bool(known.any())
+
+    if has_years:
+        # Unknown years start at the median year of their layer
+        anchor = np.where(known, years, np.nan)
+        overall = np.nanmedian(anchor)
+        for layer in np.unique(depth[~known]):
+            in_layer = depth == layer
+            layer_years = years[in_layer & known]
+            anchor[in_layer & ~known] = np.median(layer_years) if len(layer_years) else overall
+        x = anchor.copy()
+    else:
+        # No release years at all: order each layer by node number to start
+        x = np.arange(graph.n_nodes, dtype=float)
+
+    for _ in range(max(1, sweeps)):
+        for reverse in (False, True):
+            bary = _barycenter(graph, x, reverse=reverse)
+            tiebreak = np.where(np.isnan(bary), x, bary)
+            if has_years:
+                follow = ~known & ~np.isnan(bary)
+                anchor[follow] = bary[follow]
+                cell = np.round(anchor, 3)
+                order = np.lexsort((tiebreak, cell, depth))
+                offsets = np.empty_like(x)
+                offsets[order] = _centered_rank(depth[order], cell[order]) * TIE_SPACING
+                x = anchor + offsets
+            else:
+                order = np.lexsort((tiebreak, depth))
+                x = np.empty_like(x)
+                x[order] = _centered_rank(depth[order])
+
+    result = (x, y)
+    for array in result:
+        array.setflags(write=False)
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > LAYOUT_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+def _centered_rank(*sorted_keys: np.ndarray) -> np.ndarray:
+    """Rank of each element within runs of equal keys, centered on zero."""
+    n = len(sorted_keys[0])
+    if n == 0:
+        return np.zeros(0)
+    change = np.zeros(n, dtype=bool)
+    change[0] = True
+    for keys in sorted_keys:
+        change[1:] |= keys[1:] != keys[:-1]
+    starts = np.flatnonzero(change)
+    sizes = np.diff(np.r_[starts, n])
+    group = np.repeat(np.arange(len(starts)), sizes)
+    rank = np.arange(n) - starts[group]
+    return rank - (sizes[group] - 1) / 2
+
+
+def clear_layout_cache():
+    with _cache_lock:
+        _cache.clear()
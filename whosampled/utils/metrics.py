@@ -0,0 +1,244 @@
+import bisect
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from whosampled.config import METRICS_HOST, METRICS_LOG
+
+# Latency histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger("whosampled.metrics")
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, n_buckets: int):
+        self.counts = [0] * n_buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and latency histograms keyed by metric name and
+    labels, rendered in the Prometheus text format. Collectors are polled
+    at render time for gauges that other components already track (cache
+    sizes, hit counts), so those hot paths need no extra bookkeeping.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, log: bool = METRICS_LOG):
+        self.buckets = tuple(buckets)
+        self.log = log
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(len(self.buckets))
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                histogram.counts[index] += 1
+            histogram.sum += value
+            histogram.count += 1
+        if self.log:
+            logger.info(json.dumps({"metric": name, "value": round(value, 6), **labels}))
+        _record_timing(name, value, labels)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[Dict]:
+        """
+        Observe the duration of the block under name. Yields the labels
+        dict, so the block can add labels only known at the end (status,
+        model, ...).
+        """
+        start = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def register_collector(self, name: str, collect: Callable[[], Dict[str, float]]):
+        """Export collect()'s numeric values as gauges named <name>_<key>."""
+        with self._lock:
+            self._collectors[name] = collect
+
+    def counter_value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+
+    def histogram_count(self, name: str, **labels) -> int:
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(_label_key(labels))
+            return histogram.count if histogram else 0
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {
+                name: {key: (list(h.counts), h.sum, h.count) for key, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+            collectors = dict(self._collectors)
+
+        for name in sorted(counters):
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(counters[name].items()):
+                lines.append(f"{name}{_format_labels(key)} {value:g}")
+
+        for name in sorted(histograms):
+            lines.append(f"# TYPE {name} histogram")
+            for key, (counts, total, count) in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {count}")
+                lines.append(f"{name}_sum{_format_labels(key)} {total:g}")
+                lines.append(f"{name}_count{_format_labels(key)} {count}")
+
+        for prefix in sorted(collectors):
+            try:
+                values = collectors[prefix]() or {}
+            except Exception:
+                continue
+            for key, value in sorted(values.items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"# TYPE {prefix}_{key} gauge")
+                    lines.append(f"{prefix}_{key} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# Timings observed by the current Streamlit rerun (see record_timings)
+_timings: "contextvars.ContextVar[Optional[List[Dict]]]" = contextvars.ContextVar(
+    "whosampled_timings", default=None
+)
+
+
+def _record_timing(name: str, seconds: float, labels: Dict):
+    timings = _timings.get()
+    if timings is not None:
+        timings.append({"metric": name, "ms": round(seconds * 1000, 2), **labels})
+
+
+def start_timings() -> List[Dict]:
+    """Start collecting the timings observed in this context; returns the list."""
+    timings: List[Dict] = []
+    _timings.set(timings)
+    return timings
+
+
+@contextmanager
+def record_timings() -> Iterator[List[Dict]]:
+    """Collect the timings observed inside the block (e.g. one rerun)."""
+    token = _timings.set([])
+    try:
+        yield _timings.get()
+    finally:
+        _timings.reset(token)
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+_server: Optional[ThreadingHTTPServer] = None
+# Set once binding fails, so reruns do not retry (and log) every time
+_server_failed = False
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide metrics registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry()
+    return _registry
+
+
+def timed(name: str, **labels):
+    """Decorator observing each call's duration under name."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with get_metrics().timer(name, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_metrics_server(port: int, host: str = METRICS_HOST) -> Optional[ThreadingHTTPServer]:
+    """
+    Serve the registry at http://host:port/metrics for Prometheus to scrape.
+    Safe to call on every rerun: only the first call starts the server. If
+    the port cannot be bound (e.g. another process holds it), a warning is
+    logged once and None is returned; the app keeps running without it.
+    """
+    global _server, _server_failed
+    with _registry_lock:
+        if _server is not None or _server_failed:
+            return _server
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = get_metrics().render_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            _server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            _server_failed = True
+            logger.warning("Metrics server not started on %s:%s: %s", host, port, e)
+            return None
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+        return _server
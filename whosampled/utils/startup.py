@@ -0,0 +1,44 @@
+import json
+import subprocess
+import sys
+from typing import Dict, Sequence
+
+# Dependencies the app entry points must not import until they are used.
+# Plotly is left out: Streamlit imports its lazily-loaded package itself.
+HEAVY_MODULES = ("numpy", "pandas", "networkx", "openai")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+seconds = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": seconds,
+    "loaded": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def measure_startup(
+    modules: Sequence[str] = ("whosampled.app",),
+    heavy: Sequence[str] = HEAVY_MODULES,
+    python: str = sys.executable,
+) -> Dict:
+    """
+    Import modules in a fresh interpreter, as a new Streamlit worker would.
+    Returns the import wall time in seconds and which heavy dependencies
+    were loaded as a side effect.
+    """
+    script = _PROBE.format(modules=tuple(modules), heavy=tuple(heavy))
+    output = subprocess.run(
+        [python, "-c", script], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    # python -m whosampled.utils.startup [module ...]
+    result = measure_startup(sys.argv[1:] or ("whosampled.app",))
+    print(f"Import time: {result['seconds'] * 1000:.0f} ms")
+    print(f"Heavy modules loaded: {', '.join(result['loaded']) or 'none'}")
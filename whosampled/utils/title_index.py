@@ -0,0 +1,108 @@
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from whosampled.config import TITLE_INDEX_MAX_TITLES
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_title(text: str) -> str:
+    """Lower-case text and collapse punctuation and whitespace to single spaces."""
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of normalized text, padded so short words still match."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleIndex:
+    """
+    In-process trigram index over every (display_text, song_id) search result
+    seen so far. Answers typeahead queries locally without a /search call.
+    Oldest titles are dropped once max_titles is reached.
+    """
+
+    def __init__(self, max_titles: int = TITLE_INDEX_MAX_TITLES):
+        self.max_titles = max_titles
+        self._titles: "OrderedDict[int, Tuple[str, str]]" = OrderedDict()
+        self._grams: Dict[str, Set[int]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def add(self, display_text: str, song_id: int):
+        normalized = normalize_title(display_text)
+        with self._lock:
+            if song_id in self._titles:
+                self._titles.move_to_end(song_id)
+                return
+            self._titles[song_id] = (display_text, normalized)
+            for gram in trigrams(normalized):
+                self._grams[gram].add(song_id)
+            while len(self._titles) > self.max_titles:
+                self._remove_oldest()
+
+    def add_many(self, results: Iterable[Tuple[str, int]]):
+        for display_text, song_id in results:
+            self.add(display_text, song_id)
+
+    def _remove_oldest(self):
+        song_id, (_, normalized) = self._titles.popitem(last=False)
+        for gram in trigrams(normalized):
+            ids = self._grams.get(gram)
+            if ids is not None:
+                ids.discard(song_id)
+                if not ids:
+                    del self._grams[gram]
+
+    def search(
+        self, query: str, limit: int = 10, min_score: float = 0.6
+    ) -> List[Tuple[str, int]]:
+        """
+        Return up to limit (display_text, song_id) tuples whose titles share
+        at least min_score of the query's trigrams, best matches first.
+        Titles starting with the query rank above other matches.
+        """
+        normalized = normalize_title(query)
+        if not normalized:
+            return []
+        grams = trigrams(normalized)
+
+        with self._lock:
+            counts: Dict[int, int] = defaultdict(int)
+            for gram in grams:
+                for song_id in self._grams.get(gram, ()):
+                    counts[song_id] += 1
+            threshold = min_score * len(grams)
+            matches = [
+                (song_id, count, self._titles[song_id])
+                for song_id, count in counts.items()
+                if count >= threshold
+            ]
+
+        matches.sort(
+            key=lambda match: (
+                not match[2][1].startswith(normalized),
+                -match[1],
+                len(match[2][1]),
+            )
+        )
+        return [(display_text, song_id) for song_id, _, (display_text, _) in matches[:limit]]
+
+    def __len__(self):
+        return len(self._titles)
+
+
+_index: Optional[TitleIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_title_index() -> TitleIndex:
+    """Return the process-wide title index shared by all sessions."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = TitleIndex()
+        return _index